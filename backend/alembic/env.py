@@ -25,6 +25,14 @@ def run_migrations_offline():
         context.run_migrations()
 
 def run_migrations_online():
+    # Reuse a connection handed over by app.schema (which may hold the migration lock)
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     configuration = config.get_section(config.config_ini_section)
     configuration["sqlalchemy.url"] = SQLALCHEMY_DATABASE_URL
     connectable = engine_from_config(
@@ -0,0 +1,63 @@
+"""initial schema
+
+Revision ID: 000
+Revises: 
+Create Date: 2024-04-30 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '000'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Tables as they existed before the first incremental migration
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('username', sa.String(50)),
+        sa.Column('email', sa.String(100)),
+        sa.Column('hashed_password', sa.String(255)),
+        sa.Column('name', sa.String(100)),
+        sa.Column('age', sa.Integer()),
+        sa.Column('phone_number', sa.String(20)),
+        sa.Column('is_admin', sa.Boolean(), default=False),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'dive_sessions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('date', sa.DateTime()),
+        sa.Column('location', sa.String(100)),
+        sa.Column('max_depth', sa.Float()),
+        sa.Column('duration', sa.Integer()),
+        sa.Column('water_temp', sa.Float()),
+        sa.Column('water_type', sa.String(50)),
+        sa.Column('notes', sa.Text()),
+        sa.Column('depth_data', sa.JSON()),
+        sa.Column('time_data', sa.JSON()),
+        sa.Column('decompression_info', sa.JSON()),
+    )
+    op.create_index('ix_dive_sessions_id', 'dive_sessions', ['id'])
+
+    op.create_table(
+        'depth_records',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('session_id', sa.Integer(), sa.ForeignKey('dive_sessions.id')),
+        sa.Column('timestamp', sa.DateTime()),
+        sa.Column('depth', sa.Float()),
+        sa.Column('temperature', sa.Float()),
+    )
+    op.create_index('ix_depth_records_id', 'depth_records', ['id'])
+
+def downgrade():
+    op.drop_table('depth_records')
+    op.drop_table('dive_sessions')
+    op.drop_table('users')
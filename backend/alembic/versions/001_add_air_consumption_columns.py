@@ -1,7 +1,7 @@
 """add air consumption columns
 
 Revision ID: 001
-Revises: 
+Revises: 000
 Create Date: 2024-04-30 18:00:00.000000
 
 """
@@ -10,7 +10,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = '001'
-down_revision = None
+down_revision = '000'
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,31 @@
+"""add dive search indexes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.search_index import create_search_index, drop_search_index
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Composite indexes for faceted filters
+    op.create_index('ix_dive_sessions_user_date', 'dive_sessions', ['user_id', 'date'])
+    op.create_index('ix_dive_sessions_user_max_depth', 'dive_sessions', ['user_id', 'max_depth'])
+    op.create_index('ix_dive_sessions_user_water_type', 'dive_sessions', ['user_id', 'water_type'])
+    op.create_index('ix_dive_sessions_user_gas_type', 'dive_sessions', ['user_id', 'gas_type'])
+    # Full-text search: tsvector/trigram GIN indexes on PostgreSQL, FTS5 on SQLite
+    create_search_index(op.get_bind())
+
+def downgrade():
+    drop_search_index(op.get_bind())
+    op.drop_index('ix_dive_sessions_user_gas_type', table_name='dive_sessions')
+    op.drop_index('ix_dive_sessions_user_water_type', table_name='dive_sessions')
+    op.drop_index('ix_dive_sessions_user_max_depth', table_name='dive_sessions')
+    op.drop_index('ix_dive_sessions_user_date', table_name='dive_sessions')
@@ -0,0 +1,37 @@
+"""add dive sync tracking
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('dive_sessions', sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.add_column('dive_sessions', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # Existing dives count as changed now so clients pick them up on their first sync
+    op.execute("UPDATE dive_sessions SET created_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP")
+    op.create_index('ix_dive_sessions_user_updated_at', 'dive_sessions', ['user_id', 'updated_at'])
+
+    op.create_table(
+        'dive_tombstones',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('dive_id', sa.Integer()),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('deleted_at', sa.DateTime()),
+    )
+    op.create_index('ix_dive_tombstones_id', 'dive_tombstones', ['id'])
+    op.create_index('ix_dive_tombstones_user_deleted_at', 'dive_tombstones', ['user_id', 'deleted_at'])
+
+def downgrade():
+    op.drop_table('dive_tombstones')
+    op.drop_index('ix_dive_sessions_user_updated_at', table_name='dive_sessions')
+    op.drop_column('dive_sessions', 'updated_at')
+    op.drop_column('dive_sessions', 'created_at')
@@ -0,0 +1,46 @@
+"""depth record storage
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.depth_storage import partition_depth_records
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'depth_record_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('session_id', sa.Integer(), sa.ForeignKey('dive_sessions.id')),
+        sa.Column('bucket_start', sa.DateTime()),
+        sa.Column('bucket_seconds', sa.Integer()),
+        sa.Column('sample_count', sa.Integer()),
+        sa.Column('min_depth', sa.Float()),
+        sa.Column('max_depth', sa.Float()),
+        sa.Column('avg_depth', sa.Float()),
+        sa.Column('avg_temperature', sa.Float()),
+    )
+    op.create_index('ix_depth_record_rollups_id', 'depth_record_rollups', ['id'])
+    op.create_index('ix_depth_record_rollups_session_bucket', 'depth_record_rollups', ['session_id', 'bucket_start'])
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # Monthly range partitions, BRIN on timestamp, (session_id, timestamp) btree
+        partition_depth_records(bind)
+    else:
+        op.create_index('ix_depth_records_session_timestamp', 'depth_records', ['session_id', 'timestamp'])
+
+def downgrade():
+    # Partitioning is kept on downgrade; only the added structures are removed
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_depth_records_timestamp_brin")
+    op.drop_index('ix_depth_records_session_timestamp', table_name='depth_records')
+    op.drop_table('depth_record_rollups')
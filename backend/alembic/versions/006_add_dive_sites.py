@@ -0,0 +1,69 @@
+"""add dive sites
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.geo import normalize_site_name
+from app.search_index import create_search_index
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'dive_sites',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(100)),
+        sa.Column('normalized_name', sa.String(100)),
+        sa.Column('latitude', sa.Float()),
+        sa.Column('longitude', sa.Float()),
+        sa.Column('geohash', sa.String(12)),
+    )
+    op.create_index('ix_dive_sites_id', 'dive_sites', ['id'])
+    op.create_index('ix_dive_sites_normalized_name', 'dive_sites', ['normalized_name'])
+    op.create_index('ix_dive_sites_geohash', 'dive_sites', ['geohash'])
+
+    with op.batch_alter_table('dive_sessions') as batch_op:
+        batch_op.add_column(sa.Column('site_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_dive_sessions_site_id', 'dive_sites', ['site_id'], ['id'])
+        batch_op.create_index('ix_dive_sessions_site_id', ['site_id'])
+    # Batch mode rebuilds dive_sessions on SQLite, dropping its search triggers
+    create_search_index(op.get_bind())
+
+    # Backfill: one site per distinct normalized location
+    bind = op.get_bind()
+    sites = {}
+    locations = bind.execute(sa.text(
+        "SELECT DISTINCT location FROM dive_sessions WHERE location IS NOT NULL"
+    )).fetchall()
+    for (location,) in locations:
+        normalized = normalize_site_name(location)
+        if not normalized:
+            continue
+        if normalized not in sites:
+            bind.execute(
+                sa.text("INSERT INTO dive_sites (name, normalized_name) VALUES (:name, :normalized)"),
+                {"name": " ".join(location.split()), "normalized": normalized}
+            )
+            sites[normalized] = bind.execute(
+                sa.text("SELECT id FROM dive_sites WHERE normalized_name = :normalized"),
+                {"normalized": normalized}
+            ).scalar()
+        bind.execute(
+            sa.text("UPDATE dive_sessions SET site_id = :site_id WHERE location = :location"),
+            {"site_id": sites[normalized], "location": location}
+        )
+
+def downgrade():
+    with op.batch_alter_table('dive_sessions') as batch_op:
+        batch_op.drop_index('ix_dive_sessions_site_id')
+        batch_op.drop_constraint('fk_dive_sessions_site_id', type_='foreignkey')
+        batch_op.drop_column('site_id')
+    create_search_index(op.get_bind())
+    op.drop_table('dive_sites')
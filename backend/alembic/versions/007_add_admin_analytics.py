@@ -0,0 +1,22 @@
+"""add admin analytics summaries
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.analytics import create_summary_views, drop_summary_views
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Materialized views on PostgreSQL, summary tables on SQLite; populated on creation
+    create_summary_views(op.get_bind())
+
+def downgrade():
+    drop_summary_views(op.get_bind())
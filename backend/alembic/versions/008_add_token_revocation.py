@@ -0,0 +1,28 @@
+"""add token revocation denylist
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('jti', sa.String(36), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('expires_at', sa.DateTime()),
+        sa.Column('revoked_at', sa.DateTime()),
+    )
+    op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'])
+    op.create_index('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'])
+
+def downgrade():
+    op.drop_table('revoked_tokens')
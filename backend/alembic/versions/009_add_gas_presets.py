@@ -0,0 +1,47 @@
+"""add gas presets
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.search_index import create_search_index
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'gas_presets',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('name', sa.String(100)),
+        sa.Column('tank_volume', sa.Float()),
+        sa.Column('working_pressure', sa.Integer()),
+        sa.Column('reserve_pressure', sa.Integer()),
+        sa.Column('oxygen_percentage', sa.Float()),
+        sa.Column('max_ppo2', sa.Float()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_gas_presets_id', 'gas_presets', ['id'])
+    op.create_index('ix_gas_presets_user_id', 'gas_presets', ['user_id'])
+
+    with op.batch_alter_table('dive_sessions') as batch_op:
+        batch_op.add_column(sa.Column('preset_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_dive_sessions_preset_id', 'gas_presets', ['preset_id'], ['id'])
+        batch_op.create_index('ix_dive_sessions_preset_id', ['preset_id'])
+    # Batch mode rebuilds dive_sessions on SQLite, dropping its search triggers
+    create_search_index(op.get_bind())
+
+def downgrade():
+    with op.batch_alter_table('dive_sessions') as batch_op:
+        batch_op.drop_index('ix_dive_sessions_preset_id')
+        batch_op.drop_constraint('fk_dive_sessions_preset_id', type_='foreignkey')
+        batch_op.drop_column('preset_id')
+    create_search_index(op.get_bind())
+    op.drop_table('gas_presets')
@@ -0,0 +1,48 @@
+"""unique dive sites by name and location
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+# app.utils.geo.SITE_CELL_PRECISION when this revision was written
+SITE_CELL_PRECISION = 7
+
+def upgrade():
+    op.add_column('dive_sites', sa.Column('site_cell', sa.String(12), nullable=False, server_default=''))
+    bind = op.get_bind()
+    bind.execute(sa.text(
+        "UPDATE dive_sites SET site_cell = substr(geohash, 1, :precision) WHERE geohash IS NOT NULL"
+    ), {"precision": SITE_CELL_PRECISION})
+
+    # Only rows sharing a name and a cell collide. Those are at most ~0.2 km apart, inside
+    # the 0.5 km radius resolve_site already treated as one site (or are both unlocated), so
+    # they are duplicates left by concurrent inserts. Same-named sites elsewhere stay distinct.
+    duplicates = bind.execute(sa.text(
+        "SELECT normalized_name, site_cell, min(id) FROM dive_sites "
+        "GROUP BY normalized_name, site_cell HAVING count(*) > 1"
+    )).fetchall()
+    for normalized, cell, keep_id in duplicates:
+        params = {"normalized": normalized, "cell": cell, "keep_id": keep_id}
+        bind.execute(sa.text(
+            "UPDATE dive_sessions SET site_id = :keep_id WHERE site_id IN (SELECT id FROM dive_sites "
+            "WHERE normalized_name = :normalized AND site_cell = :cell AND id != :keep_id)"
+        ), params)
+        bind.execute(sa.text(
+            "DELETE FROM dive_sites WHERE normalized_name = :normalized AND site_cell = :cell AND id != :keep_id"
+        ), params)
+
+    op.create_index('ix_dive_sites_name_cell', 'dive_sites', ['normalized_name', 'site_cell'], unique=True)
+
+def downgrade():
+    op.drop_index('ix_dive_sites_name_cell', table_name='dive_sites')
+    with op.batch_alter_table('dive_sites') as batch_op:
+        batch_op.drop_column('site_cell')
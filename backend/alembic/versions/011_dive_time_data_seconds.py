@@ -0,0 +1,58 @@
+"""store dive time_data as elapsed seconds
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+dive_sessions = sa.table('dive_sessions', sa.column('id', sa.Integer), sa.column('time_data', sa.JSON))
+
+def _to_seconds(value):
+    if isinstance(value, str):
+        minutes, seconds = value.split(':')
+        return int(minutes) * 60 + int(seconds)
+    return value
+
+def _to_label(value):
+    return value if isinstance(value, str) else '%d:%02d' % divmod(int(value), 60)
+
+def _convert(convert):
+    # Serialization formats the m:ss labels now, so the API output is unchanged and
+    # updated_at is left alone
+    bind = op.get_bind()
+    update = dive_sessions.update().where(dive_sessions.c.id == sa.bindparam('dive_id')).values(
+        time_data=sa.bindparam('converted')
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select([dive_sessions.c.id, dive_sessions.c.time_data])
+            .where(dive_sessions.c.id > last_id)
+            .order_by(dive_sessions.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            return
+        changed = [
+            {"dive_id": dive_id, "converted": [convert(value) for value in time_data]}
+            for dive_id, time_data in rows if time_data
+        ]
+        if changed:
+            bind.execute(update, changed)
+        last_id = rows[-1][0]
+
+def upgrade():
+    _convert(_to_seconds)
+
+def downgrade():
+    _convert(_to_label)
@@ -0,0 +1,143 @@
+import time
+from datetime import datetime
+from sqlalchemy import event, text
+from .models import DiveSession
+
+# Arbitrary key for pg_try_advisory_xact_lock; only one replica refreshes at a time
+ANALYTICS_LOCK_ID = 80421041
+
+# Fleet-wide summaries for admin dashboards. Each entry is (name, select, unique key columns).
+# The selects take dialect-specific {day}, {month} and {depth_bucket} expressions; key columns are never NULL so
+# PostgreSQL can refresh the materialized views CONCURRENTLY against their unique index.
+SUMMARY_VIEWS = [
+    ("analytics_daily_dives", """
+        SELECT {day} AS day,
+               count(*) AS dives,
+               count(DISTINCT user_id) AS divers,
+               avg(max_depth) AS avg_max_depth,
+               coalesce(sum(duration), 0) AS total_duration
+        FROM dive_sessions
+        WHERE date IS NOT NULL
+        GROUP BY 1
+    """, ["day"]),
+    ("analytics_depth_distribution", """
+        SELECT {month} AS month,
+               {depth_bucket} AS depth_bucket,
+               count(*) AS dives
+        FROM dive_sessions
+        WHERE date IS NOT NULL AND max_depth IS NOT NULL
+        GROUP BY 1, 2
+    """, ["month", "depth_bucket"]),
+    ("analytics_gas_distribution", """
+        SELECT {month} AS month,
+               coalesce(gas_type, 'Air') AS gas_type,
+               coalesce(oxygen_percentage, 21.0) AS oxygen_percentage,
+               count(*) AS dives
+        FROM dive_sessions
+        WHERE date IS NOT NULL
+        GROUP BY 1, 2, 3
+    """, ["month", "gas_type", "oxygen_percentage"]),
+    ("analytics_user_activity", """
+        SELECT user_id,
+               count(*) AS dives,
+               min(date) AS first_dive,
+               max(date) AS last_dive
+        FROM dive_sessions
+        WHERE user_id IS NOT NULL
+        GROUP BY 1
+    """, ["user_id"]),
+]
+
+DEPTH_BUCKET_METERS = 5
+
+REFRESH_LOG_DDL = """
+    CREATE TABLE IF NOT EXISTS analytics_refreshes (
+        view_name VARCHAR(64) PRIMARY KEY,
+        refreshed_at TIMESTAMP,
+        duration_ms INTEGER
+    )
+"""
+
+def _expressions(dialect: str) -> dict:
+    if dialect == "postgresql":
+        return {
+            "day": "CAST(date AS DATE)",
+            "month": "CAST(date_trunc('month', date) AS DATE)",
+            "depth_bucket": f"CAST(floor(max_depth / {DEPTH_BUCKET_METERS}) * {DEPTH_BUCKET_METERS} AS INTEGER)",
+        }
+    return {
+        "day": "date(date)",
+        "month": "date(date, 'start of month')",
+        "depth_bucket": f"CAST(max_depth / {DEPTH_BUCKET_METERS} AS INTEGER) * {DEPTH_BUCKET_METERS}",
+    }
+
+def _select(dialect: str, sql: str) -> str:
+    return sql.format(**_expressions(dialect))
+
+def create_summary_views(connection):
+    """
+    Create the analytics summaries: materialized views on PostgreSQL, plain
+    tables on SQLite, which has no materialized views.
+    """
+    dialect = connection.dialect.name
+    connection.execute(text(REFRESH_LOG_DDL))
+    for name, sql, keys in SUMMARY_VIEWS:
+        select = _select(dialect, sql)
+        if dialect == "postgresql":
+            connection.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {select}"))
+        else:
+            connection.execute(text(f"CREATE TABLE IF NOT EXISTS {name} AS {select}"))
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{name}_key ON {name} ({', '.join(keys)})"
+        ))
+
+def drop_summary_views(connection):
+    """Drop the structures created by create_summary_views."""
+    kind = "MATERIALIZED VIEW" if connection.dialect.name == "postgresql" else "TABLE"
+    for name, _, _ in SUMMARY_VIEWS:
+        connection.execute(text(f"DROP {kind} IF EXISTS {name}"))
+    connection.execute(text("DROP TABLE IF EXISTS analytics_refreshes"))
+
+def refresh_summary_views(connection) -> dict:
+    """
+    Recompute every summary inside the caller's transaction. Returns milliseconds
+    spent per view, or None if another process is already refreshing.
+    On PostgreSQL the refresh is CONCURRENTLY, so dashboards keep reading the
+    previous contents while it runs.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ANALYTICS_LOCK_ID}
+        ).scalar()
+        if not acquired:
+            return None
+
+    timings = {}
+    for name, sql, _ in SUMMARY_VIEWS:
+        start = time.perf_counter()
+        if dialect == "postgresql":
+            connection.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
+        else:
+            connection.execute(text(f"DELETE FROM {name}"))
+            connection.execute(text(f"INSERT INTO {name} {_select(dialect, sql)}"))
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        connection.execute(text("DELETE FROM analytics_refreshes WHERE view_name = :name"), {"name": name})
+        connection.execute(
+            text("INSERT INTO analytics_refreshes (view_name, refreshed_at, duration_ms) "
+                 "VALUES (:name, :refreshed_at, :duration_ms)"),
+            {"name": name, "refreshed_at": datetime.utcnow(), "duration_ms": duration_ms}
+        )
+        timings[name] = duration_ms
+    return timings
+
+def _after_create(target, connection, **kw):
+    create_summary_views(connection)
+
+def _before_drop(target, connection, **kw):
+    # The materialized views depend on dive_sessions, so PostgreSQL refuses to drop it first
+    drop_summary_views(connection)
+
+# Keep create_all() and drop_all() (used by init_db) in line with the migrations
+event.listen(DiveSession.__table__, "after_create", _after_create)
+event.listen(DiveSession.__table__, "before_drop", _before_drop)
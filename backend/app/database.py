@@ -1,12 +1,35 @@
+import os
+import time
+from fastapi import Request, Response
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "postgresql://diver:diving123@db:5432/diving_db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://diver:diving123@db:5432/diving_db")
+# Optional read replica for reports, exports and listings; defaults to the primary
+SQLALCHEMY_READ_DATABASE_URL = os.getenv("DATABASE_READ_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+def _engine_options(url: str) -> dict:
+    # SQLite (local testing) connections are used across the threadpool FastAPI runs dependencies in
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {}
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options(SQLALCHEMY_DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+read_engine = (
+    create_engine(SQLALCHEMY_READ_DATABASE_URL, **_engine_options(SQLALCHEMY_READ_DATABASE_URL))
+    if SQLALCHEMY_READ_DATABASE_URL else engine
+)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Clients that wrote within this window keep reading from the primary so they
+# see their own writes despite replication lag
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
 Base = declarative_base()
 
 def get_db():
@@ -14,4 +37,37 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def mark_write(response: Response):
+    """Record a write on the response so the client's next reads go to the primary."""
+    written_at = f"{time.time():.3f}"
+    response.set_cookie(
+        LAST_WRITE_COOKIE,
+        written_at,
+        max_age=max(1, int(READ_YOUR_WRITES_SECONDS)),
+        httponly=True,
+        samesite="lax"
+    )
+    response.headers[LAST_WRITE_HEADER] = written_at
+
+def _wrote_recently(request: Request) -> bool:
+    # Header for clients that echo it back (the SPA does, cross-origin), cookie for same-origin browsers
+    value = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    if not value:
+        return False
+    try:
+        return time.time() - float(value) < READ_YOUR_WRITES_SECONDS
+    except ValueError:
+        return False
+
+def get_read_db(request: Request):
+    """Session for read-only endpoints: the replica, or the primary right after a write."""
+    if read_engine is engine or _wrote_recently(request):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
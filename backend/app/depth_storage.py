@@ -0,0 +1,127 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, text
+
+logger = logging.getLogger(__name__)
+
+# Raw samples of dives older than this are compacted into depth_record_rollups
+RAW_RETENTION_DAYS = int(os.getenv("DEPTH_RAW_RETENTION_DAYS", "90"))
+ROLLUP_BUCKET_SECONDS = int(os.getenv("DEPTH_ROLLUP_BUCKET_SECONDS", "10"))
+# Monthly partitions are created this far ahead so new samples never land in the default partition
+PARTITION_MONTHS_AHEAD = 3
+
+def _month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+def _next_month(moment: datetime) -> datetime:
+    return datetime(moment.year + moment.month // 12, moment.month % 12 + 1, 1)
+
+def is_partitioned(connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'depth_records'::regclass)"
+    )).scalar()
+
+def ensure_partitions(connection, start: datetime = None, end: datetime = None):
+    """Create monthly depth_records partitions covering [start, end], by default now to a few months ahead."""
+    if not is_partitioned(connection):
+        return
+    month = _month_start(start or datetime.utcnow())
+    end = end or datetime.utcnow() + timedelta(days=31 * PARTITION_MONTHS_AHEAD)
+    while month <= end:
+        following = _next_month(month)
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS depth_records_y{month:%Y}m{month:%m} PARTITION OF depth_records "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{following:%Y-%m-%d}')"
+        ))
+        month = following
+
+def partition_depth_records(connection):
+    """
+    Rebuild depth_records on PostgreSQL as a table range-partitioned by month on
+    timestamp, with a BRIN index on timestamp and a (session_id, timestamp) btree.
+    Samples without a timestamp cannot be partitioned and are moved to depth_records_untimed.
+    """
+    connection.execute(text("ALTER TABLE depth_records RENAME TO depth_records_unpartitioned"))
+    # Keep the id sequence alive when the old table is dropped
+    connection.execute(text("ALTER SEQUENCE depth_records_id_seq OWNED BY NONE"))
+    connection.execute(text("""
+        CREATE TABLE depth_records (
+            id INTEGER NOT NULL DEFAULT nextval('depth_records_id_seq'),
+            session_id INTEGER REFERENCES dive_sessions(id),
+            timestamp TIMESTAMP NOT NULL,
+            depth DOUBLE PRECISION,
+            temperature DOUBLE PRECISION,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """))
+    connection.execute(text("CREATE TABLE depth_records_default PARTITION OF depth_records DEFAULT"))
+
+    oldest, newest, untimed = connection.execute(text(
+        "SELECT min(timestamp), max(timestamp), count(*) - count(timestamp) FROM depth_records_unpartitioned"
+    )).first()
+    # A partition for every month from the oldest sample on, so none land in the default
+    # partition: PostgreSQL refuses to attach a month the default partition has rows for
+    if oldest is not None:
+        ensure_partitions(connection, start=oldest, end=max(newest, datetime.utcnow()))
+    ensure_partitions(connection)
+
+    connection.execute(text("""
+        INSERT INTO depth_records (id, session_id, timestamp, depth, temperature)
+        SELECT id, session_id, timestamp, depth, temperature
+        FROM depth_records_unpartitioned WHERE timestamp IS NOT NULL
+    """))
+    if untimed:
+        connection.execute(text("""
+            CREATE TABLE depth_records_untimed AS
+            SELECT * FROM depth_records_unpartitioned WHERE timestamp IS NULL
+        """))
+        logger.warning(
+            "Moved %d depth samples without a timestamp to depth_records_untimed; "
+            "they are not served by the profile endpoints", untimed
+        )
+    connection.execute(text("DROP TABLE depth_records_unpartitioned"))
+    connection.execute(text("ALTER SEQUENCE depth_records_id_seq OWNED BY depth_records.id"))
+    connection.execute(text("CREATE INDEX ix_depth_records_session_timestamp ON depth_records (session_id, timestamp)"))
+    connection.execute(text("CREATE INDEX ix_depth_records_timestamp_brin ON depth_records USING brin (timestamp)"))
+
+def _bucket_expression(dialect: str) -> str:
+    if dialect == "postgresql":
+        return ("to_timestamp(floor(extract(epoch FROM timestamp) / :bucket) * :bucket) "
+                "AT TIME ZONE 'UTC'")
+    return "datetime((CAST(strftime('%s', timestamp) AS INTEGER) / :bucket) * :bucket, 'unixepoch')"
+
+def rollup_old_sessions(connection, batch_size: int = 100, retention_days: int = RAW_RETENTION_DAYS,
+                        bucket_seconds: int = ROLLUP_BUCKET_SECONDS) -> int:
+    """
+    Compact raw samples of up to batch_size dives older than the retention window
+    into bucket summaries and delete the raw rows. Returns the number of dives compacted.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    session_ids = [row[0] for row in connection.execute(text("""
+        SELECT s.id FROM dive_sessions s
+        WHERE s.date < :cutoff
+          AND EXISTS (SELECT 1 FROM depth_records r WHERE r.session_id = s.id)
+        LIMIT :batch_size
+    """), {"cutoff": cutoff, "batch_size": batch_size})]
+    if not session_ids:
+        return 0
+
+    bucket = _bucket_expression(connection.dialect.name)
+    insert_rollups = text(f"""
+        INSERT INTO depth_record_rollups
+            (session_id, bucket_start, bucket_seconds, sample_count, min_depth, max_depth, avg_depth, avg_temperature)
+        SELECT session_id, {bucket}, :bucket, count(*), min(depth), max(depth), avg(depth), avg(temperature)
+        FROM depth_records
+        WHERE session_id IN :session_ids
+        GROUP BY 1, 2
+    """).bindparams(bindparam("session_ids", expanding=True))
+    delete_raw = text(
+        "DELETE FROM depth_records WHERE session_id IN :session_ids"
+    ).bindparams(bindparam("session_ids", expanding=True))
+
+    connection.execute(insert_rollups, {"bucket": bucket_seconds, "session_ids": session_ids})
+    connection.execute(delete_raw, {"session_ids": session_ids})
+    return len(session_ids)
@@ -1,11 +1,56 @@
+import time
+_import_started = time.perf_counter()
+
+import os
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .services import auth, dive, report, export
+from .schema import prepare_schema
+from .middleware.compression import CompressionMiddleware
+from .middleware.rate_limit import RateLimitMiddleware, create_backend
+from .middleware.query_guard import QueryGuardMiddleware, install_query_counter
+from .middleware.profiler import ProfilerMiddleware, admin_from_scope
+from .database import engine, read_engine, LAST_WRITE_HEADER
+from .services import auth, dive, report, export, planner, search, sync, sites, admin, equipment
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
-# Configure CORS
+# Per-request query counts (X-Query-* headers) and N+1 warnings; innermost so it sees only app queries
+if os.getenv("QUERY_GUARD_ENABLED", "false").lower() == "true":
+    install_query_counter(engine)
+    install_query_counter(read_engine)
+    app.add_middleware(
+        QueryGuardMiddleware,
+        warn_count=int(os.getenv("QUERY_GUARD_WARN_COUNT", "20")),
+        repeat_threshold=int(os.getenv("QUERY_GUARD_REPEAT_THRESHOLD", "5")),
+    )
+
+# Compress large listings and exports; trade CPU for bandwidth via the levels below
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024")),
+    gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+)
+
+# Per-user rate limits and concurrency caps for each route group
+if os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true":
+    app.add_middleware(RateLimitMiddleware, backend=create_backend())
+
+# Sampling profiler: with PROFILER_ENABLED=true admins profile a request by sending an X-Profile
+# header; PROFILER_ALL_REQUESTS=true profiles every request (local use). Not installed otherwise.
+if os.getenv("PROFILER_ENABLED", "false").lower() == "true":
+    app.add_middleware(
+        ProfilerMiddleware,
+        output_dir=os.getenv("PROFILER_OUTPUT_DIR", "profiles"),
+        interval_ms=float(os.getenv("PROFILER_INTERVAL_MS", "5")),
+        profile_all=os.getenv("PROFILER_ALL_REQUESTS", "false").lower() == "true",
+        is_allowed=admin_from_scope,
+    )
+
+# Configure CORS (added last so it wraps every other middleware, including 429 responses)
 origins = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -17,19 +62,32 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization", "Accept"],
+    allow_headers=["Content-Type", "Authorization", "Accept", LAST_WRITE_HEADER],
     expose_headers=["*"],
     max_age=3600,
 )
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(dive.router, prefix="/dives", tags=["dives"])
 app.include_router(report.router, prefix="/reports", tags=["reports"])
 app.include_router(export.router, prefix="/exports", tags=["exports"])
+app.include_router(planner.router, prefix="/planner", tags=["planner"])
+app.include_router(search.router, prefix="/search", tags=["search"])
+app.include_router(sync.router, prefix="/sync", tags=["sync"])
+app.include_router(sites.router, prefix="/sites", tags=["sites"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
+app.include_router(equipment.router, prefix="/equipment", tags=["equipment"])
+
+_import_seconds = time.perf_counter() - _import_started
+
+@app.on_event("startup")
+async def on_startup():
+    schema_seconds = prepare_schema()
+    logger.info(
+        "Worker ready: app import %.0f ms, schema preparation %.0f ms",
+        _import_seconds * 1000, schema_seconds * 1000
+    )
 
 @app.get("/")
 async def root():
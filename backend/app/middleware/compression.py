@@ -0,0 +1,182 @@
+import zlib
+from typing import Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Payloads that are already compressed gain nothing from another pass
+DEFAULT_EXCLUDED_MEDIA_TYPES = ("application/pdf", "application/zip", "application/vnd.apache.parquet",
+                                "application/vnd.apache.arrow", "image/")
+
+def parse_accept_encoding(header: str) -> dict:
+    """Parse an Accept-Encoding header into {coding: q-value}."""
+    codings = {}
+    for part in header.split(","):
+        items = part.strip().split(";")
+        coding = items[0].strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in items[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+def choose_encoding(header: str) -> Optional[str]:
+    """Pick the best supported content coding the client accepts."""
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get("*", 0.0)
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for coding in supported:
+        quality = codings.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so streamed parts reach the client immediately."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli or gzip, negotiated from
+    Accept-Encoding. Bodies below minimum_size are sent as-is; streaming
+    responses are compressed chunk by chunk once they pass the threshold,
+    without buffering the whole body.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        excluded_media_types: Tuple[str, ...] = DEFAULT_EXCLUDED_MEDIA_TYPES
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_media_types = excluded_media_types
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+        self.pending = b""
+
+    def _should_skip(self, headers) -> bool:
+        for name, value in headers:
+            if name == b"content-encoding":
+                return True
+            if name == b"content-type":
+                media_type = value.decode("latin-1").lower()
+                if media_type.startswith(self.middleware.excluded_media_types):
+                    return True
+        return False
+
+    def _compressed_headers(self, content_length: Optional[int]):
+        headers = [
+            (name, value) for name, value in self.start_message["headers"]
+            if name not in (b"content-length", b"vary")
+        ]
+        vary = [value for name, value in self.start_message["headers"] if name == b"vary"]
+        vary_value = b", ".join(vary + [b"Accept-Encoding"]) if vary else b"Accept-Encoding"
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"vary", vary_value))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+    async def __call__(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            self.passthrough = self._should_skip(message.get("headers", []))
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            # Hold back leading chunks until the body is known to reach the threshold
+            self.pending += body
+            if not more_body:
+                await self._send_whole(self.pending)
+                return
+            if len(self.pending) < self.middleware.minimum_size:
+                return
+
+            # Streaming response: length is unknown up front, compress as chunks arrive
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            self.start_message["headers"] = self._compressed_headers(None)
+            await self.send(self.start_message)
+            body, self.pending = self.pending, b""
+
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _send_whole(self, body: bytes):
+        # Whole body known: compress only when it is worth it
+        if len(body) < self.middleware.minimum_size:
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+        compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        compressed = compressor.compress(body) + compressor.finish()
+        self.start_message["headers"] = self._compressed_headers(len(compressed))
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
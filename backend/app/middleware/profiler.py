@@ -0,0 +1,159 @@
+import os
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+# Leaf functions of threads that are parked rather than working (idle event loop, idle pool workers)
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_LEAVES
+
+class StackSampler:
+    """
+    Samples the stacks of every other thread at a fixed interval from a daemon thread
+    and aggregates them in collapsed-stack form ("root;...;leaf count"), which
+    flamegraph.pl, speedscope and most flame graph viewers read directly. The sampler
+    needs the GIL, so CPU-bound stretches are sampled at roughly the interpreter's
+    switch interval (5 ms) at best.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own or _is_idle(frame):
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(ident, str(ident)))
+            self.stacks[";".join(reversed(labels))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as output:
+            for stack, count in self.stacks.most_common():
+                output.write(f"{stack} {count}\n")
+
+class ProfilerMiddleware:
+    """
+    Opt-in sampling profiler. A request is profiled when `profile_all` is set or it
+    carries an X-Profile header and `is_allowed(scope)` approves it (admins only);
+    every other request pays a single header lookup. The collapsed stacks land in
+    output_dir, named in the X-Profile-File response header. Samples cover all threads
+    of the worker, so concurrent requests show up too: profile on a quiet worker.
+    """
+
+    def __init__(self, app, output_dir: str, interval_ms: float = 5, profile_all: bool = False,
+                 is_allowed=None):
+        self.app = app
+        self.output_dir = Path(output_dir)
+        self.interval = interval_ms / 1000
+        self.profile_all = profile_all
+        self.is_allowed = is_allowed
+        # One profile at a time per worker; samplers would otherwise record each other's requests
+        self._busy = threading.Lock()
+
+    def _wants_profile(self, scope) -> bool:
+        if self.profile_all:
+            return True
+        if not any(name == PROFILE_HEADER.encode() for name, _ in scope.get("headers", [])):
+            return False
+        return self.is_allowed is None or self.is_allowed(scope)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        slug = scope["path"].strip("/").replace("/", "-") or "root"
+        path = self.output_dir / f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{scope['method']}-{slug}.folded"
+
+        async def send_with_file(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-file", path.name.encode()),
+                ]
+            await send(message)
+
+        sampler = StackSampler(self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_file)
+        finally:
+            sampler.stop()
+            self._busy.release()
+            sampler.write(path)
+            logger.info(
+                "Profiled %s %s: %.0f ms, %d samples -> %s",
+                scope["method"], scope["path"], (time.perf_counter() - started) * 1000, sampler.samples, path
+            )
+
+def admin_from_scope(scope) -> bool:
+    """Whether the request's bearer token belongs to an admin; only runs for X-Profile requests."""
+    from jose import jwt, JWTError
+    from ..database import SessionLocal
+    from ..models import User
+    from ..services.auth import SECRET_KEY, ALGORITHM, is_revoked
+
+    authorization = dict(scope.get("headers", [])).get(b"authorization", b"").decode()
+    if not authorization.lower().startswith("bearer "):
+        return False
+    try:
+        payload = jwt.decode(authorization[7:], SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+    if payload.get("type", "access") != "access":
+        return False
+    db = SessionLocal()
+    try:
+        if payload.get("jti") and is_revoked(db, payload["jti"]):
+            return False
+        user: Optional[User] = db.query(User).filter(User.username == payload.get("sub")).first()
+        return bool(user and user.is_admin)
+    finally:
+        db.close()
@@ -0,0 +1,119 @@
+import time
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+class QueryStats:
+    """Queries issued while a request (or an assert_max_queries block) is active."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Identical SQL text differing only in bound parameters, e.g. a lazy load per row
+        self.statements = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def most_repeated(self):
+        """(statement, count) of the most repeated statement, or (None, 0)."""
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+# Set per request; FastAPI's threadpool copies the context, so sync dependencies,
+# handlers and streamed response bodies all record into the same QueryStats
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None:
+        started = conn.info["query_start"].pop()
+        stats.record(statement, time.perf_counter() - started)
+
+def install_query_counter(engine):
+    """Attach the counting hooks to an engine; queries outside a tracked scope cost one ContextVar lookup."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+@contextmanager
+def track_queries():
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def assert_max_queries(max_count: int, max_repeats: Optional[int] = None):
+    """
+    Fail with AssertionError if the block issues more than max_count queries, or repeats
+    one statement more than max_repeats times (the N+1 signature). The engines must
+    have install_query_counter applied.
+    """
+    with track_queries() as stats:
+        yield stats
+    if stats.count > max_count:
+        raise AssertionError(
+            f"{stats.count} queries issued, budget is {max_count}:\n" +
+            "\n".join(f"  {count}x {statement}" for statement, count in stats.statements.most_common())
+        )
+    statement, repeats = stats.most_repeated()
+    if max_repeats is not None and repeats > max_repeats:
+        raise AssertionError(f"Statement repeated {repeats} times (limit {max_repeats}), likely N+1:\n  {statement}")
+
+class QueryGuardMiddleware:
+    """
+    Counts the queries of each request, reports them in X-Query-Count, X-Query-Time-Ms
+    and X-Query-Max-Repeats, and logs requests that exceed the count budget or repeat
+    one statement often enough to look like N+1 loading. Headers are sent before a
+    streamed body, so they only cover the queries issued up to that point.
+    """
+
+    def __init__(self, app, warn_count: int = 20, repeat_threshold: int = 5):
+        self.app = app
+        self.warn_count = warn_count
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_counts(message):
+            if message["type"] == "http.response.start":
+                _, repeats = stats.most_repeated()
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-query-count", str(stats.count).encode()),
+                    (b"x-query-time-ms", f"{stats.seconds * 1000:.1f}".encode()),
+                    (b"x-query-max-repeats", str(repeats).encode()),
+                ]
+            await send(message)
+
+        with track_queries() as stats:
+            await self.app(scope, receive, send_with_counts)
+
+        statement, repeats = stats.most_repeated()
+        if repeats >= self.repeat_threshold:
+            logger.warning(
+                "Possible N+1 on %s %s: statement repeated %d times: %s",
+                scope["method"], scope["path"], repeats, statement[:200]
+            )
+        elif stats.count > self.warn_count:
+            logger.warning(
+                "%s %s issued %d queries (%.1f ms)",
+                scope["method"], scope["path"], stats.count, stats.seconds * 1000
+            )
@@ -0,0 +1,270 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from fastapi.responses import ORJSONResponse
+from starlette.requests import Request
+from jose import jwt, JWTError
+from ..services.auth import SECRET_KEY, ALGORITHM
+
+@dataclass
+class RouteLimit:
+    rate: float          # Tokens refilled per second
+    burst: int           # Bucket capacity
+    max_concurrent: int  # Requests a single user may have in flight
+
+# Route groups are the first path segment of the mounted routers, except that "auth"
+# covers only CREDENTIAL_PATHS (see route_group)
+DEFAULT_LIMITS = {
+    "auth": RouteLimit(rate=10 / 60, burst=10, max_concurrent=2),
+    "dives": RouteLimit(rate=20, burst=40, max_concurrent=8),
+    "reports": RouteLimit(rate=2, burst=10, max_concurrent=2),
+    "exports": RouteLimit(rate=6 / 60, burst=3, max_concurrent=1),
+}
+
+def load_limits() -> Dict[str, RouteLimit]:
+    """
+    Default limits, overridable per group with RATE_LIMIT_<GROUP>="<per minute>,<burst>,<concurrency>",
+    e.g. RATE_LIMIT_EXPORTS="6,3,1".
+    """
+    limits = dict(DEFAULT_LIMITS)
+    for group in limits:
+        value = os.getenv(f"RATE_LIMIT_{group.upper()}")
+        if value:
+            per_minute, burst, concurrency = value.split(",")
+            limits[group] = RouteLimit(rate=float(per_minute) / 60, burst=int(burst), max_concurrent=int(concurrency))
+    return limits
+
+class MemoryBackend:
+    """Per-process backend. Runs on the worker's event loop, so no locking is needed."""
+
+    # Idle buckets are pruned once this many keys are tracked
+    MAX_BUCKETS = 10000
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._in_flight: Dict[str, int] = {}
+
+    async def take_token(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        if len(self._buckets) > self.MAX_BUCKETS:
+            self._prune(now)
+        tokens, updated = self._buckets.get(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - updated) * rate)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return True, 0.0
+        self._buckets[key] = (tokens, now)
+        return False, (1 - tokens) / rate
+
+    def _prune(self, now: float, idle_seconds: float = 3600):
+        # Buckets idle this long have refilled for any practical limit
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if now - bucket[1] < idle_seconds
+        }
+
+    async def acquire_slot(self, key: str, limit: int) -> bool:
+        count = self._in_flight.get(key, 0)
+        if count >= limit:
+            return False
+        self._in_flight[key] = count + 1
+        return True
+
+    async def release_slot(self, key: str):
+        count = self._in_flight.get(key, 0) - 1
+        if count > 0:
+            self._in_flight[key] = count
+        else:
+            self._in_flight.pop(key, None)
+
+# Token bucket evaluated atomically on the shared store
+_TOKEN_BUCKET_SCRIPT = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens') or ARGV[2])
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated') or ARGV[3])
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+tokens = math.min(burst, tokens + (now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+class RedisBackend:
+    """
+    Backend shared by all workers and replicas. Takes any asyncio Redis-compatible
+    client (redis.asyncio.Redis, or a local stand-in such as fakeredis in tests).
+    """
+
+    # In-flight counters expire so a crashed worker cannot leak slots forever
+    SLOT_TTL_SECONDS = 300
+
+    def __init__(self, client, prefix: str = "ratelimit"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take_token(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        allowed, tokens = await self.client.eval(
+            _TOKEN_BUCKET_SCRIPT, 1, f"{self.prefix}:bucket:{key}", rate, burst, time.time()
+        )
+        if int(allowed):
+            return True, 0.0
+        return False, (1 - float(tokens)) / rate
+
+    async def acquire_slot(self, key: str, limit: int) -> bool:
+        slot_key = f"{self.prefix}:slots:{key}"
+        count = await self.client.incr(slot_key)
+        await self.client.expire(slot_key, self.SLOT_TTL_SECONDS)
+        if count > limit:
+            await self.client.decr(slot_key)
+            return False
+        return True
+
+    async def release_slot(self, key: str):
+        await self.client.decr(f"{self.prefix}:slots:{key}")
+
+def create_backend():
+    """
+    Build the backend selected by RATE_LIMIT_BACKEND (memory or redis).
+
+    The memory backend keeps its buckets per worker process. Under gunicorn.conf.py,
+    which starts WEB_CONCURRENCY workers (one per core by default), every limit is
+    effectively multiplied by the worker count, and by the number of replicas. Set
+    RATE_LIMIT_BACKEND=redis with REDIS_URL wherever more than one worker serves traffic.
+    """
+    backend = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    if backend == "memory":
+        return MemoryBackend()
+    if backend == "redis":
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package")
+        return RedisBackend(redis_asyncio.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+# Endpoints that check a password or create an account. The rest of /auth (me, refresh,
+# logout) is called with tokens the server issued and is not throttled.
+CREDENTIAL_PATHS = {"/auth/token", "/auth/register"}
+# Larger credential bodies are not parsed for a username and are keyed by address alone
+MAX_CREDENTIAL_BODY = 16 * 1024
+MAX_USERNAME_LENGTH = 100
+
+def route_group(path: str) -> Optional[str]:
+    group = path.lstrip("/").split("/", 1)[0]
+    if group == "auth" and path.rstrip("/") not in CREDENTIAL_PATHS:
+        return None
+    return group
+
+def client_address(scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+async def credential_identity(scope, body: bytes) -> str:
+    """Client address plus the username a login or registration is for."""
+    username = ""
+    if len(body) <= MAX_CREDENTIAL_BODY:
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+        request = Request(scope, receive)
+        try:
+            if request.headers.get("content-type", "").startswith("application/json"):
+                data = await request.json()
+                value = data.get("username") if isinstance(data, dict) else None
+            else:
+                value = (await request.form()).get("username")
+        except Exception:
+            value = None
+        if isinstance(value, str):
+            username = value.strip().lower()[:MAX_USERNAME_LENGTH]
+    return f"ip:{client_address(scope)}:username:{username}"
+
+async def read_body(receive) -> Tuple[bytes, list]:
+    """Read the whole request body; returns it with the messages to replay downstream."""
+    body = b""
+    messages = []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            break
+    return body, messages
+
+def request_identity(scope) -> str:
+    """Identify the caller by token subject, falling back to the client address."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    subject = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+                except JWTError:
+                    subject = None
+                if subject:
+                    return f"user:{subject}"
+            break
+    return f"ip:{client_address(scope)}"
+
+class RateLimitMiddleware:
+    """Token-bucket rate limiting plus a per-user concurrency cap for each route group."""
+
+    def __init__(self, app, backend=None, limits: Optional[Dict[str, RouteLimit]] = None):
+        self.app = app
+        self.backend = backend or MemoryBackend()
+        self.limits = limits if limits is not None else load_limits()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        group = route_group(scope["path"])
+        limit = self.limits.get(group) if group else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if group == "auth":
+            # Credentials arrive without a token, so key on the address and the account
+            # targeted; the body is buffered and replayed to the endpoint
+            body, messages = await read_body(receive)
+            identity = await credential_identity(scope, body)
+            downstream = receive
+
+            async def receive():
+                return messages.pop(0) if messages else await downstream()
+        else:
+            identity = request_identity(scope)
+        key = f"{group}:{identity}"
+        allowed, retry_after = await self.backend.take_token(key, limit.rate, limit.burst)
+        if not allowed:
+            response = ORJSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, round(retry_after)))}
+            )
+            await response(scope, receive, send)
+            return
+
+        if not await self.backend.acquire_slot(key, limit.max_concurrent):
+            response = ORJSONResponse(
+                {"detail": "Too many concurrent requests"},
+                status_code=429,
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await self.backend.release_slot(key)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 from pydantic import BaseModel, validator
@@ -42,6 +42,18 @@ class DiveBase(BaseModel):
     helium_percentage: Optional[float] = 0.0  # Default to 0
     gas_type: Optional[GasType] = GasType.AIR
 
+    @validator('max_depth')
+    def validate_max_depth(cls, v):
+        if v <= 0:
+            raise ValueError('Max depth must be greater than 0')
+        return v
+
+    @validator('duration')
+    def validate_duration(cls, v):
+        if v <= 0:  # Air consumption is per minute of dive time
+            raise ValueError('Duration must be greater than 0')
+        return v
+
     @validator('start_pressure')
     def validate_start_pressure(cls, v):
         if v is not None and (v < 0 or v > 300):  # Most tanks max pressure is 300 bar
@@ -93,15 +105,141 @@ class DiveBase(BaseModel):
                     raise ValueError('Gas percentages must sum to 100%')
         return v
 
+class DiveLevel(BaseModel):
+    depth: float
+    duration: int  # Minutes spent at this depth
+
 class DiveCreate(DiveBase):
-    pass
+    # Optional profile planning inputs, used to generate depth_data/time_data
+    levels: Optional[List[DiveLevel]] = None  # Multi-level dives, defaults to a single level at max_depth
+    descent_rate: Optional[float] = None  # m/min
+    ascent_rate: Optional[float] = None   # m/min
+    # Optional site coordinates, used to match the location to a deduplicated dive site
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    # Optional gas preset; fills tank and gas fields the payload leaves unset
+    preset_id: Optional[int] = None
+
+    @validator('levels')
+    def validate_levels(cls, v, values):
+        if v is not None:
+            if not v:
+                raise ValueError('levels must not be empty')
+            if 'max_depth' in values and any(level.depth > values['max_depth'] for level in v):
+                raise ValueError('Level depth cannot exceed max depth')
+            if any(level.depth <= 0 or level.duration < 0 for level in v):
+                raise ValueError('Levels must have a positive depth and non-negative duration')
+        return v
+
+    @validator('descent_rate', 'ascent_rate')
+    def validate_rate(cls, v, field):
+        if v is not None and v <= 0:
+            raise ValueError(f'{field.name} must be greater than 0')
+        return v
+
+    @validator('latitude')
+    def validate_latitude(cls, v):
+        if v is not None and (v < -90 or v > 90):
+            raise ValueError('Latitude must be between -90 and 90')
+        return v
+
+    @validator('longitude', always=True)
+    def validate_longitude(cls, v, values):
+        if v is not None and (v < -180 or v > 180):
+            raise ValueError('Longitude must be between -180 and 180')
+        if (v is None) != (values.get('latitude') is None):
+            raise ValueError('Latitude and longitude must be given together')
+        return v
+
+# Fields of DiveCreate that drive profile generation or site matching and are not stored on DiveSession
+PROFILE_PLAN_FIELDS = {'levels', 'descent_rate', 'ascent_rate'}
+SITE_FIELDS = {'latitude', 'longitude'}
+
+class DiveSite(Base):
+    # Deduplicated dive sites shared by all users; geohash drives the nearby-site lookup
+    __tablename__ = "dive_sites"
+    # A site is its name plus its location: same-named sites elsewhere stay distinct
+    __table_args__ = (
+        Index("ix_dive_sites_name_cell", "normalized_name", "site_cell", unique=True),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100))
+    normalized_name = Column(String(100), index=True)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    geohash = Column(String(12), index=True)
+    site_cell = Column(String(12), nullable=False, default="", server_default="")  # See utils.geo.site_cell
+
+class GasPreset(Base):
+    # A diver's tank and gas. Dives copy its values when logged, so editing a preset leaves past dives alone
+    __tablename__ = "gas_presets"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    name = Column(String(100))
+    tank_volume = Column(Float)  # liters
+    working_pressure = Column(Integer)  # Fill pressure in bar
+    reserve_pressure = Column(Integer, default=50)  # Pressure kept back for the ascent, in bar
+    oxygen_percentage = Column(Float, default=21.0)
+    max_ppo2 = Column(Float, default=1.4)  # bar, sets the maximum operating depth
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class GasPresetCreate(BaseModel):
+    name: str
+    tank_volume: float
+    working_pressure: int
+    reserve_pressure: int = 50
+    oxygen_percentage: float = 21.0
+    max_ppo2: float = 1.4
+
+    @validator('tank_volume')
+    def validate_tank_volume(cls, v):
+        if v <= 0 or v > 20:
+            raise ValueError('Tank volume must be between 0 and 20 liters')
+        return v
+
+    @validator('working_pressure')
+    def validate_working_pressure(cls, v):
+        if v <= 0 or v > 300:
+            raise ValueError('Working pressure must be between 0 and 300 bar')
+        return v
+
+    @validator('reserve_pressure')
+    def validate_reserve_pressure(cls, v, values):
+        if v < 0:
+            raise ValueError('Reserve pressure must not be negative')
+        if 'working_pressure' in values and v >= values['working_pressure']:
+            raise ValueError('Reserve pressure must be below the working pressure')
+        return v
+
+    @validator('oxygen_percentage')
+    def validate_oxygen(cls, v):
+        if v < 21 or v > 40:  # Same recreational limits as DiveBase's Nitrox check
+            raise ValueError('Oxygen percentage must be between 21% and 40%')
+        return v
+
+    @validator('max_ppo2')
+    def validate_max_ppo2(cls, v):
+        if v < 1.0 or v > 1.6:
+            raise ValueError('max_ppo2 must be between 1.0 and 1.6 bar')
+        return v
 
 class DiveSession(Base):
     __tablename__ = "dive_sessions"
+    # Composite indexes serving per-user listings and faceted search filters
+    __table_args__ = (
+        Index("ix_dive_sessions_user_date", "user_id", "date"),
+        Index("ix_dive_sessions_user_max_depth", "user_id", "max_depth"),
+        Index("ix_dive_sessions_user_water_type", "user_id", "water_type"),
+        Index("ix_dive_sessions_user_gas_type", "user_id", "gas_type"),
+        Index("ix_dive_sessions_user_updated_at", "user_id", "updated_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     date = Column(DateTime)
     location = Column(String(100))
+    site_id = Column(Integer, ForeignKey("dive_sites.id"), index=True)
+    preset_id = Column(Integer, ForeignKey("gas_presets.id"), index=True)
     max_depth = Column(Float)
     duration = Column(Integer)
     water_temp = Column(Float)
@@ -112,35 +250,45 @@ class DiveSession(Base):
     tank_volume = Column(Float)
     air_consumption = Column(Float)  # Average air consumption in L/min
     depth_data = Column(JSON)  # Store depth points
-    time_data = Column(JSON)   # Store time points
+    time_data = Column(JSON)   # Elapsed seconds of each depth point, formatted as m:ss on output
     decompression_info = Column(JSON)  # Store decompression profile
     oxygen_percentage = Column(Float, default=21.0)
     nitrogen_percentage = Column(Float, default=79.0)
     helium_percentage = Column(Float, default=0.0)
     gas_type = Column(String(50), default='Air')
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Drives delta sync
 
     def calculate_air_consumption(self):
-        if None in (self.start_pressure, self.end_pressure, self.tank_volume, 
-                   self.max_depth, self.duration, self.water_temp):
-            return None
+        return compute_air_consumption(
+            self.start_pressure, self.end_pressure, self.tank_volume,
+            self.max_depth, self.duration, self.water_temp
+        )
+
+# Columns air_consumption is derived from
+AIR_CONSUMPTION_FIELDS = ('start_pressure', 'end_pressure', 'tank_volume', 'max_depth', 'duration', 'water_temp')
+
+def compute_air_consumption(start_pressure, end_pressure, tank_volume, max_depth, duration, water_temp):
+    if None in (start_pressure, end_pressure, tank_volume, max_depth, duration, water_temp):
+        return None
 
-        # Convert bar to absolute pressure (add 1 atm)
-        avg_depth = self.max_depth / 2  # Approximate average depth
-        pressure_at_depth = (avg_depth / 10) + 1  # Each 10m adds 1 atm
+    # Convert bar to absolute pressure (add 1 atm)
+    avg_depth = max_depth / 2  # Approximate average depth
+    pressure_at_depth = (avg_depth / 10) + 1  # Each 10m adds 1 atm
 
-        # Calculate actual volume of gas used
-        gas_used = (self.start_pressure - self.end_pressure) * self.tank_volume
+    # Calculate actual volume of gas used
+    gas_used = (start_pressure - end_pressure) * tank_volume
 
-        # Apply temperature correction (assuming standard temp is 20°C)
-        temp_kelvin = self.water_temp + 273.15
-        standard_temp_kelvin = 293.15  # 20°C in Kelvin
-        temp_correction = temp_kelvin / standard_temp_kelvin
+    # Apply temperature correction (assuming standard temp is 20°C)
+    temp_kelvin = water_temp + 273.15
+    standard_temp_kelvin = 293.15  # 20°C in Kelvin
+    temp_correction = temp_kelvin / standard_temp_kelvin
 
-        # Calculate actual volume at depth
-        actual_volume = gas_used * pressure_at_depth * temp_correction
+    # Calculate actual volume at depth
+    actual_volume = gas_used * pressure_at_depth * temp_correction
 
-        # Calculate consumption rate in L/min
-        return actual_volume / self.duration
+    # Calculate consumption rate in L/min
+    return actual_volume / duration
 
 class DiveResponse(DiveBase):
     id: int
@@ -152,10 +300,83 @@ class DiveResponse(DiveBase):
     class Config:
         orm_mode = True
 
+class DiveTombstone(Base):
+    # Deleted dives, kept so delta sync can tell clients what to remove
+    __tablename__ = "dive_tombstones"
+    __table_args__ = (
+        Index("ix_dive_tombstones_user_deleted_at", "user_id", "deleted_at"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    dive_id = Column(Integer)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+
+class RevokedToken(Base):
+    # JWT denylist; a row is only needed until the token it revokes would have expired anyway
+    __tablename__ = "revoked_tokens"
+    jti = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    expires_at = Column(DateTime, index=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class DiveUpdate(BaseModel):
+    # Partial update applied to every dive in a batch entry; unset fields are left alone
+    location: Optional[str] = None
+    date: Optional[datetime] = None
+    max_depth: Optional[float] = None
+    duration: Optional[int] = None
+    water_temp: Optional[float] = None
+    water_type: Optional[WaterType] = None
+    notes: Optional[str] = None
+    start_pressure: Optional[int] = None
+    end_pressure: Optional[int] = None
+    tank_volume: Optional[float] = None
+
+    @validator('start_pressure', 'end_pressure')
+    def validate_pressure(cls, v, field):
+        if v is not None and (v < 0 or v > 300):
+            raise ValueError(f'{field.name} must be between 0 and 300 bar')
+        return v
+
+    @validator('tank_volume')
+    def validate_tank_volume(cls, v):
+        if v is not None and (v < 0 or v > 20):
+            raise ValueError('Tank volume must be between 0 and 20 liters')
+        return v
+
+class DiveBatchUpdate(BaseModel):
+    ids: List[int]
+    changes: DiveUpdate
+
+class DiveBatchRequest(BaseModel):
+    updates: List[DiveBatchUpdate] = []
+    deletes: List[int] = []
+
 class DepthRecord(Base):
+    # Raw dive computer samples. On PostgreSQL the table is range-partitioned by month on
+    # timestamp (see app/depth_storage.py); old sessions are compacted into DepthRecordRollup.
     __tablename__ = "depth_records"
+    __table_args__ = (
+        Index("ix_depth_records_session_timestamp", "session_id", "timestamp"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("dive_sessions.id"))
     timestamp = Column(DateTime)
     depth = Column(Float)
-    temperature = Column(Float)
\ No newline at end of file
+    temperature = Column(Float)
+
+class DepthRecordRollup(Base):
+    # Fixed-width bucket summaries replacing raw samples of old dives
+    __tablename__ = "depth_record_rollups"
+    __table_args__ = (
+        Index("ix_depth_record_rollups_session_bucket", "session_id", "bucket_start"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("dive_sessions.id"))
+    bucket_start = Column(DateTime)
+    bucket_seconds = Column(Integer)
+    sample_count = Column(Integer)
+    min_depth = Column(Float)
+    max_depth = Column(Float)
+    avg_depth = Column(Float)
+    avg_temperature = Column(Float)
@@ -0,0 +1,106 @@
+import os
+import time
+import logging
+from pathlib import Path
+from sqlalchemy import inspect, text
+from .database import engine, Base
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Schema the original init_db create_all built, before migrations were tracked
+BASELINE_REVISION = "002"
+
+# Arbitrary application-wide key for pg_advisory_lock; serializes migrations across replicas
+MIGRATION_LOCK_ID = 80421017
+
+# How the API worker treats the schema on startup:
+#   none       - do not touch the database until the first request (default)
+#   migrate    - upgrade to the Alembic head under an advisory lock
+#   create_all - legacy Base.metadata.create_all for throwaway local databases
+SCHEMA_STARTUP_MODE = os.getenv("SCHEMA_STARTUP_MODE", "none")
+
+# Alembic is imported inside the functions below: workers in the default "none"
+# mode never load it, which keeps it off the boot path.
+
+def get_alembic_config():
+    from alembic.config import Config
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+def _current_heads(connection):
+    from alembic.runtime.migration import MigrationContext
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+def _is_at_head(connection, script) -> bool:
+    # Reads only the alembic_version row, no schema reflection
+    return _current_heads(connection) == set(script.get_heads())
+
+def _lock(connection):
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_ID})
+
+def _unlock(connection):
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_ID})
+
+def upgrade_to_head(bind=None) -> bool:
+    """
+    Bring the database to the Alembic head. Returns True if migrations ran.
+    Safe to call from many replicas at once: the first takes the advisory lock
+    and migrates, the others wait and then see the database already at head.
+    """
+    from alembic import command
+    from alembic.script import ScriptDirectory
+
+    bind = bind or engine
+    config = get_alembic_config()
+    script = ScriptDirectory.from_config(config)
+
+    with bind.connect() as connection:
+        if _is_at_head(connection, script):
+            return False
+
+        _lock(connection)
+        try:
+            if _is_at_head(connection, script):
+                return False
+
+            config.attributes["connection"] = connection
+            if not _current_heads(connection) and inspect(connection).has_table("dive_sessions"):
+                # Database built by create_all before migrations were tracked: record the
+                # baseline it matches so every later migration still runs
+                logger.info("Unversioned schema found, stamping baseline revision %s", BASELINE_REVISION)
+                command.stamp(config, BASELINE_REVISION)
+            logger.info("Upgrading database schema to head")
+            command.upgrade(config, "head")
+            return True
+        finally:
+            _unlock(connection)
+
+def create_all_at_head(bind=None):
+    """
+    Legacy create_all for throwaway databases. The result has the current schema, so it
+    is stamped head; left unversioned it would be taken for the baseline and re-migrated.
+    """
+    from alembic import command
+
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    config = get_alembic_config()
+    with bind.begin() as connection:
+        config.attributes["connection"] = connection
+        command.stamp(config, "head")
+
+def prepare_schema():
+    """Apply SCHEMA_STARTUP_MODE; called once per worker at startup."""
+    start = time.perf_counter()
+    if SCHEMA_STARTUP_MODE == "migrate":
+        upgrade_to_head()
+    elif SCHEMA_STARTUP_MODE == "create_all":
+        create_all_at_head()
+    elif SCHEMA_STARTUP_MODE != "none":
+        raise ValueError(f"Unknown SCHEMA_STARTUP_MODE: {SCHEMA_STARTUP_MODE}")
+    return time.perf_counter() - start
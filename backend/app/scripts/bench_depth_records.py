@@ -0,0 +1,91 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import text
+from app.database import engine
+from app.depth_storage import ensure_partitions
+
+# Synthetic layout: one-hour dives sampled every second, spread over two years
+SAMPLES_PER_DIVE = 3600
+
+QUERIES = {
+    "profile of one dive": (
+        "SELECT timestamp, depth FROM depth_records WHERE session_id = :session_id ORDER BY timestamp"
+    ),
+    "one day across all dives": (
+        "SELECT count(*), avg(depth) FROM depth_records "
+        "WHERE timestamp >= :day AND timestamp < :day + interval '1 day'"
+    ),
+    "rollup of one dive": (
+        "SELECT bucket_start, avg_depth FROM depth_record_rollups WHERE session_id = :session_id ORDER BY bucket_start"
+    ),
+}
+
+def generate(connection, rows: int):
+    """Fill dive_sessions/depth_records with synthetic data using server-side generate_series."""
+    dives = rows // SAMPLES_PER_DIVE
+    connection.execute(text("""
+        INSERT INTO users (username, email, hashed_password, name, age, phone_number, is_admin)
+        VALUES ('bench', 'bench@example.com', '', 'Bench', 30, '', false)
+        ON CONFLICT DO NOTHING
+    """))
+    user_id = connection.execute(text("SELECT id FROM users WHERE username = 'bench'")).scalar()
+    connection.execute(text("""
+        INSERT INTO dive_sessions (user_id, date, location, max_depth, duration)
+        SELECT :user_id, now() - (g * interval '2 years' / :dives), 'Bench site', 30, 60
+        FROM generate_series(1, :dives) AS g
+    """), {"user_id": user_id, "dives": dives})
+    oldest = connection.execute(text("SELECT min(date) FROM dive_sessions WHERE user_id = :user_id"),
+                                {"user_id": user_id}).scalar()
+    ensure_partitions(connection, start=oldest)
+    connection.execute(text("""
+        INSERT INTO depth_records (session_id, timestamp, depth, temperature)
+        SELECT s.id, s.date + (g * interval '1 second'), 15 + 15 * sin(g / 600.0), 24
+        FROM dive_sessions s CROSS JOIN generate_series(0, :samples - 1) AS g
+        WHERE s.user_id = :user_id
+    """), {"user_id": user_id, "samples": SAMPLES_PER_DIVE})
+    connection.execute(text("ANALYZE depth_records"))
+
+def measure(connection, repeat: int):
+    session_id, day = connection.execute(text(
+        "SELECT session_id, date_trunc('day', min(timestamp)) FROM depth_records "
+        "GROUP BY session_id ORDER BY session_id DESC LIMIT 1"
+    )).first()
+    params = {"session_id": session_id, "day": day}
+    for label, sql in QUERIES.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            connection.execute(text(sql), params).fetchall()
+            timings.append(time.perf_counter() - start)
+        plan = connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).fetchall()
+        print(f"{label}: best {min(timings) * 1000:.1f} ms over {repeat} runs")
+        for (line,) in plan[:6]:
+            print(f"    {line}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure depth_records query times on a synthetic table (PostgreSQL)")
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--skip-generate", action="store_true")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("This benchmark targets the partitioned PostgreSQL layout")
+
+    if not args.skip_generate:
+        start = time.perf_counter()
+        with engine.begin() as connection:
+            generate(connection, args.rows)
+        print(f"Generated {args.rows} samples in {time.perf_counter() - start:.0f} s")
+
+    with engine.connect() as connection:
+        measure(connection, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import sys
+import time
+import random
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from pydantic import ValidationError
+from app.models import DiveCreate
+from app.utils.dive_validation import validate_dive_payloads
+
+def make_payloads(count, seed=0):
+    """Mostly valid dives with a spread of rule violations and inputs that take the model path."""
+    rng = random.Random(seed)
+    payloads = []
+    for i in range(count):
+        payload = {
+            "location": f"Site {i % 50}",
+            "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:00:00",
+            "max_depth": rng.choice([18, 24.5, 30.0]),
+            "duration": rng.randint(20, 60),
+            "water_type": rng.choice(["Salt", "Fresh", None]),
+            "start_pressure": rng.choice([200, 230, 200, 230, 320, None]),
+            "end_pressure": rng.choice([50, 60, 50, 60, 240, None]),
+            "tank_volume": rng.choice([12, 15.0, 12, 25, None]),
+        }
+        gas = rng.random()
+        if gas < 0.4:
+            payload.update(gas_type="Air")
+        elif gas < 0.7:
+            oxygen = rng.choice([32, 36.0, 32, 45])
+            payload.update(gas_type="Nitrox", oxygen_percentage=oxygen,
+                           nitrogen_percentage=rng.choice([100 - oxygen, 100 - oxygen, 68]))
+        elif gas < 0.8:
+            payload.update(oxygen_percentage=rng.choice([21, 50, None]), gas_type=rng.choice(["Air", None]))
+        # Inputs the batch path leaves to the model
+        odd = rng.random()
+        if odd < 0.03:
+            payload["date"] = "2024-05-01"
+        elif odd < 0.06:
+            payload["duration"] = "45"
+        elif odd < 0.08:
+            payload["levels"] = [{"depth": 10, "duration": 20}]
+        elif odd < 0.09:
+            del payload["location"]
+        payloads.append(payload)
+    return payloads
+
+def validate_one_by_one(payloads):
+    models, errors = [], []
+    for payload in payloads:
+        try:
+            models.append(DiveCreate.parse_obj(payload))
+            errors.append([])
+        except ValidationError as exc:
+            models.append(None)
+            errors.append(exc.errors())
+    return models, errors
+
+def main(count=20000):
+    payloads = make_payloads(count)
+
+    start = time.perf_counter()
+    single_models, single_errors = validate_one_by_one(payloads)
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_models, batch_errors = validate_dive_payloads(payloads)
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = [
+        index for index in range(count)
+        if batch_errors[index] != single_errors[index]
+        or (batch_models[index] is None) != (single_models[index] is None)
+        or (batch_models[index] is not None and batch_models[index].dict() != single_models[index].dict())
+    ]
+    invalid = sum(model is None for model in single_models)
+    print(f"{count} payloads, {invalid} invalid")
+    print(f"per-record: {single_seconds * 1000:.0f} ms, batch: {batch_seconds * 1000:.0f} ms "
+          f"({single_seconds / batch_seconds:.1f}x)")
+    if mismatches:
+        print(f"{len(mismatches)} payloads decided differently, first: {payloads[mismatches[0]]}")
+        sys.exit(1)
+    print("Batch decisions identical to the per-record validators")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,105 @@
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.scripts.load_test import login
+
+# Maximum queries per request with --min-dives dives on the account; tests/test_query_budgets.py
+# enforces the same budgets in the test suite. Budgets must not grow with the number of
+# dives; one spare query covers the periodic denylist sync.
+QUERY_BUDGETS = {
+    "/auth/me": 2,
+    "/dives/dives/": 3,
+    "/dives/dives/{dive_id}": 3,
+    "/dives/dives/{dive_id}/profile": 5,
+    "/reports/reports/summary": 3,
+    "/reports/reports/locations": 3,
+    "/reports/reports/progress": 3,
+    "/search/dives?q=reef": 6,
+    "/sync/dives": 3,
+    "/sites/nearby?latitude=17.3&longitude=-87.5": 3,
+    "/equipment/presets": 3,
+    "/exports/csv": 3,
+    "/exports/export/json": 3,
+}
+# Any statement issued more often than this in one request is treated as N+1 loading
+MAX_REPEATS = 2
+
+def _request(base_url: str, token: str, path: str, method: str = "GET", body: dict = None):
+    request = urllib.request.Request(
+        f"{base_url}{path}",
+        method=method,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.headers, response.read()
+
+def seed_dives(base_url: str, token: str, min_dives: int) -> int:
+    """Make sure the account has at least min_dives dives, so per-row queries would show; returns a dive id."""
+    _, body = _request(base_url, token, "/dives/dives/")
+    dives = json.loads(body)
+    for i in range(len(dives), min_dives):
+        _request(base_url, token, "/dives/dives/", "POST", {
+            "location": f"Query Budget Reef {i % 3}",
+            "date": f"2024-03-{i % 28 + 1:02d}T09:00:00",
+            "max_depth": 18 + i % 10,
+            "duration": 40,
+            "start_pressure": 200,
+            "end_pressure": 70,
+            "tank_volume": 12,
+            "latitude": 17.3 + i * 0.001,
+            "longitude": -87.5,
+        })
+    _, body = _request(base_url, token, "/dives/dives/")
+    return json.loads(body)[0]["id"]
+
+def check_budgets(base_url: str, token: str, dive_id: int) -> list:
+    failures = []
+    for route, budget in QUERY_BUDGETS.items():
+        path = route.format(dive_id=dive_id)
+        try:
+            headers, _ = _request(base_url, token, path)
+        except urllib.error.HTTPError as exc:
+            failures.append(f"{path}: HTTP {exc.code}")
+            continue
+        if headers.get("X-Query-Count") is None:
+            raise RuntimeError("No X-Query-Count header; start the server with QUERY_GUARD_ENABLED=true")
+        count = int(headers["X-Query-Count"])
+        repeats = int(headers["X-Query-Max-Repeats"])
+        status = "ok"
+        if count > budget:
+            status = "OVER BUDGET"
+            failures.append(f"{path}: {count} queries, budget {budget}")
+        if repeats > MAX_REPEATS:
+            status = "N+1"
+            failures.append(f"{path}: one statement repeated {repeats} times")
+        print(f"{path:<50} {count:>3} / {budget:<3} repeats {repeats:<3} {status}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fail if any endpoint exceeds its query budget (server must run with QUERY_GUARD_ENABLED=true)"
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123#")
+    parser.add_argument("--min-dives", type=int, default=20)
+    args = parser.parse_args()
+
+    token = login(args.url, args.username, args.password)
+    dive_id = seed_dives(args.url, token, args.min_dives)
+    failures = check_budgets(args.url, token, dive_id)
+    if failures:
+        print("\nQuery budget regressions:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("\nAll endpoints within their query budgets")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
+# Boot budget for a single worker importing the app; the autoscaler assumes a
+# new worker serves traffic within this time
+WORKER_BOOT_TARGET_MS = float(os.getenv("WORKER_BOOT_TARGET_MS", "1500"))
+
+# Modules that must stay off the boot path (loaded lazily on first use)
+LAZY_MODULES = ("reportlab", "passlib", "alembic", "numpy", "pyarrow")
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+def profile_imports(module: str = "app.main"):
+    """Import the app in a fresh interpreter with -X importtime and parse the report."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+def print_report(entries, top: int = 25) -> bool:
+    total_ms = sum(self_us for _, self_us, _, _ in entries) / 1000
+    print(f"Total import time: {total_ms:.0f} ms (target {WORKER_BOOT_TARGET_MS:.0f} ms)")
+    print(f"\nTop {top} packages by cumulative import time:")
+    top_level = [entry for entry in entries if entry[3] == 0]
+    for name, _, cumulative_us, _ in sorted(top_level, key=lambda entry: entry[2], reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    eager = sorted({name.split(".")[0] for name, *_ in entries if name.split(".")[0] in LAZY_MODULES})
+    if eager:
+        print(f"\nModules expected to load lazily were imported at boot: {', '.join(eager)}")
+
+    return total_ms <= WORKER_BOOT_TARGET_MS and not eager
+
+if __name__ == "__main__":
+    module = sys.argv[1] if len(sys.argv) > 1 else "app.main"
+    sys.exit(0 if print_report(profile_imports(module)) else 1)
@@ -8,7 +8,10 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.models import Base, User
+import app.search_index  # Registers full-text search DDL on create_all
+import app.analytics  # Registers analytics summary DDL on create_all and drop_all
 from app.services.auth import get_password_hash
+from app.schema import create_all_at_head
 
 # Database connection
 SQLALCHEMY_DATABASE_URL = "postgresql://diver:diving123@db:5432/diving_db"
@@ -16,9 +19,12 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def init_db():
+    # Destructive reset for local development; regular startups use app.scripts.migrate
     # Drop all tables and recreate them
     Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    create_all_at_head(engine)
     
     # Create admin user
     db = SessionLocal()
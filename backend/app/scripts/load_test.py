@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent.parent
+
+# Mixed scenario across the dive, report and export routes: (weight, method, path)
+SCENARIO = [
+    (40, "GET", "/dives/dives/"),
+    (15, "GET", "/reports/reports/summary"),
+    (10, "GET", "/reports/reports/locations"),
+    (10, "GET", "/reports/reports/progress"),
+    (10, "GET", "/exports/csv"),
+    (5, "GET", "/exports/export/json"),
+    (5, "GET", "/exports/xml"),
+    (5, "GET", "/planner/max-bottom-time?depth=24"),
+]
+
+def login(base_url: str, username: str, password: str) -> str:
+    data = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    with urllib.request.urlopen(f"{base_url}/auth/token", data=data) as response:
+        return json.loads(response.read())["access_token"]
+
+def _weighted_paths():
+    paths = []
+    for weight, method, path in SCENARIO:
+        paths.extend([(method, path)] * weight)
+    return paths
+
+def run_scenario(base_url: str, token: str, concurrency: int, duration: float) -> dict:
+    """Drive the mixed scenario with `concurrency` client threads; returns per-route stats."""
+    paths = _weighted_paths()
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        index = offset
+        while time.monotonic() < deadline:
+            method, path = paths[index % len(paths)]
+            index += 7  # Co-prime stride spreads clients across the scenario
+            request = urllib.request.Request(
+                f"{base_url}{path}",
+                method=method,
+                headers={"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+            )
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies[path].append(elapsed)
+                else:
+                    errors[path] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = {}
+    for path in set(latencies) | set(errors):
+        samples = sorted(latencies[path])
+        stats[path] = {
+            "requests": len(samples),
+            "errors": errors[path],
+            "p50_ms": samples[len(samples) // 2] * 1000 if samples else None,
+            "p95_ms": samples[int(len(samples) * 0.95)] * 1000 if samples else None,
+        }
+    stats["_total"] = {"requests_per_second": sum(len(v) for v in latencies.values()) / duration}
+    return stats
+
+def _wait_until_ready(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/", timeout=1).read()
+            return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+def run_scaling(args):
+    """Start gunicorn with 1..N workers in turn and run the scenario against each."""
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = []
+    for workers in range(1, args.max_workers + 1):
+        env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{args.port}", RUN_MIGRATIONS="false", RATE_LIMIT_ENABLED="false")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            _wait_until_ready(base_url)
+            token = login(base_url, args.username, args.password)
+            stats = run_scenario(base_url, token, args.concurrency, args.duration)
+            results.append((workers, stats["_total"]["requests_per_second"]))
+            print(f"{workers} worker(s): {results[-1][1]:.1f} req/s")
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+    baseline = results[0][1] or 1
+    print("\nworkers  req/s     scaling")
+    for workers, rps in results:
+        print(f"{workers:>7}  {rps:8.1f}  {rps / baseline:5.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Local load test for the dive, report and export routes")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123#")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--max-workers", type=int, default=0,
+                        help="Start gunicorn locally with 1..N workers and report throughput scaling")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    if args.max_workers:
+        run_scaling(args)
+        return
+
+    token = login(args.url, args.username, args.password)
+    stats = run_scenario(args.url, token, args.concurrency, args.duration)
+    total = stats.pop("_total")
+    for path, route_stats in sorted(stats.items()):
+        print(f"{path:<40} {route_stats}")
+    print(f"Throughput: {total['requests_per_second']:.1f} req/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.database import engine, SessionLocal
+from app.depth_storage import ensure_partitions, rollup_old_sessions
+from app.services.sync import prune_tombstones
+from app.services.auth import prune_revoked_tokens
+
+def run_maintenance(batch_size: int):
+    with engine.begin() as connection:
+        ensure_partitions(connection)
+
+    # One transaction per batch keeps locks and WAL bursts small
+    compacted = 0
+    while True:
+        with engine.begin() as connection:
+            count = rollup_old_sessions(connection, batch_size=batch_size)
+        if not count:
+            break
+        compacted += count
+
+    db = SessionLocal()
+    try:
+        pruned = prune_tombstones(db)
+        expired = prune_revoked_tokens(db)
+    finally:
+        db.close()
+    print(f"Compacted {compacted} dives, pruned {pruned} tombstones and {expired} expired token revocations")
+
+def main():
+    parser = argparse.ArgumentParser(description="Depth record partition upkeep and rollup of old samples")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--loop", type=int, default=0, help="Repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    while True:
+        run_maintenance(args.batch_size)
+        if not args.loop:
+            break
+        time.sleep(args.loop)
+
+if __name__ == "__main__":
+    main()
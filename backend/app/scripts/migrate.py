@@ -0,0 +1,43 @@
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.database import SessionLocal
+from app.models import User
+from app.schema import upgrade_to_head
+from app.services.auth import get_password_hash
+
+def ensure_admin_user():
+    db = SessionLocal()
+    try:
+        if db.query(User).filter(User.username == "admin").first():
+            return
+        admin = User(
+            username="admin",
+            email="admin@divingapp.com",
+            hashed_password=get_password_hash("admin123#"),
+            name="Admin",
+            age=30,
+            phone_number="+1234567890",
+            is_admin=True
+        )
+        db.add(admin)
+        db.commit()
+        print("Admin user created successfully")
+    except Exception as e:
+        print(f"Error creating admin user: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def migrate():
+    start = time.perf_counter()
+    migrated = upgrade_to_head()
+    print(f"Schema {'upgraded' if migrated else 'already at head'} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    ensure_admin_user()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,32 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.database import engine
+from app.analytics import refresh_summary_views
+
+def run_refresh():
+    with engine.begin() as connection:
+        timings = refresh_summary_views(connection)
+    if timings is None:
+        print("Another refresh is in progress, skipping")
+    else:
+        print("Refreshed " + ", ".join(f"{name} ({ms} ms)" for name, ms in timings.items()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the admin analytics summaries")
+    parser.add_argument("--loop", type=int, default=0, help="Repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    while True:
+        run_refresh()
+        if not args.loop:
+            break
+        time.sleep(args.loop)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import gzip
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.scripts.load_test import login
+from app.scripts.seed_catalog import DEFAULT_PASSWORD, SITES, NOTES
+
+# Open-loop traffic replay against users created by seed_data. Arrivals follow a
+# Poisson process at the target rate and are scheduled up front from --seed, so
+# two runs send the same sequence of requests. Response times are measured from
+# the scheduled arrival, so a saturated server shows up as queueing instead of
+# silently lowering the offered load.
+#
+# Rate limiting answers 429 once a user's route group runs out of tokens, which shows
+# up here as errors rather than latency. Measure capacity against a server started with
+# RATE_LIMIT_ENABLED=false, or with RATE_LIMIT_<GROUP> raised above the offered load.
+
+class VirtualUser:
+    def __init__(self, username: str, token: str):
+        self.username = username
+        self.token = token
+        self.dive_ids = []
+        self.preset_ids = []
+        self.version = None
+        self.lock = threading.Lock()
+
+    def pick_dive(self, rng: random.Random):
+        with self.lock:
+            return rng.choice(self.dive_ids) if self.dive_ids else None
+
+def _dive_payload(rng: random.Random, user: VirtualUser) -> dict:
+    name, _, _, water_type, typical_temp = rng.choice(SITES)
+    payload = {
+        "location": name,
+        "date": (datetime(2026, 1, 1) + timedelta(minutes=rng.randint(0, 60 * 24 * 90))).isoformat(),
+        "max_depth": round(rng.triangular(5, 30, 15), 1),
+        "duration": rng.randint(25, 55),
+        "water_temp": round(typical_temp + rng.uniform(-2, 2), 1),
+        "water_type": water_type,
+        "notes": rng.choice(NOTES),
+        "end_pressure": rng.randint(40, 90),
+    }
+    if user.preset_ids:
+        payload["preset_id"] = rng.choice(user.preset_ids)
+    else:
+        payload.update(start_pressure=200, tank_volume=12)
+    return payload
+
+def _trip_payload(rng: random.Random) -> dict:
+    return {"dives": [
+        {"max_depth": rng.choice([12, 15, 18, 21, 24, 30]), "bottom_time": rng.randint(20, 50),
+         "surface_interval": rng.choice([60, 90, 120, 180])}
+        for _ in range(rng.randint(2, 12))
+    ]}
+
+# Each action returns (method, path, body) for a user, or None when the user has nothing to act on
+def _list_dives(rng, user):
+    return "GET", "/dives/dives/", None
+
+def _view_dive(rng, user):
+    dive_id = user.pick_dive(rng)
+    return ("GET", f"/dives/dives/{dive_id}", None) if dive_id else None
+
+def _dive_profile(rng, user):
+    dive_id = user.pick_dive(rng)
+    return ("GET", f"/dives/dives/{dive_id}/profile?points={rng.choice([200, 500, 1000])}", None) if dive_id else None
+
+def _sync(rng, user):
+    query = f"?since={urllib.parse.quote(user.version)}" if user.version else ""
+    return "GET", f"/sync/dives{query}", None
+
+def _search(rng, user):
+    word = rng.choice(rng.choice(SITES)[0].split())
+    return "GET", f"/search/dives?q={urllib.parse.quote(word)}", None
+
+def _nearby_sites(rng, user):
+    _, latitude, longitude, _, _ = rng.choice(SITES)
+    return "GET", f"/sites/nearby?latitude={latitude}&longitude={longitude}&radius_km=25", None
+
+def _create_dive(rng, user):
+    return "POST", "/dives/dives/", _dive_payload(rng, user)
+
+def _update_dive(rng, user):
+    dive_id = user.pick_dive(rng)
+    if not dive_id:
+        return None
+    return "POST", "/dives/dives/batch", {"updates": [{"ids": [dive_id], "changes": {"notes": rng.choice(NOTES)}}]}
+
+# (weight, name, action)
+TRAFFIC_MIX = [
+    (20, "list_dives", _list_dives),
+    (15, "view_dive", _view_dive),
+    (15, "dive_profile", _dive_profile),
+    (10, "sync", _sync),
+    (6, "report_summary", lambda rng, user: ("GET", "/reports/reports/summary", None)),
+    (3, "report_progress", lambda rng, user: ("GET", "/reports/reports/progress", None)),
+    (6, "search", _search),
+    (4, "nearby_sites", _nearby_sites),
+    (3, "gas_presets", lambda rng, user: ("GET", "/equipment/presets", None)),
+    (3, "trip_plan", lambda rng, user: ("POST", "/planner/trip", _trip_payload(rng))),
+    (8, "create_dive", _create_dive),
+    (5, "update_dive", _update_dive),
+    (2, "export_csv", lambda rng, user: ("GET", "/exports/csv", None)),
+]
+
+def _request(base_url: str, token: str, method: str, path: str, body=None):
+    request = urllib.request.Request(
+        f"{base_url}{path}",
+        method=method,
+        data=json.dumps(body).encode() if body is not None else None,
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json", "Accept-Encoding": "gzip"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            body = response.read()
+            if response.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return response.status, body
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except (urllib.error.URLError, OSError):
+        return None, b""
+
+def login_when_allowed(base_url: str, username: str, password: str, attempts: int = 5) -> str:
+    """Log in, waiting out the credential rate limit's Retry-After instead of failing."""
+    for attempt in range(attempts):
+        try:
+            return login(base_url, username, password)
+        except urllib.error.HTTPError as e:
+            if e.code != 429 or attempt == attempts - 1:
+                raise
+            time.sleep(float(e.headers.get("Retry-After", "1")))
+
+def prepare_users(base_url: str, prefix: str, count: int, password: str) -> list:
+    """Log in as the first `count` seeded users and load the ids their requests will use."""
+    users = []
+    for index in range(count):
+        username = f"{prefix}{index:06d}"
+        user = VirtualUser(username, login_when_allowed(base_url, username, password))
+        _, body = _request(base_url, user.token, "GET", "/dives/dives/")
+        user.dive_ids = [dive["id"] for dive in json.loads(body)]
+        _, body = _request(base_url, user.token, "GET", "/equipment/presets")
+        user.preset_ids = [preset["id"] for preset in json.loads(body)]
+        users.append(user)
+    return users
+
+def build_schedule(seed: int, rate: float, duration: float, user_count: int) -> list:
+    """(offset seconds, user index, action index, request seed) for every arrival."""
+    rng = random.Random(seed)
+    weights = [weight for weight, _, _ in TRAFFIC_MIX]
+    schedule = []
+    offset = rng.expovariate(rate)
+    while offset < duration:
+        action = rng.choices(range(len(TRAFFIC_MIX)), weights)[0]
+        schedule.append((offset, rng.randrange(user_count), action, rng.getrandbits(32)))
+        offset += rng.expovariate(rate)
+    return schedule
+
+def _percentile_ms(samples: list, fraction: float):
+    return round(samples[int(len(samples) * fraction)] * 1000, 1) if samples else None
+
+def replay(base_url: str, users: list, schedule: list, concurrency: int) -> dict:
+    """Send the schedule open-loop; returns per-action response times and status counts."""
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+
+    def send(scheduled_at, user, name, action, request_seed):
+        request = action(random.Random(request_seed), user)
+        if request is None:
+            return
+        method, path, body = request
+        status, payload = _request(base_url, user.token, method, path, body)
+        elapsed = time.perf_counter() - scheduled_at
+        if status == 201 and name == "create_dive":
+            with user.lock:
+                user.dive_ids.append(json.loads(payload)["id"])
+        elif status == 200 and name == "sync":
+            user.version = json.loads(payload)["version"]
+        with lock:
+            statuses[name][status or "connection error"] += 1
+            if status is not None and status < 400:
+                latencies[name].append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for offset, user_index, action_index, request_seed in schedule:
+            delay = started + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            _, name, action = TRAFFIC_MIX[action_index]
+            pool.submit(send, started + offset, users[user_index], name, action, request_seed)
+    elapsed = time.perf_counter() - started
+
+    stats = {}
+    for _, name, _ in TRAFFIC_MIX:
+        samples = sorted(latencies[name])
+        total = sum(statuses[name].values())
+        if not total:
+            continue
+        stats[name] = {
+            "requests": total,
+            "errors": total - len(samples),
+            "p50_ms": _percentile_ms(samples, 0.5),
+            "p95_ms": _percentile_ms(samples, 0.95),
+            "p99_ms": _percentile_ms(samples, 0.99),
+            "statuses": dict(statuses[name]),
+        }
+    all_samples = sorted(sample for samples in latencies.values() for sample in samples)
+    total = sum(route["requests"] for route in stats.values())
+    stats["_total"] = {
+        "requests": total,
+        "errors": sum(route["errors"] for route in stats.values()),
+        "throughput": len(all_samples) / elapsed,
+        "p95_ms": _percentile_ms(all_samples, 0.95),
+    }
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay seeded, mixed read/write traffic against the API for capacity testing")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prefix", default="seed", help="Username prefix used by seed_data")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--users", type=int, default=20, help="Seeded users to send traffic as")
+    parser.add_argument("--rates", default="10,20,40,80", help="Comma-separated offered loads in requests per second")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per rate step")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument("--slo-p95-ms", type=float, default=500, help="Stop stepping up once p95 exceeds this")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Stop stepping up once errors exceed this fraction")
+    parser.add_argument("--verbose", action="store_true", help="Print per-action statistics for every step")
+    args = parser.parse_args()
+
+    users = prepare_users(args.url, args.prefix, args.users, args.password)
+    print(f"Replaying as {len(users)} users with {sum(len(user.dive_ids) for user in users)} dives")
+    print("offered  achieved  p95 ms   errors")
+    for step, rate in enumerate(float(value) for value in args.rates.split(",")):
+        schedule = build_schedule(args.seed + step, rate, args.duration, len(users))
+        stats = replay(args.url, users, schedule, args.concurrency)
+        total = stats.pop("_total")
+        error_rate = total["errors"] / max(total["requests"], 1)
+        p95 = total["p95_ms"]
+        print(f"{rate:7.1f}  {total['throughput']:8.1f}  {p95 if p95 is not None else float('nan'):7.1f}  {error_rate:6.1%}")
+        if args.verbose:
+            for name, route_stats in stats.items():
+                print(f"    {name:<16} {route_stats}")
+        throttled = sum(route_stats["statuses"].get(429, 0) for route_stats in stats.values())
+        if throttled:
+            print(f"    {throttled} requests were rate limited; use RATE_LIMIT_ENABLED=false on the server "
+                  f"or raise RATE_LIMIT_<GROUP> to measure capacity")
+        if p95 is None or p95 > args.slo_p95_ms or error_rate > args.max_error_rate:
+            print(f"Capacity reached at {rate:.1f} req/s offered")
+            break
+
+if __name__ == "__main__":
+    main()
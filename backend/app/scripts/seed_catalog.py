@@ -0,0 +1,44 @@
+# Reference data shared by seed_data and replay_traffic; kept free of app imports so
+# the replay client runs without the database stack
+
+DEFAULT_PASSWORD = "seedpass123!"
+
+# (name, latitude, longitude, water_type, typical water temperature)
+SITES = [
+    ("Great Blue Hole", 17.3159, -87.5346, "Salt", 27),
+    ("SS Thistlegorm", 27.8136, 33.9206, "Salt", 24),
+    ("Shark and Yolanda Reef", 27.7283, 34.2586, "Salt", 25),
+    ("Blue Corner", 7.1366, 134.2217, "Salt", 28),
+    ("Barracuda Point", 4.1150, 118.6286, "Salt", 29),
+    ("Richelieu Rock", 9.3614, 98.0228, "Salt", 29),
+    ("Manta Point", -8.7944, 115.5281, "Salt", 26),
+    ("USAT Liberty", -8.2742, 115.5930, "Salt", 28),
+    ("Navy Pier", -21.8170, 114.1869, "Salt", 24),
+    ("Kicker Rock", -0.7711, -89.5161, "Salt", 22),
+    ("Poor Knights Islands", -35.4689, 174.7375, "Salt", 19),
+    ("Medes Islands", 42.0475, 3.2256, "Salt", 19),
+    ("Silfra", 64.2559, -21.1163, "Fresh", 3),
+    ("Cenote Dos Ojos", 20.3247, -87.3911, "Fresh", 25),
+    ("Stoney Cove", 52.5596, -1.2711, "Fresh", 11),
+    ("Lake Ohrid", 41.1126, 20.8016, "Fresh", 14),
+]
+
+# (name, tank_volume, working_pressure, oxygen_percentage)
+PRESETS = [
+    ("AL80 air", 11.1, 207, 21.0),
+    ("12L steel air", 12.0, 232, 21.0),
+    ("12L EAN32", 12.0, 232, 32.0),
+    ("15L EAN28", 15.0, 232, 28.0),
+    ("10L EAN36", 10.0, 232, 36.0),
+]
+
+NOTES = [
+    "Turtles at the safety stop",
+    "Strong current along the wall",
+    "Great visibility",
+    "Reef shark on the sand patch",
+    "Cold thermocline around 20 m",
+    "Night dive, lots of crabs",
+    None,
+    None,
+]
@@ -0,0 +1,347 @@
+import argparse
+import io
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import bindparam, text
+from app.database import engine
+from app.depth_storage import ensure_partitions
+from app.models import User, DiveSite, GasPreset, DiveSession, DepthRecord, compute_air_consumption
+from app.services.auth import get_password_hash
+from app.utils.decompression import calculate_dive_profile, find_max_bottom_time
+from app.utils.gas_planning import preset_plan, gas_required
+from app.utils.geo import normalize_site_name, site_cell, geohash_encode
+from app.utils.profile import ProfilePlan, PlanLevel, generate_profiles
+from app.scripts.seed_catalog import DEFAULT_PASSWORD, SITES, PRESETS, NOTES
+
+# Deterministic synthetic dataset: the same --seed and scale always produce the same
+# users, dives and samples. Every user draws from its own generator, so raising
+# --users adds users without changing the ones already generated, and a re-run with
+# a larger --users only inserts the users not seeded yet.
+
+def generate_user(seed: int, index: int, prefix: str, dives_per_user: int, until: datetime) -> dict:
+    """One user with gas presets and dives, grouped into trips of one to four dives a day."""
+    rng = random.Random(f"{seed}:{index}")
+    username = f"{prefix}{index:06d}"
+    presets = rng.sample(PRESETS, rng.randint(1, 2))
+    count = rng.randint(dives_per_user // 2, dives_per_user * 3 // 2) if dives_per_user else 0
+
+    dives = []
+    day = 0
+    while len(dives) < count:
+        site = rng.choice(SITES)
+        for _ in range(rng.randint(1, 7)):
+            for slot in range(rng.randint(1, 4)):
+                if len(dives) == count:
+                    break
+                dives.append(_generate_dive(rng, site, presets, day, slot))
+            day += 1
+        day += rng.randint(7, 90)
+    # Trips were laid out forwards from day 0; shift them so the last one ends just before `until`
+    last_day = until - timedelta(days=day + rng.randint(0, 30))
+    for dive in dives:
+        dive["date"] = last_day + dive.pop("offset")
+
+    return {
+        "username": username,
+        "email": f"{username}@example.com",
+        "name": f"Seed Diver {index}",
+        "age": rng.randint(18, 70),
+        "phone_number": f"+1555{index:07d}",
+        "index": index,
+        "presets": presets,
+        "dives": dives,
+    }
+
+def _generate_dive(rng: random.Random, site: tuple, presets: list, day: int, slot: int) -> dict:
+    name, _, _, water_type, typical_temp = site
+    preset_index = rng.randrange(len(presets))
+    _, tank_volume, working_pressure, oxygen = presets[preset_index]
+    mod = preset_plan(tank_volume, working_pressure, 50, oxygen, 1.4).mod
+
+    max_depth = round(min(rng.triangular(5, 40, 18), mod), 1)
+    # Within the no-decompression limit, which is under 10 minutes on air below 35 m
+    duration = min(find_max_bottom_time(max_depth, oxygen), rng.randint(25, 60))
+    water_temp = round(typical_temp + rng.uniform(-2, 2), 1)
+    start_pressure = working_pressure - rng.randint(0, 15)
+    used = gas_required(max_depth, duration, [], rng.uniform(12, 24)) / tank_volume
+    end_pressure = max(30, int(start_pressure - used))
+
+    levels = [PlanLevel(depth=max_depth, duration=duration)]
+    if duration >= 30 and rng.random() < 0.5:
+        # Multi-level: the deep part first, then the rest of the dive shallower
+        deep = duration * 2 // 5
+        levels = [PlanLevel(depth=max_depth, duration=deep),
+                  PlanLevel(depth=round(max_depth * 0.6, 1), duration=duration - deep)]
+
+    return {
+        "offset": timedelta(days=day, hours=8 + 3 * slot, minutes=rng.randint(0, 59)),
+        "location": name,
+        "preset_index": preset_index,
+        "max_depth": max_depth,
+        "duration": duration,
+        "water_temp": water_temp,
+        "water_type": water_type,
+        "notes": rng.choice(NOTES),
+        "start_pressure": start_pressure,
+        "end_pressure": end_pressure,
+        "tank_volume": tank_volume,
+        "oxygen_percentage": oxygen,
+        "levels": levels,
+    }
+
+def dive_rows(dives: list) -> tuple:
+    """
+    The dive_sessions rows for (dive, user_id, site_id, preset_id) entries, with the profile
+    and derived columns create_dive would store; returns (rows, profile segments).
+    """
+    deco_profiles = [
+        calculate_dive_profile(max_depth=dive["max_depth"], bottom_time=dive["duration"]) for dive, *_ in dives
+    ]
+    profiles = generate_profiles([
+        ProfilePlan(levels=dive["levels"], stops=deco_profile["stops"])
+        for (dive, *_), deco_profile in zip(dives, deco_profiles)
+    ])
+    rows = []
+    for (dive, user_id, site_id, preset_id), deco_profile, segments in zip(dives, deco_profiles, profiles):
+        oxygen = dive["oxygen_percentage"]
+        rows.append({
+            "user_id": user_id,
+            "date": dive["date"],
+            "location": dive["location"],
+            "site_id": site_id,
+            "preset_id": preset_id,
+            "max_depth": dive["max_depth"],
+            "duration": dive["duration"],
+            "water_temp": dive["water_temp"],
+            "water_type": dive["water_type"],
+            "notes": dive["notes"],
+            "start_pressure": dive["start_pressure"],
+            "end_pressure": dive["end_pressure"],
+            "tank_volume": dive["tank_volume"],
+            "air_consumption": compute_air_consumption(
+                dive["start_pressure"], dive["end_pressure"], dive["tank_volume"],
+                dive["max_depth"], dive["duration"], dive["water_temp"]
+            ),
+            "depth_data": segments.depths,
+            "time_data": segments.seconds,
+            "decompression_info": deco_profile,
+            "oxygen_percentage": oxygen,
+            "nitrogen_percentage": 100 - oxygen,
+            "helium_percentage": 0.0,
+            "gas_type": "Air" if oxygen == 21 else "Nitrox",
+            "created_at": dive["date"],
+            "updated_at": dive["date"],
+        })
+    return rows, profiles
+
+def dive_samples(generator, row: dict, segments, interval: int):
+    """Samples every `interval` seconds along the planned profile, with sensor noise."""
+    import numpy as np
+
+    offsets = np.arange(0, segments.seconds[-1] + 1, interval)
+    depths = np.interp(offsets, segments.seconds, segments.depths) + generator.normal(0, 0.15, len(offsets))
+    depths = np.clip(depths, 0, None).round(2)
+    # Colder with depth, plus sensor noise
+    temperatures = (row["water_temp"] - depths * 0.08 + generator.normal(0, 0.1, len(offsets))).round(1)
+    timestamps = np.datetime64(row["date"], "s") + offsets.astype("timedelta64[s]")
+    return timestamps, depths, temperatures
+
+class SampleWriter:
+    """Buffers depth samples and bulk-loads them: COPY on PostgreSQL, executemany elsewhere."""
+
+    def __init__(self, connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.pending = []
+        self.pending_rows = 0
+        self.written = 0
+
+    def add(self, session_id: int, timestamps, depths, temperatures):
+        self.pending.append((session_id, timestamps, depths, temperatures))
+        self.pending_rows += len(depths)
+        if self.pending_rows >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        import numpy as np
+
+        session_ids = np.concatenate([np.full(len(depths), session_id) for session_id, _, depths, _ in self.pending])
+        timestamps = np.concatenate([timestamps for _, timestamps, _, _ in self.pending])
+        depths = np.concatenate([depths for _, _, depths, _ in self.pending])
+        temperatures = np.concatenate([temperatures for _, _, _, temperatures in self.pending])
+
+        if self.connection.dialect.name == "postgresql":
+            buffer = io.StringIO("".join(
+                f"{session_id},{timestamp},{depth},{temperature}\n"
+                for session_id, timestamp, depth, temperature in zip(
+                    session_ids.tolist(), np.datetime_as_string(timestamps).tolist(),
+                    depths.tolist(), temperatures.tolist()
+                )
+            ))
+            cursor = self.connection.connection.cursor()
+            try:
+                cursor.copy_expert(
+                    "COPY depth_records (session_id, timestamp, depth, temperature) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            finally:
+                cursor.close()
+        else:
+            self.connection.execute(DepthRecord.__table__.insert(), [
+                {"session_id": session_id, "timestamp": timestamp, "depth": depth, "temperature": temperature}
+                for session_id, timestamp, depth, temperature in zip(
+                    session_ids.tolist(), timestamps.astype("datetime64[us]").tolist(),
+                    depths.tolist(), temperatures.tolist()
+                )
+            ])
+        self.written += self.pending_rows
+        self.pending = []
+        self.pending_rows = 0
+
+def ensure_sites(connection) -> dict:
+    """Site id per name, creating the catalogue sites that do not exist yet."""
+    table = DiveSite.__table__
+    site_ids = {}
+    for name, latitude, longitude, _, _ in SITES:
+        normalized = normalize_site_name(name)
+        cell = site_cell(latitude, longitude)
+        site_id = connection.execute(
+            text("SELECT id FROM dive_sites WHERE normalized_name = :normalized AND site_cell = :cell"),
+            {"normalized": normalized, "cell": cell}
+        ).scalar()
+        if site_id is None:
+            site_id = connection.execute(table.insert().values(
+                name=name, normalized_name=normalized, latitude=latitude, longitude=longitude,
+                geohash=geohash_encode(latitude, longitude), site_cell=cell
+            )).inserted_primary_key[0]
+        site_ids[name] = site_id
+    return site_ids
+
+def _ids_by_key(connection, sql: str, user_ids: list) -> dict:
+    rows = connection.execute(
+        text(sql).bindparams(bindparam("user_ids", expanding=True)), {"user_ids": user_ids}
+    ).fetchall()
+    grouped = {}
+    for user_id, row_id in rows:
+        grouped.setdefault(user_id, []).append(row_id)
+    return grouped
+
+def seed_chunk(connection, users: list, hashed_password: str, site_ids: dict, seed: int,
+               sample_interval: int, batch_size: int) -> tuple:
+    """Insert one chunk of generated users with their presets, dives and samples."""
+    import numpy as np
+
+    connection.execute(User.__table__.insert(), [
+        {**{key: user[key] for key in ("username", "email", "name", "age", "phone_number")},
+         "hashed_password": hashed_password, "is_admin": False}
+        for user in users
+    ])
+    user_ids = dict(connection.execute(
+        text("SELECT username, id FROM users WHERE username IN :usernames").bindparams(
+            bindparam("usernames", expanding=True)
+        ), {"usernames": [user["username"] for user in users]}
+    ).fetchall())
+    ordered_ids = [user_ids[user["username"]] for user in users]
+
+    connection.execute(GasPreset.__table__.insert(), [
+        {"user_id": user_ids[user["username"]], "name": name, "tank_volume": tank_volume,
+         "working_pressure": working_pressure, "reserve_pressure": 50, "oxygen_percentage": oxygen,
+         "max_ppo2": 1.4}
+        for user in users
+        for name, tank_volume, working_pressure, oxygen in user["presets"]
+    ])
+    preset_ids = _ids_by_key(
+        connection, "SELECT user_id, id FROM gas_presets WHERE user_id IN :user_ids ORDER BY user_id, id", ordered_ids
+    )
+
+    dives, sample_seeds = [], []
+    for user in users:
+        user_id = user_ids[user["username"]]
+        for dive_index, dive in enumerate(user["dives"]):
+            dives.append((dive, user_id, site_ids[dive["location"]], preset_ids[user_id][dive["preset_index"]]))
+            # Seeded by position rather than by database id, so samples do not depend on existing data
+            sample_seeds.append([seed, user["index"], dive_index])
+    if not dives:
+        return 0, 0
+    rows, profiles = dive_rows(dives)
+    connection.execute(DiveSession.__table__.insert(), rows)
+
+    if not sample_interval:
+        return len(rows), 0
+    # A user's dives are generated in date order with distinct dates, so this matches `rows`
+    dive_ids = _ids_by_key(
+        connection, "SELECT user_id, id FROM dive_sessions WHERE user_id IN :user_ids ORDER BY user_id, date, id",
+        ordered_ids
+    )
+    session_ids = [session_id for user_id in ordered_ids for session_id in dive_ids.get(user_id, [])]
+
+    ensure_partitions(connection, start=min(row["date"] for row in rows))
+    writer = SampleWriter(connection, batch_size)
+    for row, segments, session_id, sample_seed in zip(rows, profiles, session_ids, sample_seeds):
+        generator = np.random.default_rng(sample_seed)
+        writer.add(session_id, *dive_samples(generator, row, segments, sample_interval))
+    writer.flush()
+    return len(rows), writer.written
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a deterministic synthetic dataset of users, dives and depth samples")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--dives-per-user", type=int, default=50, help="Average; each user gets 50%%-150%% of it")
+    parser.add_argument("--sample-interval", type=int, default=1, help="Seconds between depth samples, 0 for none")
+    parser.add_argument("--prefix", default="seed", help="Usernames are <prefix><index>")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of every seeded user")
+    parser.add_argument("--until", default="2026-01-01", help="Date (YYYY-MM-DD) the generated dive history ends before")
+    parser.add_argument("--chunk-users", type=int, default=50, help="Users inserted per transaction")
+    parser.add_argument("--batch-size", type=int, default=200_000, help="Depth samples per bulk insert")
+    args = parser.parse_args()
+
+    until = datetime.strptime(args.until, "%Y-%m-%d")
+    with engine.connect() as connection:
+        existing = {username for username, in connection.execute(
+            text("SELECT username FROM users WHERE username LIKE :pattern"), {"pattern": f"{args.prefix}%"}
+        )}
+    indices = [index for index in range(args.users) if f"{args.prefix}{index:06d}" not in existing]
+    if len(indices) < args.users:
+        print(f"Skipping {args.users - len(indices)} users already seeded with prefix {args.prefix!r}")
+
+    # Hashing is deliberately slow; every seeded user shares one hash
+    hashed_password = get_password_hash(args.password)
+    with engine.begin() as connection:
+        site_ids = ensure_sites(connection)
+
+    started = time.perf_counter()
+    total_dives = total_samples = 0
+    for first in range(0, len(indices), args.chunk_users):
+        users = [
+            generate_user(args.seed, index, args.prefix, args.dives_per_user, until)
+            for index in indices[first:first + args.chunk_users]
+        ]
+        with engine.begin() as connection:
+            dives, samples = seed_chunk(
+                connection, users, hashed_password, site_ids, args.seed, args.sample_interval, args.batch_size
+            )
+        total_dives += dives
+        total_samples += samples
+        elapsed = time.perf_counter() - started
+        print(f"{first + len(users)}/{len(indices)} users, {total_dives} dives, {total_samples} samples "
+              f"({elapsed:.0f} s, {total_samples / max(elapsed, 1e-9):,.0f} samples/s)")
+
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("ANALYZE dive_sessions"))
+            connection.execute(text("ANALYZE depth_records"))
+    print(f"Seeded {len(indices)} users ({args.prefix}*, password {args.password!r}). Run refresh_analytics to "
+          f"update the admin summaries and maintain_depth_records to roll up samples past retention.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from sqlalchemy import event, text
+from .models import DiveSession
+
+# Document searched by full-text queries. The PostgreSQL index is built on this
+# exact expression, so queries must use it verbatim to be served by the index.
+SEARCH_DOCUMENT_SQL = "to_tsvector('simple', coalesce(location, '') || ' ' || coalesce(notes, ''))"
+
+SQLITE_FTS_TABLE = "dive_sessions_fts"
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_dive_sessions_search ON dive_sessions USING gin ({SEARCH_DOCUMENT_SQL})",
+    "CREATE INDEX IF NOT EXISTS ix_dive_sessions_location_trgm ON dive_sessions USING gin (location gin_trgm_ops)",
+]
+
+# External-content FTS5 table kept in sync with dive_sessions by triggers
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    "location, notes, content='dive_sessions', content_rowid='id')",
+    f"""CREATE TRIGGER IF NOT EXISTS dive_sessions_fts_ai AFTER INSERT ON dive_sessions BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, location, notes) VALUES (new.id, new.location, new.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS dive_sessions_fts_ad AFTER DELETE ON dive_sessions BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, location, notes)
+        VALUES ('delete', old.id, old.location, old.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS dive_sessions_fts_au AFTER UPDATE ON dive_sessions BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, location, notes)
+        VALUES ('delete', old.id, old.location, old.notes);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, location, notes) VALUES (new.id, new.location, new.notes);
+    END""",
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+]
+
+def create_search_index(connection):
+    """Create the dialect-specific full-text search structures for dive_sessions."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        statements = POSTGRES_DDL
+    elif dialect == "sqlite":
+        statements = SQLITE_DDL
+    else:
+        return
+    for statement in statements:
+        connection.execute(text(statement))
+
+def drop_search_index(connection):
+    """Drop the full-text search structures created by create_search_index."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text("DROP INDEX IF EXISTS ix_dive_sessions_location_trgm"))
+        connection.execute(text("DROP INDEX IF EXISTS ix_dive_sessions_search"))
+    elif dialect == "sqlite":
+        for trigger in ("dive_sessions_fts_ai", "dive_sessions_fts_ad", "dive_sessions_fts_au"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        connection.execute(text(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}"))
+
+def _after_create(target, connection, **kw):
+    create_search_index(connection)
+
+# Keep create_all() (used by init_db) in line with the migrations
+event.listen(DiveSession.__table__, "after_create", _after_create)
@@ -0,0 +1,133 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date, datetime, timedelta
+from ..analytics import refresh_summary_views
+from ..database import engine, get_read_db
+from ..models import User
+from ..services.auth import get_current_admin
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Fleet analytics read only the precomputed summaries in app/analytics.py, never dive_sessions
+
+DEFAULT_RANGE_DAYS = 90
+
+def _date_range(start: Optional[date], end: Optional[date]):
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end"
+        )
+    return start, end
+
+def _month_range(start: Optional[date], end: Optional[date]):
+    start, end = _date_range(start, end)
+    return start.replace(day=1), end
+
+@router.get("/analytics/dives-per-day")
+async def get_dives_per_day(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin)
+):
+    start, end = _date_range(start, end)
+    rows = db.execute(text("""
+        SELECT day, dives, divers, avg_max_depth, total_duration
+        FROM analytics_daily_dives
+        WHERE day >= :start AND day <= :end
+        ORDER BY day
+    """), {"start": start, "end": end}).fetchall()
+    return [
+        {
+            "day": str(day),
+            "dives": dives,
+            "divers": divers,
+            "avg_max_depth": round(avg_max_depth, 1) if avg_max_depth is not None else None,
+            "total_duration_minutes": total_duration
+        }
+        for day, dives, divers, avg_max_depth, total_duration in rows
+    ]
+
+@router.get("/analytics/depth-distribution")
+async def get_depth_distribution(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin)
+):
+    start, end = _month_range(start, end)
+    rows = db.execute(text("""
+        SELECT depth_bucket, sum(dives)
+        FROM analytics_depth_distribution
+        WHERE month >= :start AND month <= :end
+        GROUP BY depth_bucket
+        ORDER BY depth_bucket
+    """), {"start": start, "end": end}).fetchall()
+    return [{"depth_from": bucket, "dives": int(dives)} for bucket, dives in rows]
+
+@router.get("/analytics/gas-distribution")
+async def get_gas_distribution(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin)
+):
+    start, end = _month_range(start, end)
+    rows = db.execute(text("""
+        SELECT gas_type, oxygen_percentage, sum(dives)
+        FROM analytics_gas_distribution
+        WHERE month >= :start AND month <= :end
+        GROUP BY gas_type, oxygen_percentage
+        ORDER BY sum(dives) DESC
+    """), {"start": start, "end": end}).fetchall()
+    return [
+        {"gas_type": gas_type, "oxygen_percentage": oxygen, "dives": int(dives)}
+        for gas_type, oxygen, dives in rows
+    ]
+
+@router.get("/analytics/active-users")
+async def get_active_users(
+    days: int = Query(30, ge=1, le=3650),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin)
+):
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    active, total = db.execute(text("""
+        SELECT sum(CASE WHEN last_dive >= :cutoff THEN 1 ELSE 0 END), count(*)
+        FROM analytics_user_activity
+    """), {"cutoff": cutoff}).first()
+    return {
+        "days": days,
+        "active_users": int(active or 0),
+        "users_with_dives": total
+    }
+
+@router.get("/analytics/status")
+async def get_analytics_status(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin)
+):
+    rows = db.execute(text(
+        "SELECT view_name, refreshed_at, duration_ms FROM analytics_refreshes ORDER BY view_name"
+    )).fetchall()
+    return [
+        {"view": name, "refreshed_at": refreshed_at, "duration_ms": duration_ms}
+        for name, refreshed_at, duration_ms in rows
+    ]
+
+@router.post("/analytics/refresh")
+async def refresh_analytics(current_user: User = Depends(get_current_admin)):
+    with engine.begin() as connection:
+        timings = refresh_summary_views(connection)
+    if timings is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Analytics refresh already in progress"
+        )
+    return {"refreshed": timings}
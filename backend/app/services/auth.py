@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from ..database import get_db
-from ..models import User
-from passlib.context import CryptContext
+from ..models import User, RevokedToken
+from ..utils.revocation import RevocationCache
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
+from typing import Optional
 import os
+import uuid
 from dotenv import load_dotenv
 import logging
 from pydantic import BaseModel, EmailStr, validator
@@ -19,15 +22,38 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_pwd_context = None
+
+def get_pwd_context():
+    # passlib resolves and loads the bcrypt backend on construction; defer it to first use
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
 
 # Security configuration from environment variables
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+# How stale a worker's copy of the revocation denylist may get; a token revoked through
+# another worker is still accepted here for at most this long
+DENYLIST_SYNC_SECONDS = int(os.getenv("DENYLIST_SYNC_SECONDS", "10"))
+
+_revocations = RevocationCache(
+    sync_interval=timedelta(seconds=DENYLIST_SYNC_SECONDS),
+    overlap=timedelta(seconds=60)
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+
 class UserCreate(BaseModel):
     username: str
     email: EmailStr
@@ -52,12 +78,12 @@ class UserCreate(BaseModel):
 
 def verify_password(plain_password, hashed_password):
     logger.info(f"Verifying password hash: {hashed_password}")
-    result = pwd_context.verify(plain_password, hashed_password)
+    result = get_pwd_context().verify(plain_password, hashed_password)
     logger.info(f"Password verification result: {result}")
     return result
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def authenticate_user(db: Session, username: str, password: str):
     logger.info(f"Attempting to authenticate user: {username}")
@@ -72,16 +98,87 @@ def authenticate_user(db: Session, username: str, password: str):
     logger.info(f"Authentication successful for user: {username}")
     return user
 
-def create_access_token(data: dict, expires_delta: timedelta = None):
+def create_access_token(data: dict, expires_delta: timedelta = None, token_type: str = "access"):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    # jti identifies the token in the revocation denylist
+    to_encode.update({"exp": expire, "jti": str(uuid.uuid4()), "type": token_type})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_token_pair(username: str) -> dict:
+    return {
+        "access_token": create_access_token(
+            data={"sub": username}, expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        ),
+        "refresh_token": create_access_token(
+            data={"sub": username}, expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS), token_type="refresh"
+        ),
+        "token_type": "bearer"
+    }
+
+def sync_revocations(db: Session):
+    """Bring this worker's denylist up to date if the sync interval has passed."""
+    now = datetime.utcnow()
+    if not _revocations.is_stale(now):
+        return
+    query = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.expires_at > now)
+    since = _revocations.since()
+    if since is not None:
+        query = query.filter(RevokedToken.revoked_at >= since)
+    _revocations.load(query.all(), now)
+
+def is_revoked(db: Session, jti: str) -> bool:
+    sync_revocations(db)
+    return jti in _revocations
+
+def revoke_token(db: Session, payload: dict, user_id: int) -> bool:
+    """Deny the token from now on; returns False if it was already revoked."""
+    jti = payload.get("jti")
+    if not jti:
+        return False
+    expires_at = datetime.utcfromtimestamp(payload["exp"])
+    # Insert first and let the primary key settle concurrent revocations of the same token
+    try:
+        db.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        db.commit()
+        inserted = True
+    except IntegrityError:
+        db.rollback()
+        inserted = False
+    # Visible to this worker at once; other workers pick it up on their next sync
+    _revocations.add(jti, expires_at)
+    return inserted
+
+def prune_revoked_tokens(db: Session) -> int:
+    """Delete denylist rows of tokens that have expired anyway; returns the number removed."""
+    removed = db.query(RevokedToken).filter(
+        RevokedToken.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return removed
+
+def decode_refresh_token(db: Session, token: str) -> dict:
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise invalid_token
+    if payload.get("type") != "refresh" or not payload.get("sub") or not payload.get("jti"):
+        raise invalid_token
+    # Refreshes are rare, so check the table itself rather than the cache: a rotated
+    # refresh token must not be replayable through a worker whose copy is still stale
+    if db.query(RevokedToken.jti).filter(RevokedToken.jti == payload["jti"]).first() is not None:
+        raise invalid_token
+    return payload
+
 async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -95,12 +192,25 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    # Tokens issued before refresh support carry no type or jti and stay valid until they expire
+    if payload.get("type", "access") != "access":
+        raise credentials_exception
+    if payload.get("jti") and is_revoked(db, payload["jti"]):
+        raise credentials_exception
     
     user = db.query(User).filter(User.username == username).first()
     if user is None:
         raise credentials_exception
     return user
 
+async def get_current_admin(current_user: User = Depends(get_current_user)):
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
+
 @router.post("/register")
 async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     # Check if username already exists
@@ -154,12 +264,44 @@ async def login_for_access_token(
         )
     
     logger.info(f"Authentication successful for user: {form_data.username}")
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
+    return create_token_pair(user.username)
+
+@router.post("/refresh")
+async def refresh_access_token(request: RefreshRequest, db: Session = Depends(get_db)):
+    payload = decode_refresh_token(db, request.refresh_token)
+    user = db.query(User).filter(User.username == payload["sub"]).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Rotation: each refresh token is good for one exchange. Of two concurrent refreshes
+    # with the same token only the one that records the revocation gets a new pair
+    if not revoke_token(db, payload, user.id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return create_token_pair(user.username)
+
+@router.post("/logout")
+async def logout(
+    request: LogoutRequest = None,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    revoke_token(db, jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]), current_user.id)
+    if request is not None and request.refresh_token:
+        try:
+            payload = jwt.decode(request.refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            payload = None
+        if payload and payload.get("type") == "refresh" and payload.get("sub") == current_user.username:
+            revoke_token(db, payload, current_user.id)
+    return {"message": "Logged out"}
 
 @router.post("/create-admin")
 async def create_admin_user(db: Session = Depends(get_db)):
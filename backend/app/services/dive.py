@@ -1,13 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..models import DiveSession, User, DiveCreate
+from typing import List, Optional
+import os
+from bisect import bisect_left, bisect_right
+from ..database import get_db, get_read_db, mark_write
+from ..models import (
+    DiveSession, DiveTombstone, DepthRecord, DepthRecordRollup, User, DiveBase, DiveCreate, DiveBatchRequest,
+    PROFILE_PLAN_FIELDS, SITE_FIELDS, AIR_CONSUMPTION_FIELDS, compute_air_consumption
+)
 from datetime import datetime
 from ..services.auth import get_current_user
-from ..utils.decompression import calculate_dive_profile
+from ..services.sites import resolve_site
+from ..services.equipment import apply_preset
+from ..utils.decompression import calculate_dive_profile, DecompressionCalculator
+from ..utils.serialization import dive_to_dict, dives_to_dicts
+from ..utils.profile import (
+    ProfilePlan, PlanLevel, DEFAULT_DESCENT_RATE, generate_profiles
+)
+from ..utils.downsample import lttb, budget_level, LRUCache
+from ..utils.dive_validation import validate_dive_payloads
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Per-worker caches for chart profiles, keyed by dive version so edits invalidate them
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "256"))
+_profile_series_cache = LRUCache(PROFILE_CACHE_SIZE)
+_profile_level_cache = LRUCache(PROFILE_CACHE_SIZE * 4)
+
+MAX_VALIDATE_BATCH = int(os.getenv("DIVE_VALIDATE_MAX_ROWS", "10000"))
+# Dive ids per batch mutation, counting every update entry and the deletes
+MAX_BATCH_IDS = int(os.getenv("DIVE_BATCH_MAX_IDS", "1000"))
+
+def build_profile_plan(dive_data: DiveCreate, deco_profile: dict) -> ProfilePlan:
+    if dive_data.levels:
+        levels = [PlanLevel(depth=level.depth, duration=level.duration) for level in dive_data.levels]
+    else:
+        levels = [PlanLevel(depth=dive_data.max_depth, duration=dive_data.duration)]
+    return ProfilePlan(
+        levels=levels,
+        stops=deco_profile['stops'],
+        descent_rate=DEFAULT_DESCENT_RATE if dive_data.descent_rate is None else dive_data.descent_rate,
+        ascent_rate=DecompressionCalculator.ASCENT_RATE if dive_data.ascent_rate is None else dive_data.ascent_rate
+    )
+
+def batch_profile_fields(dives: List[DiveCreate]) -> List[dict]:
+    """
+    The depth_data, time_data (elapsed seconds) and decompression_info columns derived
+    from each dive's plan, generating the profiles as one batch.
+    """
+    deco_profiles = [
+        calculate_dive_profile(max_depth=dive_data.max_depth, bottom_time=dive_data.duration)
+        for dive_data in dives
+    ]
+    try:
+        profiles = generate_profiles([
+            build_profile_plan(dive_data, deco_profile) for dive_data, deco_profile in zip(dives, deco_profiles)
+        ])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    return [
+        {"depth_data": segments.depths, "time_data": segments.seconds, "decompression_info": deco_profile}
+        for segments, deco_profile in zip(profiles, deco_profiles)
+    ]
+
+def profile_fields(dive_data: DiveCreate) -> dict:
+    """The depth_data, time_data and decompression_info columns derived from a dive's plan."""
+    return batch_profile_fields([dive_data])[0]
+
+def delete_dive_samples(db: Session, dive_ids):
+    """Delete the depth samples and rollups of dives about to be deleted."""
+    db.query(DepthRecord).filter(DepthRecord.session_id.in_(dive_ids)).delete(synchronize_session=False)
+    db.query(DepthRecordRollup).filter(DepthRecordRollup.session_id.in_(dive_ids)).delete(synchronize_session=False)
 
 @router.post("/dives/", status_code=status.HTTP_201_CREATED)
 async def create_dive(
@@ -15,51 +82,14 @@ async def create_dive(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Calculate decompression profile
-    deco_profile = calculate_dive_profile(
-        max_depth=dive_data.max_depth,
-        bottom_time=dive_data.duration
-    )
-    
-    # Generate time and depth data including decompression stops
-    time_points = ['0:00']  # Start at surface
-    depth_points = [0]      # Start at surface
-    
-    # Descent (assuming 20m/min descent rate)
-    descent_time = int(dive_data.max_depth / 20 * 60)  # in seconds
-    time_points.append(f"{descent_time//60}:{descent_time%60:02d}")
-    depth_points.append(dive_data.max_depth)
-    
-    # Bottom time
-    bottom_time_sec = dive_data.duration * 60
-    time_points.append(f"{(descent_time + bottom_time_sec)//60}:{(descent_time + bottom_time_sec)%60:02d}")
-    depth_points.append(dive_data.max_depth)
-    
-    current_time = descent_time + bottom_time_sec
-    
-    # Add decompression and safety stops
-    for stop in deco_profile['stops']:
-        # Ascent to stop depth (assuming 10m/min ascent rate)
-        ascent_time = int((depth_points[-1] - stop['depth']) / 10 * 60)
-        current_time += ascent_time
-        time_points.append(f"{current_time//60}:{current_time%60:02d}")
-        depth_points.append(stop['depth'])
-        
-        # Stop duration
-        current_time += stop['duration'] * 60
-        time_points.append(f"{current_time//60}:{current_time%60:02d}")
-        depth_points.append(stop['depth'])
-    
-    # Final ascent to surface
-    final_ascent_time = int(depth_points[-1] / 10 * 60)
-    current_time += final_ascent_time
-    time_points.append(f"{current_time//60}:{current_time%60:02d}")
-    depth_points.append(0)
+    dive_data = apply_preset(db, current_user, dive_data)
 
     new_dive = DiveSession(
         user_id=current_user.id,
         date=dive_data.date,
         location=dive_data.location,
+        site_id=resolve_site(db, dive_data.location, dive_data.latitude, dive_data.longitude).id,
+        preset_id=dive_data.preset_id,
         max_depth=dive_data.max_depth,
         duration=dive_data.duration,
         water_temp=dive_data.water_temp,
@@ -68,9 +98,11 @@ async def create_dive(
         start_pressure=dive_data.start_pressure,
         end_pressure=dive_data.end_pressure,
         tank_volume=dive_data.tank_volume,
-        depth_data=depth_points,
-        time_data=time_points,
-        decompression_info=deco_profile
+        oxygen_percentage=dive_data.oxygen_percentage,
+        nitrogen_percentage=dive_data.nitrogen_percentage,
+        helium_percentage=dive_data.helium_percentage,
+        gas_type=dive_data.gas_type.value if dive_data.gas_type else None,
+        **profile_fields(dive_data)
     )
     
     # Calculate air consumption if all required data is present
@@ -87,20 +119,89 @@ async def create_dive(
     db.add(new_dive)
     db.commit()
     db.refresh(new_dive)
-    return new_dive
+    response = ORJSONResponse(dive_to_dict(new_dive), status_code=status.HTTP_201_CREATED)
+    mark_write(response)
+    return response
+
+@router.post("/dives/validate")
+async def validate_dives(
+    payloads: List[dict] = Body(...),
+    current_user: User = Depends(get_current_user)
+):
+    if len(payloads) > MAX_VALIDATE_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_VALIDATE_BATCH} dives per request"
+        )
+    models, errors = validate_dive_payloads(payloads)
+    return ORJSONResponse({
+        "total": len(payloads),
+        "valid": sum(model is not None for model in models),
+        "errors": [{"index": index, "errors": row_errors} for index, row_errors in enumerate(errors) if row_errors]
+    })
 
-@router.get("/dives/", response_model=List[dict])
+@router.get("/dives/")
 async def get_dives(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     dives = db.query(DiveSession).filter(DiveSession.user_id == current_user.id).all()
-    return dives
+    return ORJSONResponse(dives_to_dicts(dives))
 
 @router.get("/dives/{dive_id}")
 async def get_dive(
     dive_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    dive = db.query(DiveSession).filter(
+        DiveSession.id == dive_id,
+        DiveSession.user_id == current_user.id
+    ).first()
+    if not dive:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Dive not found"
+        )
+    return ORJSONResponse(dive_to_dict(dive))
+
+def load_profile_series(db: Session, dive: DiveSession):
+    """
+    Full-resolution (seconds, depths) series: recorded samples if any, else the
+    rollup buckets of a compacted dive, else the planned profile.
+    """
+    cache_key = (dive.id, dive.updated_at)
+    series = _profile_series_cache.get(cache_key)
+    if series is not None:
+        return series
+
+    # Untimed samples are kept in storage but can't be placed on the time axis
+    samples = db.query(DepthRecord.timestamp, DepthRecord.depth).filter(
+        DepthRecord.session_id == dive.id,
+        DepthRecord.timestamp.isnot(None)
+    ).order_by(DepthRecord.timestamp).all()
+    if not samples:
+        samples = db.query(DepthRecordRollup.bucket_start, DepthRecordRollup.avg_depth).filter(
+            DepthRecordRollup.session_id == dive.id
+        ).order_by(DepthRecordRollup.bucket_start).all()
+    if samples:
+        start = samples[0][0]
+        series = (
+            [(timestamp - start).total_seconds() for timestamp, _ in samples],
+            [depth for _, depth in samples]
+        )
+    else:
+        series = (list(dive.time_data or []), list(dive.depth_data or []))
+    _profile_series_cache.set(cache_key, series)
+    return series
+
+@router.get("/dives/{dive_id}/profile")
+async def get_dive_profile(
+    dive_id: int,
+    points: int = Query(500, ge=16, le=4096),
+    start: Optional[float] = Query(None, ge=0),
+    end: Optional[float] = Query(None, ge=0),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     dive = db.query(DiveSession).filter(
@@ -112,7 +213,30 @@ async def get_dive(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Dive not found"
         )
-    return dive
+
+    times, depths = load_profile_series(db, dive)
+    if start is not None or end is not None:
+        # Zoomed window: downsample the cached full-resolution slice
+        low = bisect_left(times, start) if start is not None else 0
+        high = bisect_right(times, end) if end is not None else len(times)
+        chart_times, chart_depths = lttb(times[low:high], depths[low:high], points)
+    else:
+        # Whole dive: serve from power-of-two levels so nearby budgets share cache entries
+        level = budget_level(points)
+        cache_key = (dive.id, dive.updated_at, level)
+        cached = _profile_level_cache.get(cache_key)
+        if cached is None:
+            cached = lttb(times, depths, level)
+            _profile_level_cache.set(cache_key, cached)
+        chart_times, chart_depths = cached
+
+    return ORJSONResponse({
+        "dive_id": dive.id,
+        "source_points": len(times),
+        "points": len(chart_times),
+        "seconds": chart_times,
+        "depths": chart_depths
+    })
 
 @router.put("/dives/{dive_id}")
 async def update_dive(
@@ -130,12 +254,21 @@ async def update_dive(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Dive not found"
         )
+    dive_data = apply_preset(db, current_user, dive_data)
     
     # Update dive attributes
-    for key, value in dive_data.dict(exclude_unset=True).items():
-        if key == "water_type" and value is not None:
+    changes = dive_data.dict(exclude_unset=True, exclude=PROFILE_PLAN_FIELDS | SITE_FIELDS)
+    for key, value in changes.items():
+        if key in ("water_type", "gas_type") and value is not None:
             value = value.value
         setattr(dive, key, value)
+
+    # PUT carries the whole dive, so the profile is rebuilt from its plan as on create
+    for key, value in profile_fields(dive_data).items():
+        setattr(dive, key, value)
+
+    if "location" in changes or dive_data.latitude is not None:
+        dive.site_id = resolve_site(db, dive.location, dive_data.latitude, dive_data.longitude).id
     
     # Recalculate air consumption
     if all(x is not None for x in [
@@ -150,7 +283,9 @@ async def update_dive(
     
     db.commit()
     db.refresh(dive)
-    return dive
+    response = ORJSONResponse(dive_to_dict(dive))
+    mark_write(response)
+    return response
 
 @router.delete("/dives/{dive_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_dive(
@@ -168,6 +303,133 @@ async def delete_dive(
             detail="Dive not found"
         )
     
+    delete_dive_samples(db, [dive.id])
     db.delete(dive)
+    db.add(DiveTombstone(dive_id=dive.id, user_id=current_user.id))
+    db.commit()
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    mark_write(response)
+    return response
+
+@router.post("/dives/batch")
+async def batch_mutate_dives(
+    batch: DiveBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if len(batch.deletes) + sum(len(update.ids) for update in batch.updates) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {MAX_BATCH_IDS} dive ids per request"
+        )
+
+    delete_ids = set(batch.deletes)
+    requested_ids = delete_ids | {dive_id for update in batch.updates for dive_id in update.ids}
+    if not requested_ids:
+        return ORJSONResponse({"updated": 0, "deleted": 0})
+
+    # Ownership check for the whole batch in one query; the batch is all-or-nothing
+    owned_ids = {
+        dive_id for (dive_id,) in db.query(DiveSession.id).filter(
+            DiveSession.id.in_(requested_ids),
+            DiveSession.user_id == current_user.id
+        )
+    }
+    missing = sorted(requested_ids - owned_ids)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dives not found: {missing}"
+        )
+
+    # Every dive must still pass the DiveCreate rules once all of its changes are applied
+    changes_by_id = {}
+    for update in batch.updates:
+        changes = update.changes.dict(exclude_unset=True)
+        for dive_id in set(update.ids) - delete_ids:
+            changes_by_id.setdefault(dive_id, {}).update(changes)
+    if changes_by_id:
+        columns = [getattr(DiveSession, name) for name in DiveBase.__fields__]
+        rows = db.query(DiveSession.id, *columns).filter(DiveSession.id.in_(changes_by_id)).all()
+        merged = [
+            {**{name: value for name, value in zip(DiveBase.__fields__, values) if value is not None},
+             **changes_by_id[dive_id]}
+            for dive_id, *values in rows
+        ]
+        _, errors = validate_dive_payloads(merged)
+        invalid = []
+        for (dive_id, *_), row_errors in zip(rows, errors):
+            # Rows written outside the API may lack a required column; only what the batch sets must be present
+            row_errors = [
+                error for error in row_errors
+                if error["type"] != "value_error.missing" or error["loc"][0] in changes_by_id[dive_id]
+            ]
+            if row_errors:
+                invalid.append({"id": dive_id, "errors": row_errors})
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=sorted(invalid, key=lambda entry: entry["id"])
+            )
+
+    updated_ids = set()
+    recompute_ids = set()
+    profile_ids = set()
+    for update in batch.updates:
+        ids = set(update.ids) - delete_ids
+        changes = update.changes.dict(exclude_unset=True)
+        if not ids or not changes:
+            continue
+        if changes.get("water_type") is not None:
+            changes["water_type"] = changes["water_type"].value
+        if changes.get("location") is not None:
+            changes["site_id"] = resolve_site(db, changes["location"]).id
+        db.query(DiveSession).filter(
+            DiveSession.id.in_(ids),
+            DiveSession.user_id == current_user.id
+        ).update(changes, synchronize_session=False)
+        updated_ids |= ids
+        if any(field in changes for field in AIR_CONSUMPTION_FIELDS):
+            recompute_ids |= ids
+        if "max_depth" in changes or "duration" in changes:
+            profile_ids |= ids
+
+    # Derived air consumption only for rows whose inputs changed
+    if recompute_ids:
+        columns = [getattr(DiveSession, name) for name in AIR_CONSUMPTION_FIELDS]
+        rows = db.query(DiveSession.id, *columns).filter(DiveSession.id.in_(recompute_ids)).all()
+        db.bulk_update_mappings(DiveSession, [
+            {"id": row[0], "air_consumption": compute_air_consumption(*row[1:])}
+            for row in rows
+        ])
+
+    # Planned profile as create_dive builds it; the plan's levels and rates are not stored,
+    # so an edited dive gets the single-level default
+    if profile_ids:
+        rows = db.query(DiveSession.id, DiveSession.max_depth, DiveSession.duration).filter(
+            DiveSession.id.in_(profile_ids),
+            DiveSession.max_depth.isnot(None),
+            DiveSession.duration.isnot(None)
+        ).all()
+        fields = batch_profile_fields([
+            DiveCreate.construct(max_depth=max_depth, duration=duration) for _, max_depth, duration in rows
+        ])
+        db.bulk_update_mappings(DiveSession, [
+            {"id": dive_id, **dive_fields} for (dive_id, _, _), dive_fields in zip(rows, fields)
+        ])
+
+    if delete_ids:
+        delete_dive_samples(db, delete_ids)
+        db.query(DiveSession).filter(
+            DiveSession.id.in_(delete_ids),
+            DiveSession.user_id == current_user.id
+        ).delete(synchronize_session=False)
+        db.bulk_insert_mappings(DiveTombstone, [
+            {"dive_id": dive_id, "user_id": current_user.id, "deleted_at": datetime.utcnow()}
+            for dive_id in delete_ids
+        ])
+
     db.commit()
-    return None 
\ No newline at end of file
+    response = ORJSONResponse({"updated": len(updated_ids), "deleted": len(delete_ids)})
+    mark_write(response)
+    return response
@@ -0,0 +1,140 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..database import get_db, get_read_db, mark_write
+from ..models import DiveCreate, DiveSession, GasPreset, GasPresetCreate, User
+from ..services.auth import get_current_user
+from ..utils.gas_planning import plan_for_preset, plan_to_dict, gas_time_at_depth, preset_dive_fields
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+def preset_to_dict(preset: GasPreset) -> dict:
+    return {
+        "id": preset.id,
+        "name": preset.name,
+        "tank_volume": preset.tank_volume,
+        "working_pressure": preset.working_pressure,
+        "reserve_pressure": preset.reserve_pressure,
+        "oxygen_percentage": preset.oxygen_percentage,
+        "max_ppo2": preset.max_ppo2,
+        "updated_at": preset.updated_at,
+        "plan": plan_to_dict(plan_for_preset(preset)),
+    }
+
+def get_user_preset(db: Session, user: User, preset_id: int) -> GasPreset:
+    preset = db.query(GasPreset).filter(
+        GasPreset.id == preset_id,
+        GasPreset.user_id == user.id
+    ).first()
+    if not preset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Gas preset not found"
+        )
+    return preset
+
+def apply_preset(db: Session, user: User, dive_data: DiveCreate) -> DiveCreate:
+    """
+    Fill the tank and gas fields a dive payload left unset from its preset, re-running
+    the DiveCreate validators on the result (a preset gas must still fit the payload).
+    """
+    if dive_data.preset_id is None:
+        return dive_data
+    preset = get_user_preset(db, user, dive_data.preset_id)
+    values = dive_data.dict(exclude_unset=True)
+    for field, value in preset_dive_fields(preset).items():
+        if field not in dive_data.__fields_set__:
+            values[field] = value
+    try:
+        return DiveCreate(**values)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors()
+        )
+
+@router.get("/presets")
+async def list_presets(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    presets = db.query(GasPreset).filter(
+        GasPreset.user_id == current_user.id
+    ).order_by(GasPreset.name).all()
+    return ORJSONResponse([preset_to_dict(preset) for preset in presets])
+
+@router.post("/presets", status_code=status.HTTP_201_CREATED)
+async def create_preset(
+    preset_data: GasPresetCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    preset = GasPreset(user_id=current_user.id, **preset_data.dict())
+    db.add(preset)
+    db.commit()
+    db.refresh(preset)
+    response = ORJSONResponse(preset_to_dict(preset), status_code=status.HTTP_201_CREATED)
+    mark_write(response)
+    return response
+
+@router.get("/presets/{preset_id}")
+async def get_preset(
+    preset_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    return ORJSONResponse(preset_to_dict(get_user_preset(db, current_user, preset_id)))
+
+@router.put("/presets/{preset_id}")
+async def update_preset(
+    preset_id: int,
+    preset_data: GasPresetCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    preset = get_user_preset(db, current_user, preset_id)
+    for key, value in preset_data.dict().items():
+        setattr(preset, key, value)
+    db.commit()
+    db.refresh(preset)
+    response = ORJSONResponse(preset_to_dict(preset))
+    mark_write(response)
+    return response
+
+@router.delete("/presets/{preset_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_preset(
+    preset_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    preset = get_user_preset(db, current_user, preset_id)
+    # Dives keep the tank and gas values they copied, only the link goes
+    db.query(DiveSession).filter(
+        DiveSession.preset_id == preset.id
+    ).update({"preset_id": None}, synchronize_session=False)
+    db.delete(preset)
+    db.commit()
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    mark_write(response)
+    return response
+
+@router.get("/presets/{preset_id}/at-depth")
+async def get_preset_at_depth(
+    preset_id: int,
+    depth: float = Query(..., ge=0, le=100),
+    sac_rate: Optional[float] = Query(None, gt=0, description="Surface air consumption in L/min"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    plan = plan_for_preset(get_user_preset(db, current_user, preset_id))
+    absolute_pressure = (depth / 10) + 1
+    return ORJSONResponse({
+        "depth": depth,
+        "within_mod": depth <= plan.mod,
+        "ppo2": round(plan.oxygen_percentage / 100 * absolute_pressure, 2),
+        "usable_gas": round(plan.usable_gas / absolute_pressure, 1),
+        "reserve_gas": round(plan.reserve_gas / absolute_pressure, 1),
+        "gas_time": round(gas_time_at_depth(plan, depth, sac_rate), 1) if sac_rate else None,
+    })
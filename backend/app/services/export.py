@@ -1,20 +1,230 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
-from ..models import DiveSession, User
+from typing import Dict, List
+import os
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from ..database import get_read_db
+from ..models import DiveSession, DepthRecord, DepthRecordRollup, User
 from ..services.auth import get_current_user
-from ..utils.pdf_generator import generate_dive_report
+from ..utils.columnar import COLUMNAR_FORMATS, ChunkSink, table_schema, rows_to_record_batch, stream_columnar
 import csv
-from io import StringIO, BytesIO
-from fastapi.responses import StreamingResponse
-import json
+from io import StringIO
+from fastapi.responses import StreamingResponse, ORJSONResponse
+import orjson
+from xml.sax.saxutils import escape
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Rows rendered per streamed chunk; keeps chunks large enough to compress well
+EXPORT_CHUNK_ROWS = 500
+# Rows per Arrow record batch / Parquet row group in columnar exports
+COLUMNAR_BATCH_ROWS = int(os.getenv("EXPORT_COLUMNAR_BATCH_ROWS", "10000"))
+
+COLUMNAR_MEDIA_TYPES = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+# Text formats a bundle streams straight into the archive, in this order; PDF is rendered alongside
+BUNDLE_TEXT_FORMATS = {
+    "csv": ("dive_log.csv", lambda dives: (chunk.encode() for chunk in generate_csv(dives))),
+    "json": ("dive_log.json", lambda dives: generate_json(dives)),
+    "xml": ("dive_log.xml", lambda dives: (chunk.encode() for chunk in generate_xml(dives))),
+}
+BUNDLE_FORMATS = tuple(BUNDLE_TEXT_FORMATS) + ("pdf",)
+PDF_WORKERS = int(os.getenv("EXPORT_PDF_WORKERS", "2"))
+
+_pdf_executor = None
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    # ReportLab rendering is CPU-bound; a process pool keeps it off the worker's event loop and GIL.
+    # Spawned (not forked) so children do not inherit the worker's threads and open connections.
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pdf_executor
+
+def dive_summary(dive: DiveSession) -> dict:
+    return {
+        "date": dive.date.isoformat(),
+        "location": dive.location,
+        "max_depth": dive.max_depth,
+        "duration": dive.duration,
+        "water_temp": dive.water_temp,
+        "water_type": dive.water_type,
+        "notes": dive.notes
+    }
+
+def generate_csv(dives):
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow([
+        "Date", "Location", "Max Depth (m)", "Duration (min)",
+        "Water Temperature (°C)", "Water Type", "Notes"
+    ])
+    for index, dive in enumerate(dives, 1):
+        writer.writerow([
+            dive.date.isoformat(),
+            dive.location,
+            dive.max_depth,
+            dive.duration,
+            dive.water_temp,
+            dive.water_type,
+            dive.notes
+        ])
+        if index % EXPORT_CHUNK_ROWS == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+    yield output.getvalue()
+
+def generate_xml(dives):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<dives>\n'
+    chunk = []
+    for dive in dives:
+        chunk.append(f"""  <dive>
+    <date>{dive.date.isoformat()}</date>
+    <location>{escape(dive.location or '')}</location>
+    <max_depth>{dive.max_depth}</max_depth>
+    <duration>{dive.duration}</duration>
+    <water_temp>{dive.water_temp if dive.water_temp else ''}</water_temp>
+    <water_type>{escape(dive.water_type or '')}</water_type>
+    <notes>{escape(dive.notes or '')}</notes>
+  </dive>\n""")
+        if len(chunk) == EXPORT_CHUNK_ROWS:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append('</dives>')
+    yield ''.join(chunk)
+
+def generate_json(dives):
+    yield b'['
+    chunk = []
+    for index, dive in enumerate(dives):
+        if index:
+            chunk.append(b',')
+        chunk.append(orjson.dumps(dive_summary(dive), option=orjson.OPT_INDENT_2))
+        if len(chunk) >= EXPORT_CHUNK_ROWS:
+            yield b'\n'.join(chunk)
+            chunk = []
+    chunk.append(b']')
+    yield b'\n'.join(chunk)
+
+def load_depth_samples(db: Session, session_ids: List[int]) -> Dict[int, List[dict]]:
+    """Depth samples of a batch of dives; compacted dives contribute their rollup buckets instead."""
+    samples = {}
+    rows = db.query(
+        DepthRecord.session_id, DepthRecord.timestamp, DepthRecord.depth, DepthRecord.temperature
+    ).filter(DepthRecord.session_id.in_(session_ids)).order_by(
+        DepthRecord.session_id, DepthRecord.timestamp
+    )
+    for session_id, timestamp, depth, temperature in rows:
+        samples.setdefault(session_id, []).append(
+            {"timestamp": timestamp, "depth": depth, "temperature": temperature}
+        )
+
+    compacted = [session_id for session_id in session_ids if session_id not in samples]
+    if compacted:
+        rows = db.query(
+            DepthRecordRollup.session_id, DepthRecordRollup.bucket_start,
+            DepthRecordRollup.avg_depth, DepthRecordRollup.avg_temperature
+        ).filter(DepthRecordRollup.session_id.in_(compacted)).order_by(
+            DepthRecordRollup.session_id, DepthRecordRollup.bucket_start
+        )
+        for session_id, bucket_start, depth, temperature in rows:
+            samples.setdefault(session_id, []).append(
+                {"timestamp": bucket_start, "depth": depth, "temperature": temperature}
+            )
+    return samples
+
+@router.get("/columnar")
+async def export_dives_columnar(
+    format: str = Query("parquet", regex="^(" + "|".join(COLUMNAR_FORMATS) + ")$"),
+    include_samples: bool = False,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    table = DiveSession.__table__
+    schema = table_schema(table, include_samples)
+    # Server-side cursor: rows are fetched batch by batch instead of materialized up front
+    result = db.execute(
+        select(table).where(table.c.user_id == current_user.id).order_by(table.c.id)
+        .execution_options(stream_results=True)
+    )
+
+    def record_batches():
+        for rows in result.partitions(COLUMNAR_BATCH_ROWS):
+            samples = load_depth_samples(db, [row.id for row in rows]) if include_samples else None
+            yield rows_to_record_batch(table, schema, rows, samples)
+
+    media_type, extension = COLUMNAR_MEDIA_TYPES[format]
+    return StreamingResponse(
+        stream_columnar(schema, record_batches(), format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=dive_log.{extension}"}
+    )
+
+def generate_bundle(dives: List[DiveSession], formats: List[str]):
+    """
+    Stream a ZIP of the requested formats built from one query result. The PDF is
+    rendered in the process pool while the text formats are written into the archive;
+    it is appended last, once ready.
+    """
+    pdf_future = None
+    if "pdf" in formats:
+        from ..utils.pdf_generator import generate_dive_log
+        pdf_future = get_pdf_executor().submit(generate_dive_log, [dive_summary(dive) for dive in dives])
+
+    sink = ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name in BUNDLE_TEXT_FORMATS:
+            if name not in formats:
+                continue
+            filename, render = BUNDLE_TEXT_FORMATS[name]
+            with archive.open(filename, "w") as member:
+                for chunk in render(dives):
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+        if pdf_future is not None:
+            # Already compressed, so stored as is
+            archive.writestr("dive_log.pdf", pdf_future.result().getvalue(), compress_type=zipfile.ZIP_STORED)
+    yield sink.drain()
+
+@router.get("/bundle")
+async def export_dives_bundle(
+    formats: str = ",".join(BUNDLE_FORMATS),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    requested = [name.strip() for name in formats.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in BUNDLE_FORMATS]
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"formats must be a comma-separated subset of {', '.join(BUNDLE_FORMATS)}"
+        )
+
+    dives = db.query(DiveSession).filter(DiveSession.user_id == current_user.id).all()
+    if not dives:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No dives found"
+        )
+
+    return StreamingResponse(
+        generate_bundle(dives, requested),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=dive_log.zip"}
+    )
 
 @router.get("/pdf")
 async def export_dives_pdf(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     dives = db.query(DiveSession).filter(DiveSession.user_id == current_user.id).all()
@@ -25,24 +235,10 @@ async def export_dives_pdf(
             detail="No dives found"
         )
     
+    from ..utils.pdf_generator import generate_dive_log
+
     # Create a PDF with all dives
-    buffer = BytesIO()
-    dive_data = {
-        "dives": [
-            {
-                "date": dive.date.isoformat(),
-                "location": dive.location,
-                "max_depth": dive.max_depth,
-                "duration": dive.duration,
-                "water_temp": dive.water_temp,
-                "water_type": dive.water_type,
-                "notes": dive.notes
-            }
-            for dive in dives
-        ]
-    }
-    
-    pdf_buffer = generate_dive_report(dive_data, [])
+    pdf_buffer = generate_dive_log([dive_summary(dive) for dive in dives])
     
     return StreamingResponse(
         iter([pdf_buffer.getvalue()]),
@@ -52,87 +248,39 @@ async def export_dives_pdf(
 
 @router.get("/csv")
 async def export_dives_csv(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     dives = db.query(DiveSession).filter(DiveSession.user_id == current_user.id).all()
     
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        "Date", "Location", "Max Depth (m)", "Duration (min)",
-        "Water Temperature (°C)", "Water Type", "Notes"
-    ])
-    
-    # Write data
-    for dive in dives:
-        writer.writerow([
-            dive.date.isoformat(),
-            dive.location,
-            dive.max_depth,
-            dive.duration,
-            dive.water_temp,
-            dive.water_type,
-            dive.notes
-        ])
-    
-    output.seek(0)
     return StreamingResponse(
-        iter([output.getvalue()]),
+        generate_csv(dives),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=dive_log.csv"}
     )
 
 @router.get("/xml")
 async def export_dives_xml(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     dives = db.query(DiveSession).filter(DiveSession.user_id == current_user.id).all()
     
-    # Create XML string
-    xml_data = '<?xml version="1.0" encoding="UTF-8"?>\n<dives>\n'
-    for dive in dives:
-        xml_data += f"""  <dive>
-    <date>{dive.date.isoformat()}</date>
-    <location>{dive.location}</location>
-    <max_depth>{dive.max_depth}</max_depth>
-    <duration>{dive.duration}</duration>
-    <water_temp>{dive.water_temp if dive.water_temp else ''}</water_temp>
-    <water_type>{dive.water_type if dive.water_type else ''}</water_type>
-    <notes>{dive.notes if dive.notes else ''}</notes>
-  </dive>\n"""
-    xml_data += '</dives>'
-    
     return StreamingResponse(
-        iter([xml_data]),
+        generate_xml(dives),
         media_type="application/xml",
         headers={"Content-Disposition": "attachment; filename=dive_log.xml"}
     )
 
 @router.get("/export/json")
 async def export_dives_json(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     dives = db.query(DiveSession).filter(DiveSession.user_id == current_user.id).all()
     
-    dive_data = []
-    for dive in dives:
-        dive_data.append({
-            "date": dive.date.isoformat(),
-            "location": dive.location,
-            "max_depth": dive.max_depth,
-            "duration": dive.duration,
-            "water_temp": dive.water_temp,
-            "water_type": dive.water_type,
-            "notes": dive.notes
-        })
-    
     return StreamingResponse(
-        iter([json.dumps(dive_data, indent=2)]),
+        generate_json(dives),
         media_type="application/json",
         headers={"Content-Disposition": "attachment; filename=dive_log.json"}
     ) 
\ No newline at end of file
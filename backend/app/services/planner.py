@@ -0,0 +1,257 @@
+import math
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, validator
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..database import get_read_db
+from ..models import GasPreset, User
+from ..services.auth import get_current_user
+from ..services.equipment import get_user_preset
+from ..utils.decompression import (
+    DecompressionCalculator, MAX_PLANNED_BOTTOM_TIME, plan_bottom_time_grid, best_nitrox_mix, find_max_bottom_time
+)
+from ..utils.gas_planning import plan_for_preset, gas_time_at_depth, gas_required
+from ..utils.trip_planner import TripDive, plan_trip
+
+router = APIRouter()
+
+# Keep a single request bounded; every cell is a bisection over the tables
+MAX_GRID_CELLS = 2000
+# A week-long liveaboard at five dives a day, with room to spare
+MAX_TRIP_DIVES = 60
+DEFAULT_SAC_RATE = 20.0  # L/min, used for gas requirements when a dive gives none
+
+class BottomTimeGridRequest(BaseModel):
+    min_depth: float
+    max_depth: float
+    depth_step: float = 3.0
+    oxygen_percentages: List[float] = [21.0, 32.0, 36.0]
+    max_deco_time: int = 0  # Minutes of mandatory decompression allowed, 0 for no-deco dives
+    include_best_mix: bool = True
+
+    @validator('min_depth')
+    def validate_min_depth(cls, v):
+        if v <= 0:
+            raise ValueError('min_depth must be positive')
+        return v
+
+    @validator('max_depth')
+    def validate_depth_range(cls, v, values):
+        if 'min_depth' in values and v < values['min_depth']:
+            raise ValueError('max_depth must not be smaller than min_depth')
+        if v > 100:
+            raise ValueError('max_depth must not exceed 100 meters')
+        return v
+
+    @validator('depth_step')
+    def validate_depth_step(cls, v):
+        if v <= 0:
+            raise ValueError('depth_step must be positive')
+        return v
+
+    @validator('oxygen_percentages', each_item=True)
+    def validate_oxygen(cls, v):
+        if v < 21 or v > 40:
+            raise ValueError('Oxygen percentage must be between 21% and 40%')
+        return v
+
+    @validator('max_deco_time')
+    def validate_max_deco_time(cls, v):
+        if v < 0:
+            raise ValueError('max_deco_time must not be negative')
+        return v
+
+class TripDiveRequest(BaseModel):
+    max_depth: float
+    bottom_time: int
+    surface_interval: int = 60  # Minutes on the surface before this dive
+    oxygen_percentage: Optional[float] = None  # Defaults to the preset's gas, or air
+    preset_id: Optional[int] = None
+    sac_rate: Optional[float] = None  # L/min, overrides the trip's sac_rate
+
+    @validator('max_depth')
+    def validate_depth(cls, v):
+        if v <= 0 or v > 100:
+            raise ValueError('max_depth must be between 0 and 100 meters')
+        return v
+
+    @validator('bottom_time')
+    def validate_bottom_time(cls, v):
+        if v <= 0 or v > MAX_PLANNED_BOTTOM_TIME:
+            raise ValueError(f'bottom_time must be between 1 and {MAX_PLANNED_BOTTOM_TIME} minutes')
+        return v
+
+    @validator('surface_interval')
+    def validate_surface_interval(cls, v):
+        if v < 0:
+            raise ValueError('surface_interval must not be negative')
+        return v
+
+    @validator('oxygen_percentage')
+    def validate_oxygen(cls, v):
+        if v is not None and (v < 21 or v > 40):
+            raise ValueError('Oxygen percentage must be between 21% and 40%')
+        return v
+
+    @validator('sac_rate')
+    def validate_sac_rate(cls, v):
+        if v is not None and v <= 0:
+            raise ValueError('sac_rate must be positive')
+        return v
+
+class TripPlanRequest(BaseModel):
+    dives: List[TripDiveRequest]
+    # Group before the first dive's surface interval; pass the pressure_group of the dive
+    # before the first one here to re-plan the remainder of a trip
+    start_group: str = DecompressionCalculator.PRESSURE_GROUPS[0]
+    sac_rate: float = DEFAULT_SAC_RATE
+
+    @validator('start_group')
+    def validate_start_group(cls, v):
+        if v not in DecompressionCalculator.PRESSURE_GROUPS:
+            raise ValueError('start_group must be a pressure group from A to M')
+        return v
+
+    @validator('sac_rate')
+    def validate_sac_rate(cls, v):
+        if v <= 0:
+            raise ValueError('sac_rate must be positive')
+        return v
+
+@router.post("/bottom-time-grid")
+async def get_bottom_time_grid(
+    plan: BottomTimeGridRequest,
+    current_user: User = Depends(get_current_user)
+):
+    # Size the grid before building it, so a tiny depth_step can't allocate an unbounded list
+    depth_count = math.floor((plan.max_depth - plan.min_depth) / plan.depth_step + 1e-9) + 1
+    if depth_count * (len(plan.oxygen_percentages) + 1) > MAX_GRID_CELLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Requested grid is too large"
+        )
+    depths = [round(plan.min_depth + index * plan.depth_step, 1) for index in range(depth_count)]
+
+    return {
+        "max_deco_time": plan.max_deco_time,
+        "grid": plan_bottom_time_grid(
+            depths,
+            plan.oxygen_percentages,
+            max_deco_time=plan.max_deco_time,
+            include_best_mix=plan.include_best_mix
+        )
+    }
+
+@router.get("/max-bottom-time")
+async def get_max_bottom_time(
+    depth: float = Query(..., gt=0, le=100),
+    oxygen_percentage: Optional[float] = Query(None, ge=21, le=40),
+    max_deco_time: int = Query(0, ge=0),
+    preset_id: Optional[int] = None,
+    sac_rate: Optional[float] = Query(None, gt=0, description="Surface air consumption in L/min"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    result = {"depth": depth, "max_deco_time": max_deco_time}
+    if preset_id is not None:
+        # The preset's gas replaces oxygen_percentage; its cached plan also bounds the dive by gas
+        gas_plan = plan_for_preset(get_user_preset(db, current_user, preset_id))
+        if depth > gas_plan.mod:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Depth exceeds the preset's maximum operating depth of {gas_plan.mod} m"
+            )
+        oxygen_percentage = gas_plan.oxygen_percentage
+        result["preset_id"] = preset_id
+        result["mod"] = gas_plan.mod
+        if sac_rate is not None:
+            result["gas_time"] = int(gas_time_at_depth(gas_plan, depth, sac_rate))
+    elif oxygen_percentage is None:
+        oxygen_percentage = best_nitrox_mix(depth)
+
+    # Same limit under which plan_bottom_time_grid reports no bottom time for a gas
+    ppo2 = DecompressionCalculator.calculate_partial_pressure(oxygen_percentage, depth)
+    if ppo2 > DecompressionCalculator.MAX_PPO2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PPO2 of {ppo2:.2f} bar at {depth} m exceeds maximum {DecompressionCalculator.MAX_PPO2} bar"
+        )
+
+    result["oxygen_percentage"] = oxygen_percentage
+    result["max_bottom_time"] = find_max_bottom_time(depth, oxygen_percentage, max_deco_time)
+    if "gas_time" in result:
+        result["max_bottom_time"] = min(result["max_bottom_time"], result["gas_time"])
+    return result
+
+@router.post("/trip")
+async def plan_dive_trip(
+    trip: TripPlanRequest,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    if not trip.dives or len(trip.dives) > MAX_TRIP_DIVES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A trip must have between 1 and {MAX_TRIP_DIVES} dives"
+        )
+
+    preset_ids = {dive.preset_id for dive in trip.dives if dive.preset_id is not None}
+    gas_plans = {}
+    if preset_ids:
+        presets = db.query(GasPreset).filter(
+            GasPreset.id.in_(preset_ids),
+            GasPreset.user_id == current_user.id
+        ).all()
+        gas_plans = {preset.id: plan_for_preset(preset) for preset in presets}
+        missing = sorted(preset_ids - set(gas_plans))
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Gas presets not found: {missing}"
+            )
+
+    trip_dives = []
+    for dive in trip.dives:
+        oxygen_percentage = dive.oxygen_percentage
+        if oxygen_percentage is None:
+            oxygen_percentage = gas_plans[dive.preset_id].oxygen_percentage if dive.preset_id else 21.0
+        trip_dives.append(TripDive(
+            max_depth=dive.max_depth,
+            bottom_time=dive.bottom_time,
+            oxygen_percentage=oxygen_percentage,
+            surface_interval=dive.surface_interval
+        ))
+
+    results = []
+    for index, (dive, trip_dive, plan) in enumerate(zip(trip.dives, trip_dives, plan_trip(trip_dives, trip.start_group))):
+        sac_rate = dive.sac_rate or trip.sac_rate
+        required = gas_required(
+            dive.max_depth, dive.bottom_time,
+            [(stop["depth"], stop["duration"]) for stop in plan["stops"]], sac_rate
+        )
+        result = {
+            "index": index,
+            "max_depth": dive.max_depth,
+            "bottom_time": dive.bottom_time,
+            "surface_interval": dive.surface_interval,
+            "oxygen_percentage": trip_dive.oxygen_percentage,
+            "preset_id": dive.preset_id,
+            "sac_rate": sac_rate,
+            "gas_required": required,
+            **plan
+        }
+        if dive.preset_id is not None:
+            gas_plan = gas_plans[dive.preset_id]
+            result["usable_gas"] = gas_plan.usable_gas
+            result["gas_sufficient"] = required <= gas_plan.usable_gas
+            if dive.max_depth > gas_plan.mod:
+                result["warnings"] = result["warnings"] + (
+                    f"WARNING: depth exceeds the preset's maximum operating depth of {gas_plan.mod} m",
+                )
+        results.append(result)
+
+    return {
+        "start_group": trip.start_group,
+        "final_pressure_group": results[-1]["pressure_group"],
+        "dives": results
+    }
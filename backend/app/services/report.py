@@ -1,16 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List
-from ..database import get_db
-from ..models import DiveSession, User
+from ..database import get_read_db
+from ..models import DiveSession, DiveSite, User
 from ..services.auth import get_current_user
 from datetime import datetime, timedelta
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 @router.get("/reports/summary")
 async def get_dive_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     dives = db.query(DiveSession).filter(DiveSession.user_id == current_user.id).all()
@@ -35,30 +36,34 @@ async def get_dive_summary(
 
 @router.get("/reports/locations")
 async def get_location_summary(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    dives = db.query(DiveSession).filter(DiveSession.user_id == current_user.id).all()
-    
+    # Group by deduplicated site so "Blue Hole" and "blue hole " count as one location
+    rows = db.query(DiveSession.location, DiveSession.duration, DiveSession.max_depth, DiveSite.name).outerjoin(
+        DiveSite, DiveSession.site_id == DiveSite.id
+    ).filter(DiveSession.user_id == current_user.id).all()
+
     location_stats = {}
-    for dive in dives:
-        if dive.location:
-            if dive.location not in location_stats:
-                location_stats[dive.location] = {
+    for location, duration, max_depth, site_name in rows:
+        name = site_name or location
+        if name:
+            if name not in location_stats:
+                location_stats[name] = {
                     "dive_count": 0,
                     "total_duration": 0,
                     "max_depth": 0
                 }
-            stats = location_stats[dive.location]
+            stats = location_stats[name]
             stats["dive_count"] += 1
-            stats["total_duration"] += dive.duration if dive.duration else 0
-            stats["max_depth"] = max(stats["max_depth"], dive.max_depth if dive.max_depth else 0)
+            stats["total_duration"] += duration if duration else 0
+            stats["max_depth"] = max(stats["max_depth"], max_depth if max_depth else 0)
     
     return location_stats
 
 @router.get("/reports/progress")
 async def get_progress_report(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     dives = db.query(DiveSession).filter(
@@ -77,4 +82,4 @@ async def get_progress_report(
             "location": dive.location
         })
     
-    return progress_data 
\ No newline at end of file
+    return ORJSONResponse(progress_data) 
\ No newline at end of file
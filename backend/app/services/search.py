@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, or_, text
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+import re
+from ..database import get_read_db
+from ..models import DiveSession, User, WaterType, GasType
+from ..services.auth import get_current_user
+from ..search_index import SEARCH_DOCUMENT_SQL, SQLITE_FTS_TABLE
+from ..utils.serialization import dives_to_dicts
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+LIKE_ESCAPE = "\\"
+
+def contains_pattern(q: str) -> str:
+    """LIKE pattern matching q literally anywhere; use with escape=LIKE_ESCAPE."""
+    escaped = q.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+    return f"%{escaped}%"
+
+def _fts5_query(q: str) -> str:
+    # Quote every term so user input cannot inject FTS5 syntax; prefix-match each term
+    terms = re.findall(r"\w+", q)
+    return " ".join(f'"{term}"*' for term in terms)
+
+def apply_text_search(query, db: Session, q: str):
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        document_match = text(f"{SEARCH_DOCUMENT_SQL} @@ plainto_tsquery('simple', :q)")
+        # ILIKE on location is served by the trigram index and catches partial words
+        return query.filter(
+            or_(document_match, DiveSession.location.ilike(contains_pattern(q), escape=LIKE_ESCAPE))
+        ).params(q=q)
+    if dialect == "sqlite":
+        fts_query = _fts5_query(q)
+        if not fts_query:
+            return query
+        matching_ids = text(
+            f"dive_sessions.id IN (SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH :fts_query)"
+        )
+        return query.filter(matching_ids).params(fts_query=fts_query)
+    pattern = contains_pattern(q)
+    return query.filter(or_(
+        DiveSession.location.ilike(pattern, escape=LIKE_ESCAPE),
+        DiveSession.notes.ilike(pattern, escape=LIKE_ESCAPE)
+    ))
+
+@router.get("/dives")
+async def search_dives(
+    q: Optional[str] = None,
+    min_depth: Optional[float] = None,
+    max_depth: Optional[float] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    water_type: Optional[WaterType] = None,
+    gas_type: Optional[GasType] = None,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Every facet filter is a (user_id, column) range or equality served by a composite index
+    query = db.query(DiveSession).filter(DiveSession.user_id == current_user.id)
+    if min_depth is not None:
+        query = query.filter(DiveSession.max_depth >= min_depth)
+    if max_depth is not None:
+        query = query.filter(DiveSession.max_depth <= max_depth)
+    if date_from is not None:
+        query = query.filter(DiveSession.date >= date_from)
+    if date_to is not None:
+        query = query.filter(DiveSession.date <= date_to)
+    if water_type is not None:
+        query = query.filter(DiveSession.water_type == water_type.value)
+    if gas_type is not None:
+        query = query.filter(DiveSession.gas_type == gas_type.value)
+    if q and q.strip():
+        query = apply_text_search(query, db, q.strip())
+
+    total = query.count()
+    dives = query.order_by(DiveSession.date.desc()).limit(limit).offset(offset).all()
+
+    # Facet counts over the full filtered result set
+    facets = {}
+    for column in (DiveSession.water_type, DiveSession.gas_type):
+        counts = query.with_entities(column, func.count()).group_by(column).all()
+        facets[column.key] = {value or "Unknown": count for value, count in counts}
+
+    return ORJSONResponse({
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "facets": facets,
+        "results": dives_to_dicts(dives)
+    })
@@ -0,0 +1,136 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from math import cos, degrees, radians
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..database import get_read_db
+from ..models import DiveSite, User
+from ..services.auth import get_current_user
+from ..utils.geo import (
+    EARTH_RADIUS_KM, normalize_site_name, site_cell, geohash_encode, geohash_neighbors, precision_for_radius,
+    haversine_km
+)
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Sites with the same normalized name closer than this are the same site
+SITE_DEDUP_RADIUS_KM = 0.5
+SITE_GEOHASH_PRECISION = 9
+# Largest nearby-site radius: up to about 70 degrees of latitude it still maps to
+# precision-3 cells, so a lookup reads a few thousand km² rather than a continent
+MAX_NEARBY_RADIUS_KM = 50
+
+def _site_to_dict(site: DiveSite, distance_km: Optional[float] = None) -> dict:
+    data = {
+        "id": site.id,
+        "name": site.name,
+        "latitude": site.latitude,
+        "longitude": site.longitude,
+    }
+    if distance_km is not None:
+        data["distance_km"] = round(distance_km, 3)
+    return data
+
+def find_sites_near(db: Session, latitude: float, longitude: float, radius_km: float) -> List[tuple]:
+    """Sites within radius_km as (distance_km, site), nearest first."""
+    precision = precision_for_radius(radius_km, latitude)
+    center = geohash_encode(latitude, longitude, precision)
+    # One query for the cell and its neighbours; each prefix match is a range so the
+    # plain btree index on geohash serves it
+    query = db.query(DiveSite).filter(or_(*[
+        and_(DiveSite.geohash >= cell, DiveSite.geohash < cell + "~")
+        for cell in geohash_neighbors(center)
+    ]))
+    # The 3x3 cells are much larger than the circle; its bounding box drops most of
+    # the rest in SQL (longitude only where the box does not cross the antimeridian)
+    lat_delta = degrees(radius_km / EARTH_RADIUS_KM)
+    query = query.filter(DiveSite.latitude.between(latitude - lat_delta, latitude + lat_delta))
+    lon_delta = lat_delta / max(cos(radians(latitude)), 0.01)
+    if -180 <= longitude - lon_delta and longitude + lon_delta <= 180:
+        query = query.filter(DiveSite.longitude.between(longitude - lon_delta, longitude + lon_delta))
+    candidates = query.all()
+
+    nearby = []
+    for site in candidates:
+        distance = haversine_km(latitude, longitude, site.latitude, site.longitude)
+        if distance <= radius_km:
+            nearby.append((distance, site))
+    nearby.sort(key=lambda item: item[0])
+    return nearby
+
+def _insert_site(db: Session, name: str, normalized: str, latitude: Optional[float],
+                 longitude: Optional[float]) -> DiveSite:
+    """Insert a site unless a concurrent request already created it in the same cell; returns the row."""
+    cell = site_cell(latitude, longitude)
+    values = dict(
+        name=" ".join(name.split()),
+        normalized_name=normalized,
+        latitude=latitude,
+        longitude=longitude,
+        geohash=geohash_encode(latitude, longitude, SITE_GEOHASH_PRECISION) if latitude is not None else None,
+        site_cell=cell
+    )
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        # Conflicts on the unique (name, cell) key leave the other request's row in place
+        db.execute(insert(DiveSite.__table__).values(**values).on_conflict_do_nothing(
+            index_elements=["normalized_name", "site_cell"]
+        ))
+    else:
+        db.add(DiveSite(**values))
+        db.flush()
+    return db.query(DiveSite).filter(DiveSite.normalized_name == normalized, DiveSite.site_cell == cell).one()
+
+def resolve_site(db: Session, name: str, latitude: Optional[float] = None,
+                 longitude: Optional[float] = None) -> DiveSite:
+    """
+    Return the site matching name and position, creating it if needed. A dive within
+    SITE_DEDUP_RADIUS_KM of a same-named site shares it; without coordinates, the
+    name's unlocated site is used.
+    """
+    normalized = normalize_site_name(name)
+    if latitude is not None and longitude is not None:
+        for _, site in find_sites_near(db, latitude, longitude, SITE_DEDUP_RADIUS_KM):
+            if site.normalized_name == normalized:
+                return site
+    site = db.query(DiveSite).filter(DiveSite.normalized_name == normalized, DiveSite.site_cell == "").first()
+    if site is None:
+        return _insert_site(db, name, normalized, latitude, longitude)
+    if latitude is not None and longitude is not None:
+        # A site logged earlier without coordinates gets located by this dive
+        site.latitude = latitude
+        site.longitude = longitude
+        site.geohash = geohash_encode(latitude, longitude, SITE_GEOHASH_PRECISION)
+        site.site_cell = site_cell(latitude, longitude)
+    return site
+
+@router.get("/nearby")
+async def get_nearby_sites(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10, gt=0, le=MAX_NEARBY_RADIUS_KM),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    nearby = find_sites_near(db, latitude, longitude, radius_km)[:limit]
+    return ORJSONResponse([_site_to_dict(site, distance) for distance, site in nearby])
+
+@router.get("/{site_id}")
+async def get_site(
+    site_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    site = db.query(DiveSite).filter(DiveSite.id == site_id).first()
+    if not site:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Site not found"
+        )
+    return ORJSONResponse(_site_to_dict(site))
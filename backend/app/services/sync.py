@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta
+import os
+from ..database import get_read_db
+from ..models import DiveSession, DiveTombstone, User
+from ..services.auth import get_current_user
+from ..utils.serialization import dives_to_dicts
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Tombstones older than this are pruned; clients further behind get a full snapshot
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+# updated_at is stamped by the application before the transaction commits, so a slow
+# write can become visible after a poll that already returned a newer timestamp. Each
+# delta re-reads this far behind the token; clients merge by id, so repeats are harmless.
+# Must exceed the longest write transaction plus clock skew between workers.
+SYNC_SAFETY_WINDOW = timedelta(seconds=int(os.getenv("SYNC_SAFETY_WINDOW_SECONDS", "60")))
+
+_EPOCH = datetime(1970, 1, 1)
+
+def encode_version(moment: datetime) -> str:
+    return str(int((moment - _EPOCH) / timedelta(microseconds=1)))
+
+def decode_version(token: str) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(token))
+
+@router.get("/dives")
+async def sync_dives(
+    since: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    now = datetime.utcnow()
+    if since is not None:
+        try:
+            since_time = decode_version(since)
+        except (ValueError, OverflowError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid version token"
+            )
+    # Tombstones before the retention cutoff may be pruned, so a delta reaching back past it
+    # could miss deletions
+    retention_cutoff = now - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    full = since is None or since_time - SYNC_SAFETY_WINDOW < retention_cutoff
+
+    dives_query = db.query(DiveSession).filter(DiveSession.user_id == current_user.id)
+    deleted = []
+    if full:
+        dives = dives_query.all()
+    else:
+        window_start = since_time - SYNC_SAFETY_WINDOW
+        dives = dives_query.filter(DiveSession.updated_at > window_start).all()
+        deleted = db.query(DiveTombstone.dive_id, DiveTombstone.deleted_at).filter(
+            DiveTombstone.user_id == current_user.id,
+            DiveTombstone.deleted_at > window_start
+        ).all()
+
+    # The next token comes from server time, not the newest change, so a user with no
+    # recent writes still advances and keeps getting deltas. It never moves backwards.
+    latest = now - SYNC_SAFETY_WINDOW
+    if not full and since_time > latest:
+        latest = since_time
+
+    return ORJSONResponse({
+        "version": encode_version(latest),
+        "full": full,
+        "dives": dives_to_dicts(dives),
+        "deleted": [dive_id for dive_id, _ in deleted]
+    })
+
+def prune_tombstones(db: Session) -> int:
+    """Delete tombstones past the retention window; returns the number removed."""
+    cutoff = datetime.utcnow() - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    removed = db.query(DiveTombstone).filter(DiveTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return removed
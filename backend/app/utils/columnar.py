@@ -0,0 +1,105 @@
+import io
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+import orjson
+from sqlalchemy import Boolean, DateTime, Float, Integer, JSON, Table
+
+# pyarrow is imported inside the functions below so it stays off the worker boot path
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+def _arrow_type(column):
+    import pyarrow as pa
+
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    # Strings, text and JSON documents (serialized) are all utf8
+    return pa.string()
+
+def _samples_type():
+    import pyarrow as pa
+
+    return pa.list_(pa.struct([
+        ("timestamp", pa.timestamp("us")),
+        ("depth", pa.float64()),
+        ("temperature", pa.float64()),
+    ]))
+
+def table_schema(table: Table, include_samples: bool = False):
+    """Arrow schema mirroring every column of a SQLAlchemy table, plus an optional nested samples column."""
+    import pyarrow as pa
+
+    fields = [pa.field(column.name, _arrow_type(column)) for column in table.columns]
+    if include_samples:
+        fields.append(pa.field("samples", _samples_type()))
+    return pa.schema(fields)
+
+def rows_to_record_batch(table: Table, schema, rows: Sequence,
+                         samples: Optional[Dict[int, List[dict]]] = None):
+    """
+    Convert a batch of Core rows from `table` into an Arrow record batch, column by column.
+    `samples` maps row id to its depth samples when the schema has a samples column.
+    """
+    import pyarrow as pa
+
+    arrays = []
+    for index, column in enumerate(table.columns):
+        values = [row[index] for row in rows]
+        if isinstance(column.type, JSON):
+            values = [orjson.dumps(value).decode() if value is not None else None for value in values]
+        arrays.append(pa.array(values, type=schema.field(column.name).type))
+    if samples is not None:
+        arrays.append(pa.array([samples.get(row.id, []) for row in rows], type=_samples_type()))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+class ChunkSink(io.RawIOBase):
+    """Unseekable write target; accumulated bytes are drained and streamed between writes."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def stream_columnar(schema, batches: Iterable, fmt: str = "parquet") -> Iterator[bytes]:
+    """
+    Encode record batches as a Parquet file (one row group per batch) or an Arrow
+    IPC stream, yielding bytes as each batch is written so memory stays bounded.
+    """
+    import pyarrow as pa
+
+    sink = ChunkSink()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    elif fmt == "arrow":
+        writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd"))
+    else:
+        raise ValueError(f"Unknown columnar format: {fmt}")
+
+    for batch in batches:
+        writer.write_batch(batch)
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
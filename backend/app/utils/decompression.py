@@ -1,6 +1,7 @@
 from typing import List, Tuple, Dict
 from dataclasses import dataclass
 from math import floor, ceil
+from functools import lru_cache
 
 @dataclass
 class DecompressionStop:
@@ -245,4 +246,104 @@ def calculate_dive_profile(
             "end": round(end, 1),
             "warnings": warnings
         }
-    } 
\ No newline at end of file
+    } 
+
+# Upper bound for the bottom time search; no table in this calculator goes beyond it
+MAX_PLANNED_BOTTOM_TIME = 300  # minutes
+
+def best_nitrox_mix(depth: float, max_ppo2: float = DecompressionCalculator.MAX_PPO2) -> float:
+    """Richest recreational mix (whole percent O2) whose PPO2 stays within limits at depth."""
+    absolute_pressure = (depth / 10) + 1
+    oxygen = floor(max_ppo2 / absolute_pressure * 100)
+    return float(min(40, max(21, oxygen)))
+
+def gas_mixture_for_oxygen(oxygen_percentage: float) -> GasMixture:
+    """Build a two-gas mixture (O2/N2) for the given oxygen percentage."""
+    gas_type = 'Air' if abs(oxygen_percentage - 21) <= 0.1 else 'Nitrox'
+    return GasMixture(
+        oxygen=oxygen_percentage,
+        nitrogen=100 - oxygen_percentage,
+        helium=0.0,
+        gas_type=gas_type
+    )
+
+def required_deco_time(max_depth: float, bottom_time: int, gas_mixture: GasMixture) -> Tuple[int, int]:
+    """Return (no-deco limit, minutes of mandatory decompression stops) for a planned dive."""
+    profile = DiveProfile(max_depth=max_depth, bottom_time=bottom_time, gas_mixture=gas_mixture)
+    stops, requires_safety_stop, _ = DecompressionCalculator.calculate_stops(profile)
+    adjusted_depth = ceil_to_increment(max_depth, 3)
+    ndl = DecompressionCalculator.adjust_ndl_for_nitrox(adjusted_depth, gas_mixture)
+    deco_time = sum(stop.duration for stop in stops)
+    if requires_safety_stop:
+        deco_time -= 3  # Safety stop is not mandatory decompression
+    return ndl, deco_time
+
+def _is_acceptable(max_depth: float, bottom_time: int, gas_mixture: GasMixture, max_deco_time: int) -> bool:
+    ndl, deco_time = required_deco_time(max_depth, bottom_time, gas_mixture)
+    if bottom_time <= ndl:
+        return True
+    # Past the NDL the dive is only acceptable when the table yields a schedule within the deco budget
+    return max_deco_time > 0 and 0 < deco_time <= max_deco_time
+
+@lru_cache(maxsize=4096)
+def find_max_bottom_time(
+    max_depth: float,
+    oxygen_percentage: float = 21.0,
+    max_deco_time: int = 0,
+    upper_bound: int = MAX_PLANNED_BOTTOM_TIME
+) -> int:
+    """
+    Find the longest bottom time (minutes) at depth whose mandatory decompression
+    does not exceed max_deco_time. max_deco_time=0 yields the no-decompression limit.
+    Acceptability is monotone in bottom time, so the search is a bisection.
+    """
+    gas_mixture = gas_mixture_for_oxygen(oxygen_percentage)
+    low, high = 0, upper_bound
+    if _is_acceptable(max_depth, high, gas_mixture, max_deco_time):
+        return high
+    # Invariant: low is acceptable, high is not
+    while high - low > 1:
+        middle = (low + high) // 2
+        if _is_acceptable(max_depth, middle, gas_mixture, max_deco_time):
+            low = middle
+        else:
+            high = middle
+    return low
+
+def plan_bottom_time_grid(
+    depths: List[float],
+    oxygen_percentages: List[float],
+    max_deco_time: int = 0,
+    include_best_mix: bool = True
+) -> List[Dict]:
+    """
+    Compute maximum bottom times for every depth x gas combination.
+    Gases whose PPO2 exceeds the limit at a depth are reported with max_bottom_time None.
+    """
+    grid = []
+    for depth in depths:
+        best_mix = best_nitrox_mix(depth)
+        candidates = list(oxygen_percentages)
+        if include_best_mix and best_mix not in candidates:
+            candidates.append(best_mix)
+
+        gases = []
+        for oxygen in candidates:
+            ppo2 = DecompressionCalculator.calculate_partial_pressure(oxygen, depth)
+            usable = ppo2 <= DecompressionCalculator.MAX_PPO2
+            gases.append({
+                "oxygen_percentage": oxygen,
+                "gas_type": gas_mixture_for_oxygen(oxygen).gas_type,
+                "ppo2_at_depth": round(ppo2, 2),
+                "max_bottom_time": find_max_bottom_time(depth, oxygen, max_deco_time) if usable else None
+            })
+
+        usable_gases = [gas for gas in gases if gas["max_bottom_time"] is not None]
+        optimal = max(usable_gases, key=lambda gas: (gas["max_bottom_time"], gas["oxygen_percentage"]), default=None)
+        grid.append({
+            "depth": depth,
+            "best_mix_oxygen_percentage": best_mix,
+            "optimal_oxygen_percentage": optimal["oxygen_percentage"] if optimal else None,
+            "gases": gases
+        })
+    return grid
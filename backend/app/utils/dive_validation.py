@@ -0,0 +1,216 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from pydantic import ValidationError
+from ..models import DiveCreate, GasType, WaterType
+
+# Batch validation of DiveCreate payloads.
+#
+# Rows made only of plain JSON values are coerced here and run through the
+# DiveBase rules (depth, duration, pressure, tank, gas percentages, gas type) as vectorized
+# checks over the whole batch. Anything else - other input types, unusual date
+# formats, profile levels or coordinates - falls back to DiveCreate itself, so
+# every row gets exactly the decision and errors the model would give it.
+#
+# The vectorized rules mirror pydantic v1 semantics of the per-field validators:
+# a field that failed is absent from `values` for later validators, and fields
+# left at their default are put in `values` without being validated.
+
+_ISO_DATETIME = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?(Z|[+-]\d{2}:\d{2})?$"
+)
+
+# (field, kind, required) for every DiveBase field, in declaration order
+_FIELD_SPECS = (
+    ("location", "str", True),
+    ("date", "datetime", True),
+    ("max_depth", "float", True),
+    ("duration", "int", True),
+    ("water_temp", "float", False),
+    ("water_type", "water_type", False),
+    ("notes", "str", False),
+    ("start_pressure", "int", False),
+    ("end_pressure", "int", False),
+    ("tank_volume", "float", False),
+    ("oxygen_percentage", "float", False),
+    ("nitrogen_percentage", "float", False),
+    ("helium_percentage", "float", False),
+    ("gas_type", "gas_type", False),
+)
+# Inputs with their own DiveCreate validators; rows using them take the model path
+_MODEL_ONLY_FIELDS = ("levels", "descent_rate", "ascent_rate", "latitude", "longitude", "preset_id")
+
+# All optional DiveCreate defaults are immutable, so they can be shared instead of deep-copied by construct()
+_DEFAULTS = {name: field.default for name, field in DiveCreate.__fields__.items() if not field.required}
+
+_WATER_TYPES = {member.value: member for member in WaterType}
+_GAS_TYPES = {member.value: member for member in GasType}
+
+class _Fallback(Exception):
+    pass
+
+# Larger integers lose precision as float64 in the vectorized checks
+_MAX_EXACT_INT = 2 ** 53
+
+def _parse_datetime(value) -> datetime:
+    # Same result as pydantic's parse_datetime for the formats matched here
+    if not isinstance(value, str):
+        raise _Fallback
+    match = _ISO_DATETIME.match(value)
+    if not match:
+        raise _Fallback
+    year, month, day, hour, minute, second, fraction, zone = match.groups()
+    tzinfo = None
+    if zone == "Z":
+        tzinfo = timezone.utc
+    elif zone:
+        offset = 60 * int(zone[1:3]) + int(zone[-2:])
+        tzinfo = timezone(timedelta(minutes=-offset if zone[0] == "-" else offset))
+    microsecond = int(fraction.ljust(6, "0")) if fraction else 0
+    try:
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                        microsecond, tzinfo=tzinfo)
+    except ValueError:
+        raise _Fallback
+
+def _coerce(payload) -> dict:
+    """Coerced field values of a plain-JSON payload; raises _Fallback for anything else."""
+    if type(payload) is not dict:
+        raise _Fallback
+    values = {}
+    for name in _MODEL_ONLY_FIELDS:
+        if payload.get(name) is not None:
+            raise _Fallback
+        if name in payload:
+            # An explicit null is still a set field, as parse_obj records it
+            values[name] = None
+
+    for name, kind, required in _FIELD_SPECS:
+        if name not in payload:
+            if required:
+                raise _Fallback
+            continue
+        value = payload[name]
+        if value is None and not required:
+            values[name] = None
+        elif kind == "float":
+            # Exact type checks: bool (an int subclass) and anything else goes to the model
+            if type(value) is float:
+                values[name] = value
+            elif type(value) is int and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+                values[name] = float(value)
+            else:
+                raise _Fallback
+        elif kind == "int":
+            if type(value) is not int or not -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+                raise _Fallback
+            values[name] = value
+        elif kind == "str":
+            if type(value) is not str:
+                raise _Fallback
+            values[name] = value
+        elif kind == "datetime":
+            values[name] = _parse_datetime(value)
+        else:
+            members = _WATER_TYPES if kind == "water_type" else _GAS_TYPES
+            if type(value) is not str or value not in members:
+                raise _Fallback
+            values[name] = members[value]
+
+    # The gas_type validator does arithmetic on explicitly null percentages; leave that error to the model
+    if values.get("gas_type") is not None and (
+        ("oxygen_percentage" in values and values["oxygen_percentage"] is None)
+        or ("nitrogen_percentage" in values and values["nitrogen_percentage"] is None)
+    ):
+        raise _Fallback
+    return values
+
+def _column(rows: List[dict], name: str, default: Optional[float]):
+    """(values, present) arrays for a field; present is False where the value is None."""
+    import numpy as np
+
+    raw = [row.get(name, default) for row in rows]
+    present = np.fromiter((value is not None for value in raw), dtype=bool, count=len(raw))
+    values = np.fromiter((value if value is not None else 0.0 for value in raw), dtype=float, count=len(raw))
+    return values, present
+
+def _rule_errors(rows: List[dict]) -> List[List[dict]]:
+    """The DiveBase validator errors of each coerced row, in field order."""
+    import numpy as np
+
+    depth, _ = _column(rows, "max_depth", None)
+    duration, _ = _column(rows, "duration", None)
+    start, start_set = _column(rows, "start_pressure", None)
+    end, end_set = _column(rows, "end_pressure", None)
+    tank, tank_set = _column(rows, "tank_volume", None)
+    oxygen, oxygen_set = _column(rows, "oxygen_percentage", _DEFAULTS["oxygen_percentage"])
+    nitrogen, nitrogen_set = _column(rows, "nitrogen_percentage", _DEFAULTS["nitrogen_percentage"])
+    helium, helium_set = _column(rows, "helium_percentage", _DEFAULTS["helium_percentage"])
+    # A missing gas_type takes its default unvalidated, so only supplied values are checked
+    gas = [row.get("gas_type") for row in rows]
+    is_air = np.fromiter((value == GasType.AIR for value in gas), dtype=bool, count=len(rows))
+    is_nitrox = np.fromiter((value == GasType.NITROX for value in gas), dtype=bool, count=len(rows))
+
+    depth_bad = depth <= 0
+    duration_bad = duration <= 0
+    start_bad = start_set & ((start < 0) | (start > 300))
+    end_range = end_set & ((end < 0) | (end > 300))
+    end_above_start = end_set & ~end_range & start_set & ~start_bad & (end > start)
+    tank_bad = tank_set & ((tank < 0) | (tank > 20))
+    oxygen_bad = oxygen_set & ((oxygen < 0) | (oxygen > 100))
+    nitrogen_bad = nitrogen_set & ((nitrogen < 0) | (nitrogen > 100))
+    helium_bad = helium_set & ((helium < 0) | (helium > 100))
+
+    # gas_type falls back to 21/79 for percentages that failed their own validation
+    o2 = np.where(oxygen_bad, 21.0, oxygen)
+    n2 = np.where(nitrogen_bad, 79.0, nitrogen)
+    air_bad = is_air & ((np.abs(o2 - 21) > 0.1) | (np.abs(n2 - 79) > 0.1))
+    nitrox_range = is_nitrox & ((o2 < 21) | (o2 > 40))
+    nitrox_sum = is_nitrox & ~nitrox_range & (np.abs(o2 + n2 - 100) > 0.1)
+
+    rules = [
+        (depth_bad, "max_depth", "Max depth must be greater than 0"),
+        (duration_bad, "duration", "Duration must be greater than 0"),
+        (start_bad, "start_pressure", "Start pressure must be between 0 and 300 bar"),
+        (end_range, "end_pressure", "End pressure must be between 0 and 300 bar"),
+        (end_above_start, "end_pressure", "End pressure cannot be greater than start pressure"),
+        (tank_bad, "tank_volume", "Tank volume must be between 0 and 20 liters"),
+        (oxygen_bad, "oxygen_percentage", "oxygen_percentage must be between 0 and 100"),
+        (nitrogen_bad, "nitrogen_percentage", "nitrogen_percentage must be between 0 and 100"),
+        (helium_bad, "helium_percentage", "helium_percentage must be between 0 and 100"),
+        (air_bad, "gas_type", "Air must be 21% O2, 79% N2"),
+        (nitrox_range, "gas_type", "Nitrox must contain between 21% and 40% oxygen"),
+        (nitrox_sum, "gas_type", "Gas percentages must sum to 100%"),
+    ]
+    errors = [[] for _ in rows]
+    for mask, field, message in rules:
+        for index in np.flatnonzero(mask):
+            errors[index].append({"loc": (field,), "msg": message, "type": "value_error"})
+    return errors
+
+def validate_dive_payloads(payloads: list) -> Tuple[List[Optional[DiveCreate]], List[List[dict]]]:
+    """
+    Validate many DiveCreate payloads at once. Returns, per payload, the model (None if
+    invalid) and its errors in pydantic's errors() format (empty if valid).
+    """
+    models = [None] * len(payloads)
+    errors = [[] for _ in payloads]
+
+    fast_indexes, fast_rows = [], []
+    for index, payload in enumerate(payloads):
+        try:
+            fast_rows.append(_coerce(payload))
+            fast_indexes.append(index)
+        except _Fallback:
+            try:
+                models[index] = DiveCreate.parse_obj(payload)
+            except ValidationError as exc:
+                errors[index] = exc.errors()
+
+    if fast_rows:
+        for index, values, row_errors in zip(fast_indexes, fast_rows, _rule_errors(fast_rows)):
+            if row_errors:
+                errors[index] = row_errors
+            else:
+                models[index] = DiveCreate.construct(_fields_set=set(values), **{**_DEFAULTS, **values})
+    return models, errors
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import List, Tuple
+
+def lttb(times: List[float], depths: List[float], threshold: int) -> Tuple[List[float], List[float]]:
+    """
+    Downsample a series to `threshold` points with Largest-Triangle-Three-Buckets,
+    which keeps the visual shape (peaks, stops, ascents) of the profile.
+    """
+    import numpy as np  # Loaded on first use to keep it off the worker boot path
+
+    count = len(times)
+    if threshold >= count or threshold < 3:
+        return list(times), list(depths)
+
+    x = np.asarray(times, dtype=float)
+    y = np.asarray(depths, dtype=float)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = count - 1
+
+    # Interior points are split into threshold - 2 buckets
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else count
+        next_start = end
+        if next_start >= next_end:
+            next_x, next_y = x[-1], y[-1]
+        else:
+            next_x = x[next_start:next_end].mean()
+            next_y = y[next_start:next_end].mean()
+
+        # Pick the point forming the largest triangle with the previous pick and the next bucket's average
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+
+    return x[selected].tolist(), y[selected].tolist()
+
+def budget_level(points: int, min_level: int = 16, max_level: int = 4096) -> int:
+    """Largest power-of-two level within the requested point budget."""
+    level = min_level
+    while level * 2 <= min(points, max_level):
+        level *= 2
+    return level
+
+class LRUCache:
+    """Small in-process LRU cache. Entries are keyed by version, so no cross-process invalidation is needed."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def set(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,118 @@
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from math import floor
+from typing import Dict, Iterable, Tuple
+from .decompression import DecompressionCalculator, gas_mixture_for_oxygen
+from .profile import DEFAULT_DESCENT_RATE
+
+# Depth spacing of the precomputed per-preset gas table
+GAS_TABLE_STEP = 3  # meters
+# PPO2 used for the contingency depth, the absolute limit recreational agencies allow
+CONTINGENCY_PPO2 = 1.6  # bar
+
+@dataclass(frozen=True)
+class GasLevel:
+    depth: float
+    ppo2: float
+    usable_gas: float   # Usable gas at this depth's ambient pressure, in liters
+    reserve_gas: float  # Reserve at this depth's ambient pressure, in liters
+
+@dataclass(frozen=True)
+class PresetPlan:
+    gas_type: str
+    oxygen_percentage: float
+    nitrogen_percentage: float
+    helium_percentage: float
+    mod: float              # Maximum operating depth at the preset's max_ppo2, meters
+    contingency_mod: float  # Maximum operating depth at CONTINGENCY_PPO2, meters
+    total_gas: float        # Surface liters in a full tank
+    reserve_gas: float      # Surface liters kept back for the ascent
+    usable_gas: float       # Surface liters available before reaching the reserve
+    levels: Tuple[GasLevel, ...]  # Every GAS_TABLE_STEP meters down to the MOD
+
+def _max_operating_depth(oxygen_percentage: float, ppo2: float) -> float:
+    # Rounded down to 0.1 m so the limit is never overstated
+    return floor((ppo2 / (oxygen_percentage / 100) - 1) * 100) / 10
+
+@lru_cache(maxsize=1024)
+def preset_plan(
+    tank_volume: float,
+    working_pressure: int,
+    reserve_pressure: int,
+    oxygen_percentage: float,
+    max_ppo2: float
+) -> PresetPlan:
+    """
+    Derived gas values of a tank and gas. Keyed on the preset's own values, so each
+    preset is computed once per worker and edits produce a fresh entry.
+    """
+    gas_mixture = gas_mixture_for_oxygen(oxygen_percentage)
+    mod = _max_operating_depth(oxygen_percentage, max_ppo2)
+    total_gas = round(tank_volume * working_pressure, 1)
+    reserve_gas = round(tank_volume * reserve_pressure, 1)
+    usable_gas = round(total_gas - reserve_gas, 1)
+
+    levels = []
+    depth = 0
+    while depth <= mod:
+        absolute_pressure = (depth / 10) + 1
+        levels.append(GasLevel(
+            depth=float(depth),
+            ppo2=round(oxygen_percentage / 100 * absolute_pressure, 2),
+            usable_gas=round(usable_gas / absolute_pressure, 1),
+            reserve_gas=round(reserve_gas / absolute_pressure, 1)
+        ))
+        depth += GAS_TABLE_STEP
+
+    return PresetPlan(
+        gas_type=gas_mixture.gas_type,
+        oxygen_percentage=gas_mixture.oxygen,
+        nitrogen_percentage=gas_mixture.nitrogen,
+        helium_percentage=gas_mixture.helium,
+        mod=mod,
+        contingency_mod=_max_operating_depth(oxygen_percentage, CONTINGENCY_PPO2),
+        total_gas=total_gas,
+        reserve_gas=reserve_gas,
+        usable_gas=usable_gas,
+        levels=tuple(levels)
+    )
+
+def plan_for_preset(preset) -> PresetPlan:
+    return preset_plan(
+        preset.tank_volume, preset.working_pressure, preset.reserve_pressure,
+        preset.oxygen_percentage, preset.max_ppo2
+    )
+
+def gas_time_at_depth(plan: PresetPlan, depth: float, sac_rate: float) -> float:
+    """Minutes until the reserve is reached at depth, for a surface air consumption rate in L/min."""
+    return plan.usable_gas / (sac_rate * ((depth / 10) + 1))
+
+def gas_required(max_depth: float, bottom_time: int, stops: Iterable, sac_rate: float,
+                 descent_rate: float = DEFAULT_DESCENT_RATE) -> float:
+    """
+    Surface liters a square-profile dive needs at a surface air consumption rate in L/min:
+    descent and ascent at half the depth, the bottom time at depth, and each stop at its depth.
+    `stops` are (depth, duration) pairs.
+    """
+    travel_pressure = (max_depth / 2 / 10) + 1
+    minutes_at_pressure = (
+        (max_depth / descent_rate + max_depth / DecompressionCalculator.ASCENT_RATE) * travel_pressure
+        + bottom_time * ((max_depth / 10) + 1)
+        + sum(duration * ((depth / 10) + 1) for depth, duration in stops)
+    )
+    return round(minutes_at_pressure * sac_rate, 1)
+
+def plan_to_dict(plan: PresetPlan) -> Dict:
+    return asdict(plan)
+
+def preset_dive_fields(preset) -> Dict:
+    """DiveCreate values a preset supplies: a full tank of its gas."""
+    plan = plan_for_preset(preset)
+    return {
+        "tank_volume": preset.tank_volume,
+        "start_pressure": preset.working_pressure,
+        "oxygen_percentage": plan.oxygen_percentage,
+        "nitrogen_percentage": plan.nitrogen_percentage,
+        "helium_percentage": plan.helium_percentage,
+        "gas_type": plan.gas_type,
+    }
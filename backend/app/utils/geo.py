@@ -0,0 +1,105 @@
+from math import radians, sin, cos, asin, sqrt
+from typing import List, Optional, Tuple
+import re
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0
+
+# Approximate cell (height, width at the equator) in km per geohash precision
+CELL_SIZE_KM = {
+    1: (5000.0, 5000.0),
+    2: (625.0, 1250.0),
+    3: (156.0, 156.0),
+    4: (19.5, 39.1),
+    5: (4.89, 4.89),
+    6: (0.61, 1.22),
+    7: (0.153, 0.153),
+    8: (0.019, 0.038),
+}
+
+# Precision of a site's cell, the location half of its unique key. Cells (~0.15 km) fit
+# inside the radius within which same-named sites are one site, so rows sharing a key
+# are always duplicates of one place
+SITE_CELL_PRECISION = 7
+
+def normalize_site_name(name: str) -> str:
+    """Canonical form used to deduplicate site names ("Blue Hole " == "blue  hole")."""
+    return re.sub(r"\s+", " ", name).strip().casefold()
+
+def site_cell(latitude: Optional[float], longitude: Optional[float]) -> str:
+    """Location part of a dive site's unique key; empty for a site without coordinates."""
+    if latitude is None or longitude is None:
+        return ""
+    return geohash_encode(latitude, longitude, SITE_CELL_PRECISION)
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 9) -> str:
+    """Encode coordinates as a geohash string."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        value, interval = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+def geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """Return (min_lat, max_lat, min_lon, max_lon) of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if (value >> shift) & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+def geohash_neighbors(geohash: str) -> List[str]:
+    """The cell itself and its eight neighbours at the same precision."""
+    min_lat, max_lat, min_lon, max_lon = geohash_bounds(geohash)
+    height, width = max_lat - min_lat, max_lon - min_lon
+    center_lat, center_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+    cells = []
+    for d_lat in (-1, 0, 1):
+        lat = center_lat + d_lat * height
+        if lat < -90 or lat > 90:
+            continue
+        for d_lon in (-1, 0, 1):
+            lon = (center_lon + d_lon * width + 180) % 360 - 180
+            cell = geohash_encode(lat, lon, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+def precision_for_radius(radius_km: float, latitude: float) -> int:
+    """Finest precision whose cells are at least radius_km across, so 3x3 cells cover the circle."""
+    width_factor = max(cos(radians(latitude)), 0.01)
+    best = 1
+    for precision, (height, width) in CELL_SIZE_KM.items():
+        if min(height, width * width_factor) >= radius_km:
+            best = precision
+    return best
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in km."""
+    d_lat = radians(lat2 - lat1)
+    d_lon = radians(lon2 - lon1)
+    a = sin(d_lat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
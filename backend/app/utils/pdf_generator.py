@@ -1,18 +1,10 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
 from io import BytesIO
+from xml.sax.saxutils import escape
+
+def _dive_details(dive_data: dict, styles) -> list:
+    from reportlab.platypus import Paragraph, Spacer
 
-def generate_dive_report(dive_data: dict, depth_records: list):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
     story = []
-    
-    story.append(Paragraph(f"Dive Report - {dive_data['location']}", styles['Title']))
-    story.append(Spacer(1, 12))
-    
-    # Dive Details
     details = [
         f"Date: {dive_data['date']}",
         f"Max Depth: {dive_data['max_depth']} meters",
@@ -24,6 +16,24 @@ def generate_dive_report(dive_data: dict, depth_records: list):
     for detail in details:
         story.append(Paragraph(detail, styles['BodyText']))
         story.append(Spacer(1, 6))
+    return story
+
+def generate_dive_report(dive_data: dict, depth_records: list):
+    # ReportLab is heavy and PDF export is rare, so load it on first use
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+    
+    story.append(Paragraph(f"Dive Report - {dive_data['location']}", styles['Title']))
+    story.append(Spacer(1, 12))
+    
+    # Dive Details
+    story.extend(_dive_details(dive_data, styles))
     
     # Generate chart (would be implemented separately)
     # chart = generate_depth_chart(depth_records)
@@ -31,4 +41,24 @@ def generate_dive_report(dive_data: dict, depth_records: list):
     
     doc.build(story)
     buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer
+
+def generate_dive_log(dives: list):
+    """PDF of a whole dive log, one section per dive. Takes plain dicts so it can run in a worker process."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = [Paragraph("Dive Log", styles['Title']), Spacer(1, 12)]
+
+    for dive_data in dives:
+        story.append(Paragraph(escape(dive_data['location'] or "Unknown location"), styles['Heading2']))
+        story.extend(_dive_details(dive_data, styles))
+        story.append(Spacer(1, 12))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
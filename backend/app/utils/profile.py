@@ -0,0 +1,75 @@
+from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from .decompression import DecompressionCalculator
+
+# Default descent rate used for logged dives (meters per minute)
+DEFAULT_DESCENT_RATE = 20
+
+@dataclass
+class PlanLevel:
+    depth: float
+    duration: int  # minutes spent at this depth
+
+@dataclass
+class ProfilePlan:
+    levels: List[PlanLevel]
+    stops: List[Dict] = field(default_factory=list)  # Decompression stops as {"depth", "duration"}
+    descent_rate: float = DEFAULT_DESCENT_RATE
+    ascent_rate: float = DecompressionCalculator.ASCENT_RATE
+
+@dataclass
+class ProfileSegments:
+    seconds: List[int]
+    depths: List[float]
+
+def validate_rates(descent_rate: float, ascent_rate: float) -> None:
+    """Raise ValueError if the rates are outside the limits of the decompression model."""
+    if descent_rate <= 0 or descent_rate > DecompressionCalculator.MAX_DESCENT_RATE:
+        raise ValueError(f'Descent rate must be between 0 and {DecompressionCalculator.MAX_DESCENT_RATE} m/min')
+    if ascent_rate <= 0 or ascent_rate > DecompressionCalculator.ASCENT_RATE:
+        raise ValueError(f'Ascent rate must be between 0 and {DecompressionCalculator.ASCENT_RATE} m/min')
+
+def _travel_seconds(from_depth: float, to_depth: float, descent_rate: float, ascent_rate: float) -> int:
+    delta = to_depth - from_depth
+    rate = descent_rate if delta > 0 else ascent_rate
+    return int(abs(delta) / rate * 60)
+
+def generate_profile(plan: ProfilePlan) -> ProfileSegments:
+    """
+    Build the depth profile of a (multi-level) dive as numeric segment arrays.
+    Each level is reached at the plan's descent/ascent rate, followed by the
+    decompression stops and the final ascent to the surface.
+    """
+    validate_rates(plan.descent_rate, plan.ascent_rate)
+    seconds = [0]
+    depths = [0.0]
+    current_time = 0
+
+    def move_and_hold(depth: float, hold_seconds: int):
+        nonlocal current_time
+        current_time += _travel_seconds(depths[-1], depth, plan.descent_rate, plan.ascent_rate)
+        seconds.append(current_time)
+        depths.append(depth)
+        current_time += hold_seconds
+        seconds.append(current_time)
+        depths.append(depth)
+
+    for level in plan.levels:
+        move_and_hold(level.depth, level.duration * 60)
+
+    # Stops are flown deepest first regardless of the order the calculator lists them in
+    for stop in sorted(plan.stops, key=lambda stop: stop['depth'], reverse=True):
+        move_and_hold(stop['depth'], stop['duration'] * 60)
+
+    current_time += _travel_seconds(depths[-1], 0, plan.descent_rate, plan.ascent_rate)
+    seconds.append(current_time)
+    depths.append(0.0)
+    return ProfileSegments(seconds=seconds, depths=depths)
+
+def generate_profiles(plans: List[ProfilePlan]) -> List[ProfileSegments]:
+    """Generate profiles for a batch of plans."""
+    return [generate_profile(plan) for plan in plans]
+
+def format_time_labels(seconds: List[int]) -> List[str]:
+    """Format elapsed seconds as m:ss labels for serialization."""
+    return ['%d:%02d' % divmod(value, 60) for value in seconds]
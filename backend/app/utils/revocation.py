@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+class RevocationCache:
+    """
+    In-memory copy of the revoked token denylist: jti -> expiry. Lookups are a dict
+    probe; the owner calls load() with rows revoked since `since()` whenever
+    is_stale() says the interval has passed, so the database is hit at most once
+    per interval per worker instead of once per request.
+    """
+
+    def __init__(self, sync_interval: timedelta, overlap: timedelta):
+        self.sync_interval = sync_interval
+        # Re-read this much history on every sync so rows committed out of revoked_at order are not missed
+        self.overlap = overlap
+        self.entries = {}
+        self.synced_at: Optional[datetime] = None
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, jti: str, expires_at: datetime):
+        self.entries[jti] = expires_at
+
+    def is_stale(self, now: datetime) -> bool:
+        return self.synced_at is None or now - self.synced_at >= self.sync_interval
+
+    def since(self) -> Optional[datetime]:
+        """Lower bound on revoked_at for the next sync; None means a full load."""
+        if self.synced_at is None:
+            return None
+        return self.synced_at - self.overlap
+
+    def load(self, rows: Iterable[Tuple[str, datetime]], now: datetime):
+        for jti, expires_at in rows:
+            self.entries[jti] = expires_at
+        # Expired tokens are rejected by their exp claim, so their entries can go
+        self.entries = {jti: expires_at for jti, expires_at in self.entries.items() if expires_at > now}
+        self.synced_at = now
@@ -0,0 +1,43 @@
+from typing import Dict, List
+from ..models import DiveSession
+from .profile import format_time_labels
+
+# Explicit response schema for dive payloads. Reading a fixed set of attributes
+# avoids FastAPI's generic jsonable_encoder introspection of ORM objects.
+DIVE_RESPONSE_FIELDS = (
+    "id",
+    "user_id",
+    "date",
+    "location",
+    "site_id",
+    "preset_id",
+    "max_depth",
+    "duration",
+    "water_temp",
+    "water_type",
+    "notes",
+    "start_pressure",
+    "end_pressure",
+    "tank_volume",
+    "air_consumption",
+    "depth_data",
+    "time_data",
+    "decompression_info",
+    "oxygen_percentage",
+    "nitrogen_percentage",
+    "helium_percentage",
+    "gas_type",
+    "updated_at",
+)
+
+def dive_to_dict(dive: DiveSession) -> Dict:
+    """Convert a dive to a plain dict that orjson can serialize directly."""
+    data = {field: getattr(dive, field) for field in DIVE_RESPONSE_FIELDS}
+    # Stored as elapsed seconds; clients get m:ss labels
+    if data["time_data"] is not None:
+        data["time_data"] = format_time_labels(data["time_data"])
+    return data
+
+def dives_to_dicts(dives: List[DiveSession]) -> List[Dict]:
+    """Convert a list of dives to plain dicts."""
+    return [dive_to_dict(dive) for dive in dives]
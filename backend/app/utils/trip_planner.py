@@ -0,0 +1,125 @@
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from math import ceil, floor
+from typing import Dict, List, Optional, Tuple
+from .decompression import DecompressionCalculator, ceil_to_increment, calculate_dive_profile, gas_mixture_for_oxygen
+
+# Repetitive diving on top of the single-dive tables.
+#
+# A pressure group stands for the fraction of the no-decompression limit a diver has
+# used up (A = none, M = all of it). On the surface that fraction halves every
+# SURFACE_HALF_TIME minutes and is gone after CLEAN_SURFACE_INTERVAL. The fraction
+# left when the next dive starts is charged as residual nitrogen time: minutes of
+# that dive's NDL already spent, which are added to its bottom time for the tables.
+#
+# Each dive depends on the previous ones only through the group it starts with, so
+# a trip is planned as a chain of cached steps keyed on (dive, entering group).
+
+SURFACE_HALF_TIME = 60  # minutes
+CLEAN_SURFACE_INTERVAL = 720  # minutes, same as DiveProfile's default
+
+_GROUPS = DecompressionCalculator.PRESSURE_GROUPS
+
+@dataclass(frozen=True)
+class RepetitiveDivePlan:
+    entering_group: str         # Pressure group at the start of the dive, after the surface interval
+    residual_nitrogen_time: int  # minutes
+    no_deco_limit: int          # NDL at depth before residual nitrogen
+    adjusted_no_deco_limit: int  # NDL left for this dive
+    total_bottom_time: int      # Bottom time plus residual nitrogen time, as used for the tables
+    stops: Tuple[Tuple[float, int], ...]  # (depth, minutes)
+    requires_safety_stop: bool
+    total_deco_time: int
+    is_deco_dive: bool
+    total_ascent_time: int
+    pressure_group: str         # Pressure group on surfacing
+    ppo2_at_depth: float
+    warnings: Tuple[str, ...]
+
+def group_after_surface_interval(group: str, surface_interval: int) -> str:
+    """Pressure group after surface_interval minutes; fractions are rounded up to the next group."""
+    if surface_interval >= CLEAN_SURFACE_INTERVAL:
+        return _GROUPS[0]
+    remaining = _GROUPS.index(group) * 0.5 ** (surface_interval / SURFACE_HALF_TIME)
+    return _GROUPS[ceil(round(remaining, 6))]
+
+def residual_nitrogen_time(group: str, no_deco_limit: int) -> int:
+    return ceil(round(_GROUPS.index(group) / (len(_GROUPS) - 1) * no_deco_limit, 6))
+
+def group_for_time(bottom_time: int, no_deco_limit: int) -> str:
+    """Pressure group for having used bottom_time minutes of no_deco_limit; inverse of residual_nitrogen_time."""
+    if no_deco_limit <= 0:
+        return _GROUPS[-1]
+    used = min(1.0, bottom_time / no_deco_limit)
+    return _GROUPS[floor(round(used * (len(_GROUPS) - 1), 6))]
+
+@lru_cache(maxsize=4096)
+def plan_repetitive_dive(
+    max_depth: float,
+    bottom_time: int,
+    oxygen_percentage: float,
+    entering_group: str
+) -> RepetitiveDivePlan:
+    """Plan one dive of a series, starting with entering_group's residual nitrogen."""
+    gas_mixture = gas_mixture_for_oxygen(oxygen_percentage)
+    ndl = DecompressionCalculator.adjust_ndl_for_nitrox(ceil_to_increment(max_depth, 3), gas_mixture)
+    rnt = residual_nitrogen_time(entering_group, ndl)
+    total_bottom_time = bottom_time + rnt
+
+    profile = calculate_dive_profile(
+        max_depth=max_depth,
+        bottom_time=total_bottom_time,
+        oxygen_percentage=gas_mixture.oxygen,
+        nitrogen_percentage=gas_mixture.nitrogen,
+        helium_percentage=gas_mixture.helium,
+        gas_type=gas_mixture.gas_type,
+        previous_group=entering_group
+    )
+    warnings = list(profile["gas_info"]["warnings"])
+    if ndl and rnt >= ndl:
+        warnings.append(f"WARNING: residual nitrogen from group {entering_group} leaves no no-decompression time")
+    elif total_bottom_time > ndl:
+        warnings.append(f"WARNING: bottom time exceeds the {max(0, ndl - rnt)} minutes of no-decompression time left")
+
+    return RepetitiveDivePlan(
+        entering_group=entering_group,
+        residual_nitrogen_time=rnt,
+        no_deco_limit=ndl,
+        adjusted_no_deco_limit=max(0, ndl - rnt),
+        total_bottom_time=total_bottom_time,
+        stops=tuple((stop["depth"], stop["duration"]) for stop in profile["stops"]),
+        requires_safety_stop=profile["requires_safety_stop"],
+        total_deco_time=profile["total_deco_time"],
+        is_deco_dive=profile["is_deco_dive"],
+        total_ascent_time=profile["total_ascent_time"],
+        # From the same NDL as the residual nitrogen time, not the air table calculate_dive_profile
+        # uses, so a nitrox dive is charged and credited on one scale
+        pressure_group=group_for_time(total_bottom_time, ndl),
+        ppo2_at_depth=profile["gas_info"]["ppo2_at_depth"],
+        warnings=tuple(warnings)
+    )
+
+@dataclass
+class TripDive:
+    max_depth: float
+    bottom_time: int
+    oxygen_percentage: float = 21.0
+    surface_interval: int = CLEAN_SURFACE_INTERVAL  # minutes on the surface before this dive
+
+def plan_trip(dives: List[TripDive], start_group: Optional[str] = None) -> List[Dict]:
+    """
+    Plan a series of dives in order, each starting from the group the previous one
+    surfaced with. start_group is the group before the first dive's surface interval,
+    so the rest of a trip can be re-planned from any dive by passing the pressure_group
+    the dive before it surfaced with.
+    """
+    group = start_group or _GROUPS[0]
+    plans = []
+    for dive in dives:
+        entering_group = group_after_surface_interval(group, dive.surface_interval)
+        plan = plan_repetitive_dive(dive.max_depth, dive.bottom_time, dive.oxygen_percentage, entering_group)
+        entry = asdict(plan)
+        entry["stops"] = [{"depth": depth, "duration": duration} for depth, duration in plan.stops]
+        plans.append(entry)
+        group = plan.pressure_group
+    return plans
@@ -0,0 +1,39 @@
+# Production server profile: gunicorn managing uvicorn workers.
+#   gunicorn -c gunicorn.conf.py app.main:app
+# Send SIGHUP for a graceful reload (new workers start before old ones drain),
+# SIGTERM for a graceful shutdown.
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Requests are mostly CPU-bound (serialization, planning), so size to cores
+# (in-process state multiplies with it: use RATE_LIMIT_BACKEND=redis so rate limits stay shared)
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Each worker imports the app itself. Nothing is preloaded in the master, so
+# database pools and in-process caches are never shared across forks.
+preload_app = False
+
+# Seconds a worker gets to finish in-flight requests on reload/shutdown
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Recycle workers periodically to bound memory growth; jitter avoids restarting all at once
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+def on_starting(server):
+    # Migrate once in the master instead of in every worker
+    if os.getenv("RUN_MIGRATIONS", "true").lower() == "true":
+        from app.schema import upgrade_to_head
+        from app.database import engine
+        upgrade_to_head()
+        # Drop the master's connections so forked workers start with an empty pool
+        engine.dispose()
@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The app reads its configuration at import time, so point it at a throwaway SQLite
+# database before any test module imports it
+_DATABASE_DIR = tempfile.mkdtemp(prefix="diving-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DATABASE_DIR}/app.db"
+os.environ["SCHEMA_STARTUP_MODE"] = "none"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+TEST_PASSWORD = "diving123!"
+
+@pytest.fixture
+def database():
+    """A fresh database at the current schema for each test."""
+    from app.database import engine
+    from app.schema import create_all_at_head
+    import app.main  # noqa: F401  registers the DDL listeners the models rely on
+    engine.dispose()
+    Path(_DATABASE_DIR, "app.db").unlink(missing_ok=True)
+    create_all_at_head(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def client(database):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
+
+def register_user(client, username: str) -> dict:
+    """Register and log in a user; returns the token pair."""
+    response = client.post("/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": TEST_PASSWORD,
+        "name": username.title(),
+        "age": 30,
+        "phone_number": "+1234567890",
+    })
+    assert response.status_code == 200, response.text
+    response = client.post("/auth/token", data={"username": username, "password": TEST_PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+@pytest.fixture
+def auth_headers(client) -> dict:
+    tokens = register_user(client, "diver")
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
@@ -0,0 +1,33 @@
+from app.database import SessionLocal
+from app.models import User
+from app.services.auth import decode_refresh_token, revoke_token
+from .conftest import register_user
+
+def test_refresh_token_is_single_use(client):
+    tokens = register_user(client, "diver")
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {response.json()['access_token']}"}).status_code == 200
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+def test_concurrent_refreshes_only_one_revokes(client):
+    tokens = register_user(client, "diver")
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        # Both requests pass the denylist check before either records the revocation
+        payloads = [decode_refresh_token(db, tokens["refresh_token"]) for db in (first, second)]
+        user_id = first.query(User.id).filter(User.username == "diver").scalar()
+        assert revoke_token(first, payloads[0], user_id)
+        assert not revoke_token(second, payloads[1], user_id)
+    finally:
+        first.close()
+        second.close()
+
+def test_logout_revokes_both_tokens(client):
+    tokens = register_user(client, "diver")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
@@ -0,0 +1,72 @@
+import pytest
+from pydantic import ValidationError
+from app.models import DiveCreate
+from app.utils.dive_validation import validate_dive_payloads
+
+DIVE = {"location": "Blue Hole", "date": "2026-03-01T09:00:00", "max_depth": 18, "duration": 40,
+        "start_pressure": 200, "end_pressure": 70, "tank_volume": 12, "water_temp": 24}
+
+PAYLOADS = [
+    DIVE,
+    {**DIVE, "levels": None},
+    {**DIVE, "descent_rate": None, "ascent_rate": None, "latitude": None, "longitude": None, "preset_id": None},
+    {**DIVE, "levels": [{"depth": 18, "duration": 15}, {"depth": 9, "duration": 25}]},
+    {**DIVE, "levels": []},
+    {**DIVE, "latitude": 17.3, "longitude": None},
+    {**DIVE, "start_pressure": 300, "end_pressure": 0, "tank_volume": 20},
+    {**DIVE, "start_pressure": 0, "end_pressure": 0, "tank_volume": 0},
+    {**DIVE, "start_pressure": 301},
+    {**DIVE, "start_pressure": -1, "end_pressure": 250},
+    {**DIVE, "end_pressure": 201},
+    {**DIVE, "start_pressure": None, "end_pressure": 250},
+    {**DIVE, "tank_volume": 20.5},
+    {**DIVE, "max_depth": 0},
+    {**DIVE, "max_depth": -3.5, "duration": 0},
+    {**DIVE, "max_depth": 0.1, "duration": 1},
+    {**DIVE, "max_depth": True},
+    {**DIVE, "duration": 40.0},
+    {**DIVE, "duration": "40"},
+    {**DIVE, "water_temp": None, "water_type": "Salt", "notes": None},
+    {**DIVE, "water_type": "Lava"},
+    {**DIVE, "oxygen_percentage": 32, "nitrogen_percentage": 68, "gas_type": "Nitrox"},
+    {**DIVE, "oxygen_percentage": 40, "nitrogen_percentage": 60, "gas_type": "Nitrox"},
+    {**DIVE, "oxygen_percentage": 41, "nitrogen_percentage": 59, "gas_type": "Nitrox"},
+    {**DIVE, "oxygen_percentage": 32, "nitrogen_percentage": 60, "gas_type": "Nitrox"},
+    {**DIVE, "oxygen_percentage": 32, "nitrogen_percentage": 68},
+    {**DIVE, "oxygen_percentage": 101, "gas_type": "Air"},
+    {**DIVE, "helium_percentage": -1},
+    {**DIVE, "oxygen_percentage": None, "gas_type": "Air"},
+    {**DIVE, "gas_type": None},
+    {**DIVE, "date": "2026-03-01T09:00:00Z"},
+    {**DIVE, "date": "2026-03-01 09:00:00.25+02:00"},
+    {**DIVE, "date": "2026-02-30T09:00:00"},
+    {**DIVE, "date": 1772355600},
+    {key: value for key, value in DIVE.items() if key != "location"},
+    {**DIVE, "location": None},
+    {**DIVE, "unknown": 1},
+]
+
+def _model_result(payload):
+    try:
+        return DiveCreate.parse_obj(payload), []
+    except ValidationError as exc:
+        return None, exc.errors()
+
+def _assert_same(model, errors, payload):
+    expected_model, expected_errors = _model_result(payload)
+    assert errors == expected_errors
+    if expected_model is None:
+        assert model is None
+    else:
+        assert model.dict() == expected_model.dict()
+        assert model.__fields_set__ == expected_model.__fields_set__
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_batch_validation_matches_the_model(payload):
+    models, errors = validate_dive_payloads([payload])
+    _assert_same(models[0], errors[0], payload)
+
+def test_mixed_batch_matches_the_model_row_by_row():
+    models, errors = validate_dive_payloads(PAYLOADS)
+    for model, row_errors, payload in zip(models, errors, PAYLOADS):
+        _assert_same(model, row_errors, payload)
@@ -0,0 +1,159 @@
+import pytest
+from datetime import datetime, timedelta
+from app.database import SessionLocal
+from app.models import DepthRecord, DepthRecordRollup, DiveSession
+from app.services.dive import MAX_BATCH_IDS
+
+DIVE = {"location": "Blue Hole", "date": "2026-03-01T09:00:00", "max_depth": 18, "duration": 40,
+        "start_pressure": 200, "end_pressure": 70, "tank_volume": 12, "water_temp": 24}
+
+def _create(client, headers, **overrides):
+    response = client.post("/dives/dives/", json={**DIVE, **overrides}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+def _add_samples(dive_id: int):
+    db = SessionLocal()
+    try:
+        start = datetime(2026, 3, 1, 9)
+        db.add_all([DepthRecord(session_id=dive_id, timestamp=start + timedelta(seconds=i), depth=i / 10)
+                    for i in range(5)])
+        db.add(DepthRecordRollup(session_id=dive_id, bucket_start=start, bucket_seconds=60, sample_count=5,
+                                 min_depth=0.0, avg_depth=0.2, max_depth=0.4))
+        db.commit()
+    finally:
+        db.close()
+
+def _sample_counts(dive_id: int):
+    db = SessionLocal()
+    try:
+        return (
+            db.query(DepthRecord).filter(DepthRecord.session_id == dive_id).count(),
+            db.query(DepthRecordRollup).filter(DepthRecordRollup.session_id == dive_id).count(),
+        )
+    finally:
+        db.close()
+
+def test_delete_dive_removes_samples_and_rollups(client, auth_headers):
+    dive = _create(client, auth_headers)
+    _add_samples(dive["id"])
+    assert client.delete(f"/dives/dives/{dive['id']}", headers=auth_headers).status_code == 204
+    assert _sample_counts(dive["id"]) == (0, 0)
+
+def test_batch_delete_removes_samples_and_rollups(client, auth_headers):
+    dive = _create(client, auth_headers)
+    _add_samples(dive["id"])
+    response = client.post("/dives/dives/batch", json={"deletes": [dive["id"]]}, headers=auth_headers)
+    assert response.json() == {"updated": 0, "deleted": 1}
+    assert _sample_counts(dive["id"]) == (0, 0)
+
+def test_batch_depth_change_regenerates_profile(client, auth_headers):
+    dive = _create(client, auth_headers)
+    expected = _create(client, auth_headers, max_depth=30, duration=20)
+    response = client.post("/dives/dives/batch", json={
+        "updates": [{"ids": [dive["id"]], "changes": {"max_depth": 30, "duration": 20}}]
+    }, headers=auth_headers)
+    assert response.json() == {"updated": 1, "deleted": 0}
+
+    edited = client.get(f"/dives/dives/{dive['id']}", headers=auth_headers).json()
+    for field in ("depth_data", "time_data", "decompression_info"):
+        assert edited[field] == expected[field], field
+    assert max(edited["depth_data"]) == 30
+
+def test_batch_notes_change_keeps_profile(client, auth_headers):
+    dive = _create(client, auth_headers, levels=[{"depth": 18, "duration": 15}, {"depth": 9, "duration": 25}])
+    client.post("/dives/dives/batch", json={
+        "updates": [{"ids": [dive["id"]], "changes": {"notes": "Turtles"}}]
+    }, headers=auth_headers)
+    edited = client.get(f"/dives/dives/{dive['id']}", headers=auth_headers).json()
+    assert edited["depth_data"] == dive["depth_data"]
+
+def test_update_regenerates_profile_from_plan(client, auth_headers):
+    dive = _create(client, auth_headers)
+    levels = [{"depth": 18, "duration": 15}, {"depth": 9, "duration": 25}]
+    response = client.put(f"/dives/dives/{dive['id']}", json={**DIVE, "levels": levels, "descent_rate": 10},
+                          headers=auth_headers)
+    assert response.status_code == 200, response.text
+    expected = _create(client, auth_headers, levels=levels, descent_rate=10)
+    for field in ("depth_data", "time_data", "decompression_info"):
+        assert response.json()[field] == expected[field], field
+    assert response.json()["depth_data"] != dive["depth_data"]
+
+def test_zero_rates_are_rejected(client, auth_headers):
+    for field in ("descent_rate", "ascent_rate"):
+        response = client.post("/dives/dives/", json={**DIVE, field: 0}, headers=auth_headers)
+        assert response.status_code == 422, field
+
+def test_zero_duration_and_depth_are_rejected(client, auth_headers):
+    for field in ("duration", "max_depth"):
+        response = client.post("/dives/dives/", json={**DIVE, field: 0}, headers=auth_headers)
+        assert response.status_code == 422, field
+
+@pytest.mark.parametrize("changes", [
+    {"end_pressure": 250},  # Above the stored start pressure
+    {"start_pressure": 50},  # Below the stored end pressure
+    {"duration": 0},
+])
+def test_batch_rejects_changes_that_break_the_merged_dive(client, auth_headers, changes):
+    dive = _create(client, auth_headers)
+    other = _create(client, auth_headers)
+    response = client.post("/dives/dives/batch", json={
+        "updates": [{"ids": [other["id"]], "changes": {"notes": "Turtles"}},
+                    {"ids": [dive["id"], other["id"]], "changes": changes}]
+    }, headers=auth_headers)
+    assert response.status_code == 422, response.text
+    assert {entry["id"] for entry in response.json()["detail"]} == {dive["id"], other["id"]}
+    # All-or-nothing: not even the valid entry was applied
+    assert client.get(f"/dives/dives/{other['id']}", headers=auth_headers).json()["notes"] is None
+
+def test_batch_validates_changes_in_order(client, auth_headers):
+    dive = _create(client, auth_headers)
+    response = client.post("/dives/dives/batch", json={
+        "updates": [{"ids": [dive["id"]], "changes": {"start_pressure": 220}},
+                    {"ids": [dive["id"]], "changes": {"end_pressure": 210}}]
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert client.get(f"/dives/dives/{dive['id']}", headers=auth_headers).json()["air_consumption"] > 0
+
+def test_batch_caps_the_number_of_ids(client, auth_headers):
+    response = client.post("/dives/dives/batch", json={
+        "updates": [{"ids": list(range(1, MAX_BATCH_IDS + 1)), "changes": {"notes": "Turtles"}}],
+        "deletes": [1]
+    }, headers=auth_headers)
+    assert response.status_code == 413
+
+def test_profile_skips_untimed_samples(client, auth_headers):
+    dive = _create(client, auth_headers)
+    untimed = _create(client, auth_headers)
+    db = SessionLocal()
+    try:
+        start = datetime(2026, 3, 1, 9)
+        db.add_all([DepthRecord(session_id=dive["id"], timestamp=start + timedelta(seconds=i), depth=float(i))
+                    for i in range(5)])
+        db.add_all([DepthRecord(session_id=dive_id, timestamp=None, depth=12.0)
+                    for dive_id in (dive["id"], untimed["id"])])
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get(f"/dives/dives/{dive['id']}/profile", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["seconds"] == [0, 1, 2, 3, 4]
+    assert response.json()["depths"] == [0, 1, 2, 3, 4]
+
+    # A dive with only untimed samples falls back to its planned profile
+    response = client.get(f"/dives/dives/{untimed['id']}/profile", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["depths"] == untimed["depth_data"]
+
+def test_time_data_is_served_as_labels(client, auth_headers):
+    dive = _create(client, auth_headers)
+    assert dive["time_data"][0] == "0:00"
+    db = SessionLocal()
+    try:
+        stored = db.query(DiveSession.time_data).filter(DiveSession.id == dive["id"]).scalar()
+    finally:
+        db.close()
+    assert ["%d:%02d" % divmod(value, 60) for value in stored] == dive["time_data"]
+    synced = client.get("/sync/dives", headers=auth_headers).json()["dives"][0]
+    assert synced["time_data"] == dive["time_data"]
@@ -0,0 +1,52 @@
+from .conftest import register_user
+
+PRESET = {"name": "EAN32 12L", "tank_volume": 12, "working_pressure": 200, "reserve_pressure": 50,
+          "oxygen_percentage": 32, "max_ppo2": 1.4}
+DIVE = {"location": "Blue Hole", "date": "2026-03-01T09:00:00", "max_depth": 18, "duration": 40,
+        "end_pressure": 70, "water_temp": 24}
+
+def _create_preset(client, headers, **overrides):
+    response = client.post("/equipment/presets", json={**PRESET, **overrides}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+def test_preset_plan(client, auth_headers):
+    preset = _create_preset(client, auth_headers)
+    assert preset["plan"]["mod"] == 33.7
+    assert preset["plan"]["usable_gas"] == 12 * 150
+    response = client.get(f"/equipment/presets/{preset['id']}/at-depth", params={"depth": 40, "sac_rate": 20},
+                          headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert not response.json()["within_mod"]
+    assert response.json()["ppo2"] == 1.6
+
+def test_apply_preset_fills_only_unset_fields(client, auth_headers):
+    preset = _create_preset(client, auth_headers)
+    response = client.post("/dives/dives/", json={**DIVE, "preset_id": preset["id"]}, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    dive = response.json()
+    assert (dive["tank_volume"], dive["start_pressure"]) == (12, 200)
+    assert (dive["oxygen_percentage"], dive["nitrogen_percentage"], dive["gas_type"]) == (32, 68, "Nitrox")
+    assert dive["preset_id"] == preset["id"]
+
+    response = client.post("/dives/dives/", json={**DIVE, "preset_id": preset["id"], "start_pressure": 180},
+                           headers=auth_headers)
+    assert response.json()["start_pressure"] == 180
+
+def test_apply_preset_revalidates_the_merged_dive(client, auth_headers):
+    preset = _create_preset(client, auth_headers)
+    # The payload's own gas type must still fit the preset's gas
+    response = client.post("/dives/dives/", json={**DIVE, "preset_id": preset["id"], "gas_type": "Air"},
+                           headers=auth_headers)
+    assert response.status_code == 422
+    # As must its end pressure against the preset's full tank
+    response = client.post("/dives/dives/", json={**DIVE, "preset_id": preset["id"], "end_pressure": 210},
+                           headers=auth_headers)
+    assert response.status_code == 422
+
+def test_presets_are_private(client, auth_headers):
+    preset = _create_preset(client, auth_headers)
+    other = {"Authorization": f"Bearer {register_user(client, 'other')['access_token']}"}
+    assert client.get(f"/equipment/presets/{preset['id']}", headers=other).status_code == 404
+    response = client.post("/dives/dives/", json={**DIVE, "preset_id": preset["id"]}, headers=other)
+    assert response.status_code == 404
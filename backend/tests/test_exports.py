@@ -0,0 +1,47 @@
+import io
+import pytest
+from datetime import datetime, timedelta
+from app.database import SessionLocal
+from app.models import DepthRecord
+from .conftest import register_user
+
+DIVE = {"location": "Blue Hole", "date": "2026-03-01T09:00:00", "max_depth": 18, "duration": 40,
+        "start_pressure": 200, "end_pressure": 70, "tank_volume": 12, "water_temp": 24}
+
+def _read_table(response, fmt):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if fmt == "parquet":
+        return pq.read_table(io.BytesIO(response.content))
+    return pa.ipc.open_stream(response.content).read_all()
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_export_has_own_dives_with_samples(client, auth_headers, fmt):
+    dive_ids = [
+        client.post("/dives/dives/", json={**DIVE, "location": location}, headers=auth_headers).json()["id"]
+        for location in ("Blue Hole", "Half Moon Caye")
+    ]
+    other = register_user(client, "other")
+    client.post("/dives/dives/", json=DIVE, headers={"Authorization": f"Bearer {other['access_token']}"})
+    db = SessionLocal()
+    try:
+        start = datetime(2026, 3, 1, 9)
+        db.add_all([DepthRecord(session_id=dive_ids[0], timestamp=start + timedelta(seconds=i), depth=float(i))
+                    for i in range(3)])
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get("/exports/columnar", params={"format": fmt, "include_samples": True},
+                          headers=auth_headers)
+    assert response.status_code == 200, response.text
+    table = _read_table(response, fmt).to_pydict()
+    assert table["id"] == dive_ids
+    assert table["location"] == ["Blue Hole", "Half Moon Caye"]
+    assert [sample["depth"] for sample in table["samples"][0]] == [0.0, 1.0, 2.0]
+    assert table["samples"][1] == []
+
+def test_columnar_export_rejects_unknown_format(client, auth_headers):
+    response = client.get("/exports/columnar", params={"format": "csv"}, headers=auth_headers)
+    assert response.status_code == 422
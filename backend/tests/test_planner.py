@@ -0,0 +1,47 @@
+import pytest
+
+@pytest.mark.parametrize("params", [
+    {"depth": 0},
+    {"depth": -5},
+    {"depth": 101},
+    {"depth": 18, "max_deco_time": -1},
+    {"depth": 18, "oxygen_percentage": 20},
+    {"depth": 18, "oxygen_percentage": 41},
+])
+def test_max_bottom_time_rejects_invalid_parameters(client, auth_headers, params):
+    response = client.get("/planner/max-bottom-time", params=params, headers=auth_headers)
+    assert response.status_code == 422
+
+def test_max_bottom_time(client, auth_headers):
+    response = client.get("/planner/max-bottom-time", params={"depth": 18, "oxygen_percentage": 21},
+                          headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["depth"] == 18
+
+def test_max_bottom_time_rejects_gas_above_max_ppo2(client, auth_headers):
+    # EAN40 reaches 1.6 bar at 30 m
+    response = client.get("/planner/max-bottom-time", params={"depth": 30, "oxygen_percentage": 40},
+                          headers=auth_headers)
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("body", [
+    {"min_depth": 0, "max_depth": 30},
+    {"min_depth": -6, "max_depth": 30},
+    {"min_depth": 30, "max_depth": 12},
+])
+def test_bottom_time_grid_rejects_invalid_depth_range(client, auth_headers, body):
+    response = client.post("/planner/bottom-time-grid", json=body, headers=auth_headers)
+    assert response.status_code == 422
+
+def test_bottom_time_grid_rejects_oversized_grid_before_building_it(client, auth_headers):
+    response = client.post("/planner/bottom-time-grid",
+                           json={"min_depth": 1, "max_depth": 100, "depth_step": 1e-9},
+                           headers=auth_headers)
+    assert response.status_code == 400
+
+def test_bottom_time_grid_depths(client, auth_headers):
+    response = client.post("/planner/bottom-time-grid",
+                           json={"min_depth": 12, "max_depth": 18, "depth_step": 3, "oxygen_percentages": [21]},
+                           headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert [row["depth"] for row in response.json()["grid"]] == [12, 15, 18]
@@ -0,0 +1,37 @@
+import pytest
+from app.database import engine
+from app.middleware.query_guard import assert_max_queries, install_query_counter
+from app.scripts.check_query_budgets import MAX_REPEATS, QUERY_BUDGETS
+
+# Enough dives that a per-row query would blow every budget
+DIVE_COUNT = 20
+
+@pytest.fixture
+def dive_id(client, auth_headers):
+    install_query_counter(engine)
+    for i in range(DIVE_COUNT):
+        response = client.post("/dives/dives/", json={
+            "location": f"Query Budget Reef {i % 3}",
+            "date": f"2024-03-{i % 28 + 1:02d}T09:00:00",
+            "max_depth": 18 + i % 10,
+            "duration": 40,
+            "start_pressure": 200,
+            "end_pressure": 70,
+            "tank_volume": 12,
+            "water_temp": 24,
+            "latitude": 17.3 + i * 0.001,
+            "longitude": -87.5,
+        }, headers=auth_headers)
+        assert response.status_code == 201, response.text
+    assert client.post("/equipment/presets", json={
+        "name": "AL80", "tank_volume": 11.1, "working_pressure": 207, "reserve_pressure": 50,
+        "oxygen_percentage": 32, "max_ppo2": 1.4,
+    }, headers=auth_headers).status_code == 201
+    return client.get("/dives/dives/", headers=auth_headers).json()[0]["id"]
+
+@pytest.mark.parametrize("route,budget", QUERY_BUDGETS.items(), ids=list(QUERY_BUDGETS))
+def test_endpoint_within_query_budget(client, auth_headers, dive_id, route, budget):
+    with assert_max_queries(budget, MAX_REPEATS) as stats:
+        response = client.get(route.format(dive_id=dive_id), headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert stats.count > 0
@@ -0,0 +1,104 @@
+import asyncio
+import fakeredis.aioredis
+from fastapi import FastAPI, Form, Request
+from fastapi.testclient import TestClient
+from app.middleware.rate_limit import MemoryBackend, RateLimitMiddleware, RedisBackend, RouteLimit
+from app.services.auth import create_access_token
+
+LIMITS = {
+    "auth": RouteLimit(rate=1 / 60, burst=2, max_concurrent=2),
+    "dives": RouteLimit(rate=1 / 60, burst=3, max_concurrent=2),
+}
+
+def _limited_client() -> TestClient:
+    app = FastAPI()
+
+    @app.post("/auth/token")
+    async def token(username: str = Form(...), password: str = Form(...)):
+        return {"username": username}
+
+    @app.post("/auth/register")
+    async def register(request: Request):
+        return await request.json()
+
+    @app.get("/auth/me")
+    async def me():
+        return {}
+
+    @app.get("/dives/dives/")
+    async def dives():
+        return []
+
+    return TestClient(RateLimitMiddleware(app, backend=MemoryBackend(), limits=LIMITS))
+
+def _run(coroutine):
+    # A private loop: asyncio.run would leave the main thread without the loop TestClient uses
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+def _login(client, username):
+    return client.post("/auth/token", data={"username": username, "password": "secret"})
+
+def test_login_is_limited_per_username_and_body_reaches_endpoint():
+    client = _limited_client()
+    for _ in range(2):
+        response = _login(client, "Diver")
+        assert response.status_code == 200
+        assert response.json() == {"username": "Diver"}
+    response = _login(client, "diver")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    # Another account from the same address has its own bucket
+    assert _login(client, "buddy").status_code == 200
+
+def test_multipart_login_is_keyed_by_username():
+    client = _limited_client()
+    form = {"username": (None, "diver"), "password": (None, "secret")}
+    for _ in range(2):
+        assert client.post("/auth/token", files=form).json() == {"username": "diver"}
+    assert client.post("/auth/token", files=form).status_code == 429
+    assert _login(client, "buddy").status_code == 200
+
+def test_register_is_limited_by_json_username():
+    client = _limited_client()
+    for _ in range(2):
+        assert client.post("/auth/register", json={"username": "diver"}).json() == {"username": "diver"}
+    assert client.post("/auth/register", json={"username": "diver"}).status_code == 429
+    assert client.post("/auth/register", json={"username": "buddy"}).status_code == 200
+
+def test_token_endpoints_outside_credentials_are_not_limited():
+    client = _limited_client()
+    for _ in range(10):
+        assert client.get("/auth/me").status_code == 200
+
+def test_route_groups_are_limited_per_user():
+    client = _limited_client()
+    diver = {"Authorization": f"Bearer {create_access_token({'sub': 'diver'})}"}
+    buddy = {"Authorization": f"Bearer {create_access_token({'sub': 'buddy'})}"}
+    for _ in range(3):
+        assert client.get("/dives/dives/", headers=diver).status_code == 200
+    assert client.get("/dives/dives/", headers=diver).status_code == 429
+    assert client.get("/dives/dives/", headers=buddy).status_code == 200
+
+def test_redis_backend_token_bucket():
+    async def run():
+        backend = RedisBackend(fakeredis.aioredis.FakeRedis())
+        results = [await backend.take_token("dives:user:diver", 1 / 60, 3) for _ in range(4)]
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+        assert 0 < results[-1][1] <= 60
+        # Buckets are per key
+        assert (await backend.take_token("dives:user:buddy", 1 / 60, 3))[0]
+    _run(run())
+
+def test_redis_backend_concurrency_slots():
+    async def run():
+        backend = RedisBackend(fakeredis.aioredis.FakeRedis())
+        assert await backend.acquire_slot("exports:user:diver", 2)
+        assert await backend.acquire_slot("exports:user:diver", 2)
+        assert not await backend.acquire_slot("exports:user:diver", 2)
+        await backend.release_slot("exports:user:diver")
+        assert await backend.acquire_slot("exports:user:diver", 2)
+    _run(run())
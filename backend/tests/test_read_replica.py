@@ -0,0 +1,51 @@
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import app.database as db_module
+from app.database import LAST_WRITE_HEADER, READ_YOUR_WRITES_SECONDS
+from app.schema import create_all_at_head
+
+DIVE = {"location": "Blue Hole", "date": "2026-03-01T09:00:00", "max_depth": 18, "duration": 40,
+        "start_pressure": 200, "end_pressure": 70, "tank_volume": 12, "water_temp": 24}
+
+@pytest.fixture
+def lagging_replica(database, tmp_path, monkeypatch):
+    """A second database with the schema but none of the primary's rows, as a replica that has not caught up."""
+    replica = create_engine(f"sqlite:///{tmp_path}/replica.db", connect_args={"check_same_thread": False})
+    create_all_at_head(replica)
+    monkeypatch.setattr(db_module, "read_engine", replica)
+    monkeypatch.setattr(db_module, "ReadSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=replica))
+    yield replica
+    replica.dispose()
+
+def _dive_count(client, headers):
+    response = client.get("/dives/dives/", headers=headers)
+    assert response.status_code == 200, response.text
+    return len(response.json())
+
+def test_reads_after_a_write_go_to_the_primary(client, auth_headers, lagging_replica):
+    response = client.post("/dives/dives/", json=DIVE, headers=auth_headers)
+    assert response.status_code == 201
+    written_at = response.headers[LAST_WRITE_HEADER]
+    client.cookies.clear()
+
+    # Echoing the header reads the primary and sees the new dive
+    assert _dive_count(client, {**auth_headers, LAST_WRITE_HEADER: written_at}) == 1
+    # Without it, or once the window has passed, reads go to the replica
+    assert _dive_count(client, auth_headers) == 0
+    stale = f"{time.time() - READ_YOUR_WRITES_SECONDS - 1:.3f}"
+    assert _dive_count(client, {**auth_headers, LAST_WRITE_HEADER: stale}) == 0
+
+def test_write_cookie_routes_reads_to_the_primary(client, auth_headers, lagging_replica):
+    assert client.post("/dives/dives/", json=DIVE, headers=auth_headers).status_code == 201
+    assert client.cookies.get(db_module.LAST_WRITE_COOKIE)
+    assert _dive_count(client, auth_headers) == 1
+
+def test_cors_allows_the_last_write_header(client):
+    response = client.options("/dives/dives/", headers={
+        "Origin": "http://localhost:3000",
+        "Access-Control-Request-Method": "GET",
+        "Access-Control-Request-Headers": f"authorization,{LAST_WRITE_HEADER.lower()}",
+    })
+    assert response.status_code == 200
@@ -0,0 +1,153 @@
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, ForeignKey, Integer, JSON, MetaData, String, Table, Text,
+    create_engine, inspect, text
+)
+from app.analytics import SUMMARY_VIEWS
+from app.database import Base
+from app.schema import get_alembic_config, upgrade_to_head, create_all_at_head, _current_heads
+
+def _head():
+    from alembic.script import ScriptDirectory
+    return set(ScriptDirectory.from_config(get_alembic_config()).get_heads())
+
+def _baseline_metadata() -> MetaData:
+    """The tables the original init_db create_all built, before migrations were tracked."""
+    metadata = MetaData()
+    Table(
+        "users", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("username", String(50), unique=True, index=True),
+        Column("email", String(100), unique=True, index=True),
+        Column("hashed_password", String(255)),
+        Column("name", String(100)),
+        Column("age", Integer),
+        Column("phone_number", String(20)),
+        Column("is_admin", Boolean, default=False),
+    )
+    Table(
+        "dive_sessions", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("user_id", Integer, ForeignKey("users.id")),
+        Column("date", DateTime),
+        Column("location", String(100)),
+        Column("max_depth", Float),
+        Column("duration", Integer),
+        Column("water_temp", Float),
+        Column("water_type", String(50)),
+        Column("notes", Text),
+        Column("start_pressure", Integer),
+        Column("end_pressure", Integer),
+        Column("tank_volume", Float),
+        Column("air_consumption", Float),
+        Column("depth_data", JSON),
+        Column("time_data", JSON),
+        Column("decompression_info", JSON),
+        Column("oxygen_percentage", Float, default=21.0),
+        Column("nitrogen_percentage", Float, default=79.0),
+        Column("helium_percentage", Float, default=0.0),
+        Column("gas_type", String(50), default="Air"),
+    )
+    Table(
+        "depth_records", metadata,
+        Column("id", Integer, primary_key=True, index=True),
+        Column("session_id", Integer, ForeignKey("dive_sessions.id")),
+        Column("timestamp", DateTime),
+        Column("depth", Float),
+        Column("temperature", Float),
+    )
+    return metadata
+
+def test_unversioned_baseline_database_is_migrated_to_head(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/baseline.db")
+    _baseline_metadata().create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (id, username) VALUES (1, 'diver')"))
+        connection.execute(text(
+            "INSERT INTO dive_sessions (id, user_id, location, max_depth, duration) VALUES (1, 1, 'Blue Hole', 24, 40)"
+        ))
+
+    assert upgrade_to_head(engine)
+
+    with engine.connect() as connection:
+        assert _current_heads(connection) == _head()
+        inspector = inspect(connection)
+        for table in ("dive_tombstones", "depth_record_rollups", "dive_sites", "revoked_tokens", "gas_presets"):
+            assert inspector.has_table(table), table
+        columns = {column["name"] for column in inspector.get_columns("dive_sessions")}
+        assert {"updated_at", "site_id", "preset_id"} <= columns
+        # Existing dives survive and are backfilled onto a site
+        assert connection.execute(text("SELECT site_id FROM dive_sessions WHERE id = 1")).scalar() is not None
+
+    assert not upgrade_to_head(engine)
+
+def test_create_all_database_is_recorded_at_head(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/current.db")
+    create_all_at_head(engine)
+    with engine.connect() as connection:
+        assert _current_heads(connection) == _head()
+    assert not upgrade_to_head(engine)
+
+def test_drop_all_removes_analytics_summaries(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/dropped.db")
+    create_all_at_head(engine)
+    assert inspect(engine).has_table(SUMMARY_VIEWS[0][0])
+    Base.metadata.drop_all(bind=engine)
+    inspector = inspect(engine)
+    for name, _, _ in SUMMARY_VIEWS:
+        assert not inspector.has_table(name), name
+    assert not inspector.has_table("analytics_refreshes")
+
+def test_only_duplicate_sites_in_one_cell_are_merged(tmp_path):
+    from alembic import command
+    engine = create_engine(f"sqlite:///{tmp_path}/sites.db")
+    config = get_alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "009")
+        connection.execute(text("INSERT INTO users (id, username) VALUES (1, 'diver')"))
+        # 1 and 2 are one Belize site (same cell), 3 is Dahab's, 4 and 5 have no position
+        connection.execute(text(
+            "INSERT INTO dive_sites (id, name, normalized_name, latitude, longitude, geohash) VALUES "
+            "(1, 'Blue Hole', 'blue hole', 17.3157, -87.5348, 'd51f805p7'), "
+            "(2, 'blue hole', 'blue hole', 17.3158, -87.5349, 'd51f805pb'), "
+            "(3, 'Blue Hole', 'blue hole', 28.5720, 34.5370, 'sv0d9cm5f'), "
+            "(4, 'Blue Hole', 'blue hole', NULL, NULL, NULL), "
+            "(5, 'BLUE HOLE', 'blue hole', NULL, NULL, NULL)"
+        ))
+        connection.execute(text(
+            "INSERT INTO dive_sessions (id, user_id, location, site_id) VALUES "
+            "(1, 1, 'Blue Hole', 1), (2, 1, 'blue hole', 2), (3, 1, 'Blue Hole', 3), (4, 1, 'BLUE HOLE', 5)"
+        ))
+
+    assert upgrade_to_head(engine)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT id, site_cell FROM dive_sites ORDER BY id")).fetchall() == [
+            (1, "d51f805"), (3, "sv0d9cm"), (4, "")
+        ]
+        assert connection.execute(text("SELECT id, site_id FROM dive_sessions ORDER BY id")).fetchall() == [
+            (1, 1), (2, 1), (3, 3), (4, 4)
+        ]
+        indexes = {index["name"]: index for index in inspect(connection).get_indexes("dive_sites")}
+        assert indexes["ix_dive_sites_name_cell"]["unique"]
+        assert not indexes["ix_dive_sites_normalized_name"]["unique"]
+
+def test_time_labels_are_stored_as_seconds(tmp_path):
+    from alembic import command
+    engine = create_engine(f"sqlite:///{tmp_path}/time_data.db")
+    config = get_alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "010")
+        connection.execute(text("INSERT INTO users (id, username) VALUES (1, 'diver')"))
+        connection.execute(text(
+            "INSERT INTO dive_sessions (id, user_id, location, time_data) VALUES "
+            "(1, 1, 'Blue Hole', '[\"0:00\", \"0:54\", \"45:54\", \"105:12\"]'), (2, 1, 'Blue Hole', NULL)"
+        ))
+
+    assert upgrade_to_head(engine)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT id, time_data FROM dive_sessions ORDER BY id")).fetchall() == [
+            (1, "[0, 54, 2754, 6312]"), (2, None)
+        ]
@@ -0,0 +1,24 @@
+import pytest
+from app.database import SessionLocal
+from app.models import DiveSession
+from app.services.search import LIKE_ESCAPE, contains_pattern
+
+LOCATIONS = ["100% Reef", "1000 Reef", "Reef_A", "ReefXA", "Back\\slash", "Backslash"]
+
+@pytest.mark.parametrize("q, expected", [
+    ("100%", ["100% Reef"]),
+    ("f_a", ["Reef_A"]),
+    ("k\\s", ["Back\\slash"]),
+    ("reef", ["100% Reef", "1000 Reef", "Reef_A", "ReefXA"]),
+])
+def test_contains_pattern_matches_wildcards_literally(database, q, expected):
+    db = SessionLocal()
+    try:
+        db.add_all([DiveSession(location=location) for location in LOCATIONS])
+        db.commit()
+        matches = db.query(DiveSession.location).filter(
+            DiveSession.location.ilike(contains_pattern(q), escape=LIKE_ESCAPE)
+        ).order_by(DiveSession.id).all()
+    finally:
+        db.close()
+    assert [location for (location,) in matches] == expected
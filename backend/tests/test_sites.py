@@ -0,0 +1,61 @@
+from app.database import SessionLocal
+from app.models import DiveSite
+from app.services.sites import MAX_NEARBY_RADIUS_KM, _insert_site, resolve_site
+
+def test_nearby_finds_sites_within_radius(client, auth_headers):
+    db = SessionLocal()
+    try:
+        resolve_site(db, "Blue Hole", 17.3157, -87.5348)
+        resolve_site(db, "Half Moon Caye", 17.2050, -87.5450)
+        resolve_site(db, "Shark Ray Alley", 17.7450, -88.0280)
+        db.commit()
+    finally:
+        db.close()
+    response = client.get("/sites/nearby", params={"latitude": 17.3157, "longitude": -87.5348, "radius_km": 25},
+                          headers=auth_headers)
+    assert response.status_code == 200
+    assert [site["name"] for site in response.json()] == ["Blue Hole", "Half Moon Caye"]
+
+def test_nearby_radius_is_capped(client, auth_headers):
+    response = client.get("/sites/nearby", params={"latitude": 0, "longitude": 0, "radius_km": MAX_NEARBY_RADIUS_KM + 1},
+                          headers=auth_headers)
+    assert response.status_code == 422
+
+def test_sites_are_deduplicated_by_name(database):
+    db = SessionLocal()
+    try:
+        first = resolve_site(db, "Blue Hole")
+        again = resolve_site(db, "  blue   HOLE ", 17.3157, -87.5348)
+        assert again.id == first.id
+        assert again.latitude == 17.3157
+    finally:
+        db.close()
+
+def test_same_name_elsewhere_is_a_distinct_site(database):
+    db = SessionLocal()
+    try:
+        belize = resolve_site(db, "Blue Hole", 17.3157, -87.5348)
+        assert resolve_site(db, "blue hole", 17.3170, -87.5340).id == belize.id  # ~0.2 km away
+        dahab = resolve_site(db, "Blue Hole", 28.5720, 34.5370)
+        assert dahab.id != belize.id
+        assert resolve_site(db, "Blue Hole", 28.5725, 34.5372).id == dahab.id
+        # Without coordinates a dive gets the name's unlocated site, not one of the above
+        unlocated = resolve_site(db, "Blue Hole")
+        assert unlocated.id not in (belize.id, dahab.id) and unlocated.latitude is None
+        assert db.query(DiveSite).count() == 3
+    finally:
+        db.close()
+
+def test_insert_conflict_returns_the_existing_site(database):
+    # The row another request committed between our lookup and our insert
+    other, db = SessionLocal(), SessionLocal()
+    try:
+        existing = resolve_site(other, "Blue Hole", 17.3157, -87.5348)
+        other.commit()
+        site = _insert_site(db, "blue hole", "blue hole", 17.3158, -87.5349)
+        assert site.id == existing.id
+        assert site.latitude == 17.3157
+        assert db.query(DiveSite).count() == 1
+    finally:
+        other.close()
+        db.close()
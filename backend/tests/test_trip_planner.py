@@ -0,0 +1,65 @@
+import pytest
+from app.utils.decompression import DecompressionCalculator
+from app.utils.trip_planner import (
+    CLEAN_SURFACE_INTERVAL, SURFACE_HALF_TIME, TripDive, group_after_surface_interval, group_for_time,
+    plan_repetitive_dive, plan_trip, residual_nitrogen_time
+)
+
+GROUPS = DecompressionCalculator.PRESSURE_GROUPS
+
+def test_group_after_surface_interval():
+    assert group_after_surface_interval("G", 0) == "G"
+    # One half time halves the fraction used: G (6/12) becomes D (3/12)
+    assert group_after_surface_interval("G", SURFACE_HALF_TIME) == "D"
+    assert group_after_surface_interval("M", 2 * SURFACE_HALF_TIME) == "D"
+    # Partial groups round up, so a short interval never credits more than was off-gassed
+    assert group_after_surface_interval("B", SURFACE_HALF_TIME) == "B"
+    assert group_after_surface_interval("M", CLEAN_SURFACE_INTERVAL) == "A"
+    assert group_after_surface_interval("A", 30) == "A"
+
+@pytest.mark.parametrize("ndl", [12, 13, 20, 37, 60, 147])
+def test_residual_nitrogen_time_maps_back_to_its_group(ndl):
+    for group in GROUPS:
+        assert group_for_time(residual_nitrogen_time(group, ndl), ndl) == group
+
+@pytest.mark.parametrize("ndl", [1, 5, 8, 11])
+def test_short_limits_round_residual_time_up(ndl):
+    # Fewer minutes than groups: whole-minute residual time can only move the group up
+    for group in GROUPS:
+        assert GROUPS.index(group_for_time(residual_nitrogen_time(group, ndl), ndl)) >= GROUPS.index(group)
+
+def test_nitrox_dive_charges_and_credits_on_the_same_limit():
+    # EAN32 at 30 m has a longer limit than air; 20 minutes is a smaller share of it
+    plan = plan_repetitive_dive(30, 20, 32.0, "A")
+    assert plan.no_deco_limit > DecompressionCalculator.get_ndl_for_depth(30)
+    assert plan.pressure_group == group_for_time(20, plan.no_deco_limit)
+    # Residual nitrogen for that group on the same dive again stays within the time already used
+    assert residual_nitrogen_time(plan.pressure_group, plan.no_deco_limit) <= 20
+
+def test_multi_dive_chain():
+    dives = [
+        TripDive(max_depth=18, bottom_time=40, surface_interval=CLEAN_SURFACE_INTERVAL),
+        TripDive(max_depth=15, bottom_time=30, surface_interval=60),
+        TripDive(max_depth=12, bottom_time=30, oxygen_percentage=32.0, surface_interval=90),
+    ]
+    plans = plan_trip(dives)
+    assert plans[0]["entering_group"] == "A"
+    assert plans[0]["residual_nitrogen_time"] == 0
+    for previous, plan, dive in zip(plans, plans[1:], dives[1:]):
+        assert plan["entering_group"] == group_after_surface_interval(previous["pressure_group"], dive.surface_interval)
+        assert plan["residual_nitrogen_time"] == residual_nitrogen_time(plan["entering_group"], plan["no_deco_limit"])
+        assert plan["total_bottom_time"] == dive.bottom_time + plan["residual_nitrogen_time"]
+        assert plan["adjusted_no_deco_limit"] == plan["no_deco_limit"] - plan["residual_nitrogen_time"]
+        assert plan["pressure_group"] == group_for_time(plan["total_bottom_time"], plan["no_deco_limit"])
+    assert plans[1]["residual_nitrogen_time"] > 0
+
+    # Re-planning from the second dive with the group the first surfaced with gives the same result
+    assert plan_trip(dives[1:], start_group=plans[0]["pressure_group"]) == plans[1:]
+
+def test_trip_endpoint(client, auth_headers):
+    response = client.post("/planner/trip", json={"dives": [
+        {"max_depth": 18, "bottom_time": 40},
+        {"max_depth": 15, "bottom_time": 30, "surface_interval": 60},
+    ]}, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["final_pressure_group"] in GROUPS
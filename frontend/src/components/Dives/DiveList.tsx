@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import api from '../../services/api';
+import { syncDives } from '../../services/diveSync';
 
 interface DiveSession {
   id: number;
@@ -16,8 +16,7 @@ const DiveList: React.FC = () => {
   useEffect(() => {
     const fetchDives = async () => {
       try {
-        const response = await api.get('/dives/');
-        setDives(response.data);
+        setDives(await syncDives());
       } catch (error) {
         console.error('Error fetching dives:', error);
       } finally {
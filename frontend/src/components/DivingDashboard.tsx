@@ -16,6 +16,7 @@ import { Line } from 'react-chartjs-2';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../services/AuthContext';
 import { diveApi } from '../services/api';
+import { syncDives, clearDiveSyncCache } from '../services/diveSync';
 
 // Register ChartJS components
 ChartJS.register(
@@ -273,7 +274,7 @@ interface NewDiveData {
 }
 
 const DivingApp: React.FC = () => {
-  const { user } = useAuth();
+  const { user, logout } = useAuth();
   const [selectedDive, setSelectedDive] = useState<DiveSession | null>(null);
   const [dives, setDives] = useState<DiveSession[]>([]);
   const [isDeviceConnected, setIsDeviceConnected] = useState(false);
@@ -301,8 +302,7 @@ const DivingApp: React.FC = () => {
   useEffect(() => {
     const fetchDives = async () => {
       try {
-        const response = await diveApi.getDives();
-        setDives(response.data);
+        setDives(await syncDives());
       } catch (err) {
         console.error('Error fetching dives:', err);
       } finally {
@@ -473,7 +473,8 @@ const DivingApp: React.FC = () => {
   };
 
   const handleLogout = () => {
-    localStorage.removeItem('token');
+    clearDiveSyncCache();
+    logout();
     navigate('/login');
   };
 
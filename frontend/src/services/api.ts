@@ -7,21 +7,71 @@ const api = axios.create({
   },
 });
 
+// Set by the API on writes; echoed back so reads right after a write skip the lagging replica
+const LAST_WRITE_HEADER = 'X-Last-Write';
+const LAST_WRITE_KEY = 'lastWrite';
+
 // Add request interceptor to add auth token
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem('token');
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  const lastWrite = localStorage.getItem(LAST_WRITE_KEY);
+  if (lastWrite) {
+    config.headers[LAST_WRITE_HEADER] = lastWrite;
+  }
   return config;
 });
 
+// One refresh at a time; concurrent 401s wait for the same exchange
+let refreshing: Promise<string> | null = null;
+
+const refreshAccessToken = (): Promise<string> => {
+  if (!refreshing) {
+    const refreshToken = localStorage.getItem('refreshToken');
+    refreshing = (refreshToken
+      ? axios.post(`${api.defaults.baseURL}/auth/refresh`, { refresh_token: refreshToken }).then((response) => {
+          localStorage.setItem('token', response.data.access_token);
+          localStorage.setItem('refreshToken', response.data.refresh_token);
+          return response.data.access_token as string;
+        })
+      : Promise.reject(new Error('No refresh token'))
+    ).finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+};
+
+// Endpoints whose 401 means bad credentials rather than an expired access token
+const NO_REFRESH_URLS = ['/auth/token', '/auth/refresh', '/auth/logout'];
+
 // Add response interceptor to handle errors
 api.interceptors.response.use(
-  (response) => response,
-  (error) => {
-    if (error.response?.status === 401) {
+  (response) => {
+    const lastWrite = response.headers[LAST_WRITE_HEADER.toLowerCase()];
+    if (lastWrite) {
+      localStorage.setItem(LAST_WRITE_KEY, lastWrite);
+    }
+    return response;
+  },
+  async (error) => {
+    const original = error.config;
+    if (error.response?.status === 401 && original && !original._retried && !NO_REFRESH_URLS.includes(original.url)) {
+      // Expired access token: exchange the refresh token instead of sending the user back to login
+      original._retried = true;
+      try {
+        const token = await refreshAccessToken();
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch {
+        // Fall through to the login redirect
+      }
+    }
+    if (error.response?.status === 401 && original?.url !== '/auth/logout') {
       localStorage.removeItem('token');
+      localStorage.removeItem('refreshToken');
       window.location.href = '/login';
     }
     return Promise.reject(error);
@@ -48,6 +98,10 @@ export const authApi = {
     });
   },
   register: (userData: any) => api.post('/auth/register', userData),
+  logout: (accessToken: string, refreshToken: string | null) =>
+    api.post('/auth/logout', { refresh_token: refreshToken }, {
+      headers: { Authorization: `Bearer ${accessToken}` },
+    }),
   getCurrentUser: () => api.get('/auth/me'),
 };
 
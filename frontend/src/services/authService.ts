@@ -17,10 +17,11 @@ export const login = async (username: string, password: string): Promise<User> =
   formData.append('password', password);
 
   const response = await authApi.login(username, password);
-  const { access_token } = response.data;
+  const { access_token, refresh_token } = response.data;
   
-  // Store the token
+  // Store the tokens; the refresh token renews the short-lived access token
   localStorage.setItem('token', access_token);
+  localStorage.setItem('refreshToken', refresh_token);
   
   // Fetch user data
   const userResponse = await authApi.getCurrentUser();
@@ -39,7 +40,13 @@ export const register = async (data: {
 };
 
 export const logout = () => {
+  // Revoke both tokens server-side; logging out locally must not wait on it
+  const token = localStorage.getItem('token');
+  if (token) {
+    authApi.logout(token, localStorage.getItem('refreshToken')).catch(() => undefined);
+  }
   localStorage.removeItem('token');
+  localStorage.removeItem('refreshToken');
 };
 
 export const getCurrentUser = async (): Promise<User | null> => {
@@ -51,6 +58,7 @@ export const getCurrentUser = async (): Promise<User | null> => {
     return response.data;
   } catch (error) {
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     return null;
   }
 }; 
\ No newline at end of file
@@ -0,0 +1,63 @@
+import api from './api';
+
+// Local copy of the user's dives, kept current through the /sync/dives change feed
+// so list views only download what changed since the last visit.
+const CACHE_KEY = 'diveSyncCache';
+
+interface SyncCache {
+  username: string | null;
+  version: string | null;
+  dives: any[];
+}
+
+interface SyncResponse {
+  version: string;
+  full: boolean;
+  dives: any[];
+  deleted: number[];
+}
+
+// Cache entries belong to the token's subject so a different login never sees them
+const currentSubject = (): string | null => {
+  const token = localStorage.getItem('token');
+  if (!token) {
+    return null;
+  }
+  try {
+    return JSON.parse(atob(token.split('.')[1])).sub ?? null;
+  } catch (error) {
+    return null;
+  }
+};
+
+const loadCache = (username: string | null): SyncCache => {
+  try {
+    const cache = JSON.parse(localStorage.getItem(CACHE_KEY) || 'null');
+    if (cache && cache.username === username) {
+      return cache;
+    }
+  } catch (error) {
+    console.error('Ignoring unreadable dive cache:', error);
+  }
+  return { username, version: null, dives: [] };
+};
+
+export const syncDives = async (): Promise<any[]> => {
+  const username = currentSubject();
+  const cache = loadCache(username);
+  const response = await api.get<SyncResponse>('/sync/dives', {
+    params: cache.version ? { since: cache.version } : {},
+  });
+  const { version, full, dives, deleted } = response.data;
+
+  // Deltas repeat changes from a short window behind the version, so merge by id
+  const byId = new Map<number, any>(full ? [] : cache.dives.map((dive) => [dive.id, dive]));
+  dives.forEach((dive) => byId.set(dive.id, dive));
+  deleted.forEach((id) => byId.delete(id));
+
+  const merged = Array.from(byId.values());
+  localStorage.setItem(CACHE_KEY, JSON.stringify({ username, version, dives: merged }));
+  return merged;
+};
+
+export const clearDiveSyncCache = () => localStorage.removeItem(CACHE_KEY);